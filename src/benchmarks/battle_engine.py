@@ -0,0 +1,152 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It plays battles with the in-process battle engine, first
+# by calling 'LocalBattle.command' directly to measure how many turns the
+# engine itself resolves per second, and then through 'BattleClient' with
+# a 'LocalTransport' (both sides choosing moves like the AI does) to
+# measure the turns per second of a whole battle, events included. It
+# also checks that a seeded engine plays the same battles every time and
+# that the health the client tracks matches the health the engine sent.
+
+# Usage: python -m src.benchmarks.battle_engine [battle count] [team size]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import json
+import random
+import sys
+import threading
+import time
+from typing import Callable
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.game.battle_engine import BattleEngine, LocalBattle, LocalTransport
+from src.game.transport import get_event_loop
+from src.pack_processor import load_packs
+from src.pokemon.pokemon import Pokemon
+
+# Define a function that spawns the teams of a battle
+def build_teams(index: int, team_size: int) -> tuple[list[Pokemon], list[Pokemon]]:
+    species = holder.pack.species
+    player = [species[(index * 13 + i) % len(species)].spawn(50) for i in range(team_size)]
+    opponent = [species[(index * 7 + 3 + i) % len(species)].spawn(50) for i in range(team_size)]
+    return player, opponent
+
+# Define a function that plays a battle by calling the engine directly, both sides choose
+# a random move every turn and the player sends out its next healthy Pokemon when one faints.
+# Returns the amount of turns played and every protocol message
+def play_engine_battle(player: list[Pokemon], opponent: list[Pokemon], seed: int) -> tuple[int, list[str]]:
+    choices = random.Random(seed)
+    battle = LocalBattle("1", seed)
+    messages = []
+    for side, name, team in (("p1", "player", player), ("p2", "opponent", opponent)):
+        packed = "]".join(pokemon.pack_string() for pokemon in team)
+        messages += battle.command(f">player {side} {json.dumps({'name': name, 'team': packed})}")
+    messages += battle.command(">p1 team " + "".join(str(i + 1) for i in range(len(player))))
+    messages += battle.command(">p2 team " + "".join(str(i + 1) for i in range(len(opponent))))
+
+    while not battle.ended:
+        if battle.forced == "p1":
+            replacement = next(pokemon for pokemon in battle.teams["p1"] if pokemon.health > 0)
+            messages += battle.command(f">p1 switch {replacement.uuid}")
+            continue
+        for side in ("p1", "p2"):
+            messages += battle.command(f">{side} move {choices.randint(1, len(battle.active[side].moves))}")
+    return battle.turn, messages
+
+# Define a function that plays a battle through 'BattleClient' over a transport, returns an event
+# that is set once the battle has ended. The results are the amount of turns, whether the player
+# won and the amount of Pokemon whose health the client tracked wrong. 'setup' is called with the
+# battle before it is created
+def play_client_battle(player: list[Pokemon], opponent: list[Pokemon], transport, results: list,
+                       setup: Callable[[BattleClient], None] | None = None) -> threading.Event:
+    done = threading.Event()
+    battle = BattleClient(player, opponent, False, transport)
+    health = {} # The health the engine last sent for each Pokemon, by its UUID
+
+    # Define a function that records the health sent in a message
+    def on_log(message: str):
+        args = message.split("|")
+        if len(args) > 3 and args[1] in ("-damage", "-heal", "switch"):
+            raw_health = args[4] if args[1] == "switch" else args[3]
+            health[args[2].split(": ")[1]] = int(raw_health.split("/")[0].split(" ")[0])
+
+    # Define the faint callback, the player sends out its next healthy Pokemon like 'BattleWindow' does
+    def on_faint(pokemon: Pokemon):
+        if pokemon in battle.player:
+            healthy = [entry for entry in battle.player if entry.get_health() > 0]
+            if healthy:
+                battle.switch(Battler.PLAYER, healthy[0])
+
+    # Define the end callback, the client's health is compared to the engine's
+    def on_end(won: bool):
+        mismatches = sum(1 for pokemon in player + opponent if health.get(str(pokemon.uuid), pokemon.get_health()) != pokemon.get_health())
+        results.append((battle.turn, won, mismatches))
+        battle.disconnect()
+        done.set()
+
+    # Set the battle up the way 'BattleWindow' does, the player goes through its moves in order
+    def on_turn(turn: int):
+        battle.turn = turn
+        battle.select_move(Battler.PLAYER, turn % len(battle.current.condition.move_set) + 1)
+
+    battle.on(BattleEvent.STARTED, lambda: (battle.start(), battle.send_teams(), battle.send_layouts()))
+    battle.on(BattleEvent.TURN_CHANGE, on_turn)
+    battle.on(BattleEvent.LOG, on_log)
+    battle.on(BattleEvent.FAINTED, on_faint)
+    battle.on(BattleEvent.END, on_end)
+    if setup is not None:
+        setup(battle)
+    battle.create()
+    return done
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    team_size = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Load the packs like the game does
+    holder.pack = load_packs("packs")
+    random.seed(0)
+    teams = [build_teams(i, team_size) for i in range(count)]
+    failures = 0
+
+    # Check that a seeded battle is played the same way every time
+    if play_engine_battle(*teams[0], 1) != play_engine_battle(*teams[0], 1):
+        print("Mismatch: a seeded battle was played differently")
+        failures += 1
+
+    # Play every battle with the engine alone
+    start = time.perf_counter()
+    turns = sum(play_engine_battle(player, opponent, i)[0] for i, (player, opponent) in enumerate(teams))
+    elapsed = time.perf_counter() - start
+    print(f"{count} battles of {team_size} against {team_size} Pokemon")
+    print(f"  Engine: {turns} turns in {elapsed:.2f} s, {turns / elapsed:,.0f} turns/s, {elapsed / turns * 1e6:.1f} us per turn")
+
+    # Play every battle through 'BattleClient' at once, on the transport's event loop
+    get_event_loop() # Start the transport's event loop before timing
+    results = []
+    start = time.perf_counter()
+    events = [
+        play_client_battle(player, opponent, LocalTransport(BattleEngine(i)), results)
+        for i, (player, opponent) in enumerate(teams)
+    ]
+    finished = all(event.wait(60) for event in events)
+    elapsed = time.perf_counter() - start
+    turns = sum(turn for turn, _, _ in results)
+    mismatches = sum(mismatch for _, _, mismatch in results)
+    print(f"  BattleClient: {len(results)}/{count} finished, {turns} turns in {elapsed:.2f} s, {turns / elapsed:,.0f} turns/s, " +
+          f"player won {sum(1 for _, won, _ in results if won)}")
+
+    if not finished:
+        print("  Mismatch: some battles didn't finish")
+        failures += 1
+    if mismatches:
+        print(f"  Mismatch: the client's health differs from the engine's for {mismatches} Pokemon")
+        failures += 1
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
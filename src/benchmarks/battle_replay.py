@@ -0,0 +1,127 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It records battles played with the in-process engine to
+# one compressed recording, one battle after another, then replays every
+# battle through a new 'BattleClient' and checks that the replay calls
+# the same events with the same arguments as the battle did when it was
+# played. It measures how fast recorded lines go through the client's
+# line handler and parsers, how much recording slows a battle down and
+# how well the recording compresses, and replays one battle in real time.
+
+# Usage: python -m src.benchmarks.battle_replay [battle count]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.benchmarks.battle_engine import build_teams, play_client_battle
+from src.game.battle_client import BattleClient, BattleEvent
+from src.game.battle_engine import BattleEngine, LocalTransport
+from src.game.battle_recorder import INBOUND, create_replay, read_recordings
+from src.game.transport import get_event_loop
+from src.pack_processor import load_packs
+from src.pokemon.pokemon import Pokemon
+
+# Define a function that converts an event's arguments to values that can be compared between
+# battles, Pokemon are compared by their UUID
+def comparable(args: tuple) -> tuple:
+    return tuple(str(arg.uuid) if isinstance(arg, Pokemon) else arg for arg in args)
+
+# Define a function that adds a listener to every event (other than logs of sent lines) that
+# appends the event and its arguments to a list
+def capture_events(battle: BattleClient, events: list):
+    for event in BattleEvent:
+        if event == BattleEvent.LOG:
+            # Only the received lines are logged the same way by a replay, the AI's moves are chosen again
+            battle.on(event, lambda message: message.startswith("< ") and events.append((BattleEvent.LOG, message)))
+        else:
+            battle.on(event, lambda *args, event=event: events.append((event, comparable(args))))
+
+# Define a function that plays battles one after another, optionally recording each of them to a
+# file, returns the events of every battle and the time taken
+def play_battles(count: int, path: str | None) -> tuple[list[list], float]:
+    random.seed(0)
+    teams = [build_teams(i, 3) for i in range(count)]
+    battles = []
+    start = time.perf_counter()
+    for i, (player, opponent) in enumerate(teams):
+        results = []
+        events = []
+
+        # Define the setup callback, the events are captured and the battle recorded from its creation
+        def setup(battle: BattleClient):
+            capture_events(battle, events)
+            if path is not None:
+                battle.record(path)
+
+        play_client_battle(player, opponent, LocalTransport(BattleEngine(i)), results, setup).wait(60)
+        battles.append(events)
+    return battles, time.perf_counter() - start
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # Load the packs like the game does
+    holder.pack = load_packs("packs")
+    get_event_loop() # Start the transport's event loop before timing
+    path = os.path.join(tempfile.mkdtemp(), "battles.rec.gz")
+    failures = 0
+
+    # Play the battles without and with recording
+    _, unrecorded = play_battles(count, None)
+    battles, recorded = play_battles(count, path)
+    recordings = list(read_recordings(path))
+    lines = sum(len(recording.records) for recording in recordings)
+    raw_size = sum(sum(len(line) + 1 for _, _, line in recording.records) for recording in recordings)
+    print(f"Recorded {len(recordings)}/{count} battles, {lines} lines")
+    print(f"  Battles took {unrecorded:.2f} s without recording and {recorded:.2f} s with it")
+    print(f"  Recording: {os.path.getsize(path) / 1024:.0f} KB for {raw_size / 1024:.0f} KB of lines " +
+          f"({raw_size / os.path.getsize(path):.1f}x)")
+    if len(recordings) != count:
+        failures += 1
+
+    # Replay every battle at full speed and compare its events
+    mismatches = 0
+    inbound = 0
+    elapsed = 0
+    for recording, expected in zip(recordings, battles):
+        events = []
+        battle, transport = create_replay(recording)
+        capture_events(battle, events)
+        inbound += len(recording.get_lines(INBOUND))
+        start = time.perf_counter()
+        transport.replay()
+        elapsed += time.perf_counter() - start
+        if events != expected:
+            mismatches += 1
+    print(f"  Replay: {inbound} received lines in {elapsed:.2f} s, {inbound / elapsed:,.0f} lines/s, " +
+          f"{elapsed / inbound * 1e6:.1f} us per line")
+    if mismatches:
+        print(f"  Mismatch: {mismatches} replays called different events than their battles")
+        failures += 1
+
+    # Replay the shortest battle in real time, it should take as long as it took to play
+    recording = min(recordings, key=lambda entry: entry.get_duration())
+    battle, transport = create_replay(recording, realtime=True)
+    start = time.perf_counter()
+    transport.replay()
+    print(f"  Real time replay: {time.perf_counter() - start:.3f} s for a battle recorded over {recording.get_duration():.3f} s")
+
+    # Check that the file is gzip that can be read without the recorder
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        if sum(1 for line in file if line.startswith("#")) != count:
+            print("  Mismatch: the recording doesn't have a header for every battle")
+            failures += 1
+
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All replays match their battles")
@@ -0,0 +1,95 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It starts the local battle server as a subprocess and
+# load-tests 'BattleClient' against it, playing many concurrent battles
+# with a connection per battle and over the connection pool. The same
+# battles are also played with the in-process engine, so the difference
+# is the overhead of the protocol going over a connection.
+
+# Usage: python -m src.benchmarks.battle_server [battle count] [team size]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import random
+import subprocess
+import sys
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.benchmarks.battle_engine import build_teams, play_client_battle
+from src.game.battle_engine import BattleEngine, LocalTransport
+from src.game.connection_pool import ConnectionPool
+from src.game.transport import AsyncTransport, get_event_loop
+from src.pack_processor import load_packs
+
+# Define a function that starts the battle server as a subprocess on a free port, returns
+# the process and the port it listens on
+def start_server_process(seed: int) -> tuple[subprocess.Popen, int]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.game.battle_server", "0", str(seed)],
+        stdout=subprocess.PIPE, text=True
+    )
+    # The server prints its address once it is listening, ex: Battle server listening on 127.0.0.1:3000
+    line = process.stdout.readline()
+    if not line:
+        raise ConnectionError("The battle server exited before listening")
+    return process, int(line.strip().rsplit(":", 1)[1])
+
+# Define a function that plays every battle at once with a transport made by 'create_transport',
+# returns the results of the battles that finished and the time taken
+def run(count: int, team_size: int, create_transport) -> tuple[list, float]:
+    # Spawn the same teams for every run, the client changes the health of the Pokemon it battles with
+    random.seed(0)
+    teams = [build_teams(i, team_size) for i in range(count)]
+    results = []
+    start = time.perf_counter()
+    events = [
+        play_client_battle(player, opponent, create_transport(i), results)
+        for i, (player, opponent) in enumerate(teams)
+    ]
+    finished = all(event.wait(120) for event in events)
+    elapsed = time.perf_counter() - start
+    if not finished:
+        print(f"  Mismatch: {count - len(results)} battles didn't finish")
+    return results, elapsed
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    team_size = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Load the packs like the game does and start the server
+    holder.pack = load_packs("packs")
+    process, port = start_server_process(0)
+    get_event_loop() # Start the transport's event loop before timing
+    pool = ConnectionPool("127.0.0.1", port)
+    pool.warm()
+
+    failures = 0
+    print(f"{count} concurrent battles of {team_size} against {team_size} Pokemon")
+    try:
+        for name, create_transport in (
+            ("In-process engine", lambda i: LocalTransport(BattleEngine(i))),
+            ("Connection per battle", lambda i: AsyncTransport("127.0.0.1", port)),
+            ("Connection pool", lambda i: pool.session())
+        ):
+            results, elapsed = run(count, team_size, create_transport)
+            turns = sum(turn for turn, _, _ in results)
+            mismatches = sum(mismatch for _, _, mismatch in results)
+            print(f"  {name}: {len(results)}/{count} finished in {elapsed:.2f} s, {len(results) / elapsed:,.0f} battles/s, " +
+                  f"{turns / elapsed:,.0f} turns/s, {elapsed / max(1, turns) * 1e6:.0f} us per turn")
+            if len(results) != count:
+                failures += 1
+            if mismatches:
+                print(f"  Mismatch: the client's health differs from the server's for {mismatches} Pokemon")
+                failures += 1
+    finally:
+        pool.close()
+        process.terminate()
+        process.wait()
+
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
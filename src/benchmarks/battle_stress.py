@@ -0,0 +1,342 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It starts a local stand-in for the battle simulation
+# server that speaks the same JSON lines protocol (without simulating
+# any damage) and plays hundreds of concurrent battles against it with
+# 'BattleClient', all driven by the transport's single event loop. It checks
+# that every battle finishes with every turn played, and then checks the
+# edges of 'AsyncTransport' against raw servers: closing it before and after
+# it has connected or once the server hangs up, lines received in parts
+# (including a character split between two reads and a line longer than the
+# receive buffer) and lines sent from many threads at once.
+
+# The servers run on their own event loop in another thread. Every battle
+# ends after a fixed amount of turns, where both sides use a move.
+
+# Usage: python -m src.benchmarks.battle_stress [battle count] [turns per battle]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.game.transport import RECEIVE_BUFFER_SIZE, AsyncTransport, _open_transports, get_event_loop
+from src.pack_processor import load_packs
+
+# Define the most time (in seconds) a check waits for something to happen on the transport
+CHECK_TIMEOUT = 5
+
+# Define the 'StandInBattle' class which tracks one battle on the stand-in server
+class StandInBattle:
+    def __init__(self, battle_id: str):
+        # Initialize fields
+        self.battle_id = battle_id
+        self.uuids: dict[str, str] = {} # The leading Pokemon's UUID of each side
+        self.layouts = 0 # The amount of team layouts received
+        self.moves = 0 # The amount of moves chosen this turn
+        self.turn = 0
+
+# Define the 'StandInServer' class which answers battle requests like the battle
+# simulation server does, sending back the protocol messages of a very simple battle
+class StandInServer:
+    def __init__(self, turns: int, connect_delay: float = 0):
+        # Initialize fields
+        self.turns = turns
+        self.connect_delay = connect_delay # Seconds to wait before answering a new connection, like a distant server
+        self.next_id = 0
+
+    # Define a function that reads a line, clients that hang up once their battle has
+    # ended can reset the connection which is treated like the end of the stream
+    @staticmethod
+    async def read_line(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except ConnectionResetError:
+            return b""
+
+    # Define the handler for each client connection
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        battles: dict[str, StandInBattle] = {}
+        await asyncio.sleep(self.connect_delay)
+
+        # Define a function that sends protocol messages for a battle
+        def send_messages(battle: StandInBattle, *messages: str):
+            for message in messages:
+                writer.write((json.dumps({"action": "message", "battle_id": battle.battle_id, "output": message}) + "\n").encode())
+
+        while line := await self.read_line(reader):
+            request = json.loads(line)
+            if request["action"] == "create":
+                # Create a new battle
+                self.next_id += 1
+                battle = StandInBattle(str(self.next_id))
+                battles[battle.battle_id] = battle
+                writer.write((json.dumps({"action": "create", "battle_id": battle.battle_id}) + "\n").encode())
+                continue
+
+            battle = battles[request["battle_id"]]
+            command = request["command"]
+            if command.startswith(">player"):
+                # Remember the UUID of the leading Pokemon, the second field of the packed team
+                side = command.split(" ")[1]
+                team = json.loads(command.split(" ", 2)[2])["team"]
+                battle.uuids[side] = team.split("|")[2]
+            elif " team " in command:
+                # Start the first turn once both layouts have been received
+                battle.layouts += 1
+                if battle.layouts == 2:
+                    battle.turn = 1
+                    send_messages(
+                        battle,
+                        f"|switch|p1a: {battle.uuids['p1']}|Player|100/100",
+                        f"|switch|p2a: {battle.uuids['p2']}|Opponent|100/100",
+                        "|turn|1"
+                    )
+            elif " move " in command:
+                # Play the turn once both sides have chosen a move
+                battle.moves += 1
+                if battle.moves == 2:
+                    battle.moves = 0
+                    send_messages(
+                        battle,
+                        f"|move|p1a: {battle.uuids['p1']}|Tackle|p2a: {battle.uuids['p2']}",
+                        f"|move|p2a: {battle.uuids['p2']}|Tackle|p1a: {battle.uuids['p1']}"
+                    )
+                    if battle.turn >= self.turns:
+                        send_messages(battle, "|win|player")
+                    else:
+                        battle.turn += 1
+                        send_messages(battle, f"|turn|{battle.turn}")
+        writer.close()
+
+# Define a function that starts a server with a connection handler on its own event loop, returns its port
+def start_server(handle) -> int:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096), loop).result()
+    return server.sockets[0].getsockname()[1]
+
+# Define a function that starts the stand-in server on its own event loop, returns its port
+def start_stand_in_server(turns: int, connect_delay: float = 0) -> int:
+    return start_server(StandInServer(turns, connect_delay).handle)
+
+# Define a function that plays one battle, returns an event that is set once the battle has ended.
+# The duration of the battle and the amount of turns it was told about are appended to the results
+def play_battle(port: int, index: int, results: list[tuple[float, int]]) -> threading.Event:
+    done = threading.Event()
+    species = holder.pack.species
+    battle = BattleClient(
+        [species[index % len(species)].spawn(50)],
+        [species[(index * 7 + 3) % len(species)].spawn(50)],
+        False,
+        AsyncTransport("127.0.0.1", port)
+    )
+    started_at = time.perf_counter()
+    turns = []
+
+    # Define the turn callback, the player always uses their first move
+    def on_turn(turn: int):
+        turns.append(turn)
+        battle.select_move(Battler.PLAYER, 1)
+
+    # Define the end callback
+    def on_end(_: bool):
+        results.append((time.perf_counter() - started_at, len(turns)))
+        battle.disconnect()
+        done.set()
+
+    # Set the battle up the way 'BattleWindow' does
+    battle.on(BattleEvent.STARTED, lambda: (battle.start(), battle.send_teams(), battle.send_layouts()))
+    battle.on(BattleEvent.TURN_CHANGE, on_turn)
+    battle.on(BattleEvent.END, on_end)
+    battle.create()
+    return done
+
+# Define a function that opens a transport to a port, returns it with the lines it receives
+# and an event that is set once it has closed
+def open_transport(port: int) -> tuple[AsyncTransport, list[str], threading.Event]:
+    transport = AsyncTransport("127.0.0.1", port)
+    lines = []
+    closed = threading.Event()
+    transport.open(lines.append, closed.set)
+    return transport, lines, closed
+
+# Define a function that checks that a transport closes (calling 'on_close' and refusing to send)
+# when it is closed before it has connected, after it has connected and when the server hangs up,
+# returns the amount of mismatches
+def check_close() -> int:
+    mismatches = 0
+    connected = threading.Event() # Set once the server has received a line
+    hung_up = threading.Event() # Set once the server has seen the client close its connection
+
+    # Define the handler of a server that waits for the client to close, or hangs up when told to
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while line := await reader.readline():
+            connected.set()
+            if line == b"hang up\n":
+                break
+        else:
+            hung_up.set()
+        writer.close()
+
+    port = start_server(handle)
+    cases = [("before connecting", None), ("after connecting", b"hello"), ("once the server hangs up", b"hang up")]
+    for name, line in cases:
+        connected.clear()
+        hung_up.clear()
+        transport, _, closed = open_transport(port)
+        if line is not None:
+            transport.send(line.decode())
+            if not connected.wait(CHECK_TIMEOUT):
+                print(f"  Mismatch: closing {name}, the server never received a line")
+                mismatches += 1
+                continue
+        if line != b"hang up":
+            transport.close()
+        if not closed.wait(CHECK_TIMEOUT):
+            print(f"  Mismatch: closing {name}, 'on_close' wasn't called")
+            mismatches += 1
+            continue
+        if line == b"hello" and not hung_up.wait(CHECK_TIMEOUT):
+            print(f"  Mismatch: closing {name}, the server's connection wasn't closed")
+            mismatches += 1
+        if transport in _open_transports:
+            print(f"  Mismatch: closing {name}, the transport is still kept open")
+            mismatches += 1
+        try:
+            transport.send("too late")
+            print(f"  Mismatch: closing {name}, sending afterwards didn't raise")
+            mismatches += 1
+        except ConnectionError:
+            pass
+        # Closing again does nothing
+        transport.close()
+    return mismatches
+
+# Define a function that checks that lines received in parts are framed whole: one line written a
+# byte at a time, a character split between two writes, a line longer than the receive buffer and
+# a burst of lines in a single write, returns the amount of mismatches
+def check_partial_lines() -> int:
+    mismatches = 0
+    long_line = "x" * (RECEIVE_BUFFER_SIZE * 3 + 7)
+    burst = [f"burst {i}" for i in range(1000)]
+    expected = ["one byte at a time", "Flabébé", long_line, *burst, "last"]
+
+    # Define the handler of a server that writes the lines in parts, letting the client read each part
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        parts = [bytes([byte]) for byte in b"one byte at a time\n"]
+        split_line = "Flabébé\n".encode("utf-8")
+        parts += [split_line[:4], split_line[4:]] # 'é' is two bytes starting at the fifth
+        long_data = (long_line + "\n").encode()
+        parts += [long_data[:1000], long_data[1000:]]
+        parts.append("".join(line + "\n" for line in burst).encode() + b"la")
+        parts.append(b"st\n")
+        for part in parts:
+            writer.write(part)
+            await writer.drain()
+            await asyncio.sleep(0.001)
+        await reader.read() # Wait for the client to close
+        writer.close()
+
+    transport, lines, _ = open_transport(start_server(handle))
+    deadline = time.monotonic() + CHECK_TIMEOUT
+    while len(lines) < len(expected) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    transport.close()
+    if lines != expected:
+        print(f"  Mismatch: received {len(lines)} lines in parts, expected {len(expected)}, first difference at " +
+              f"{next((i for i, (a, b) in enumerate(zip(lines, expected)) if a != b), min(len(lines), len(expected)))}")
+        mismatches += 1
+    return mismatches
+
+# Define a function that checks that lines sent from many threads at once on one transport are all
+# received whole and in the order each thread sent them, returns the amount of mismatches
+def check_concurrent_sends(threads: int = 8, lines_per_thread: int = 2000) -> int:
+    mismatches = 0
+    received = []
+    done = threading.Event()
+
+    # Define the handler of a server that collects every line
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while line := await reader.readline():
+            received.append(line.decode())
+            if len(received) == threads * lines_per_thread:
+                done.set()
+        writer.close()
+
+    transport, _, _ = open_transport(start_server(handle))
+
+    # Define the function each thread runs, sending its lines as fast as it can
+    def send_lines(thread: int):
+        for index in range(lines_per_thread):
+            transport.send(f"{thread} {index} " + "y" * (index % 50))
+
+    senders = [threading.Thread(target=send_lines, args=(thread,)) for thread in range(threads)]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    if not done.wait(CHECK_TIMEOUT):
+        print(f"  Mismatch: the server received {len(received)}/{threads * lines_per_thread} lines sent concurrently")
+        mismatches += 1
+    transport.close()
+
+    # Check every line is whole and each thread's lines arrived in order
+    next_index = [0] * threads
+    for line in received:
+        thread, index, padding = (line.rstrip("\n").split(" ") + [""])[:3]
+        if not line.endswith("\n") or int(index) != next_index[int(thread)] or padding != "y" * (int(index) % 50):
+            print(f"  Mismatch: received {line!r} sent concurrently, expected line {next_index[int(thread)]} of thread {thread}")
+            mismatches += 1
+            break
+        next_index[int(thread)] += 1
+    return mismatches
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # Load the packs like the game does
+    holder.pack = load_packs("packs")
+    port = start_stand_in_server(turns)
+    get_event_loop() # Start the transport's event loop before timing
+
+    # Play every battle at once
+    results = []
+    start = time.perf_counter()
+    events = [play_battle(port, i, results) for i in range(count)]
+    finished = all(event.wait(60) for event in events)
+    elapsed = time.perf_counter() - start
+
+    # Print the results
+    failures = 0
+    print(f"{count} concurrent battles of {turns} turns on {threading.active_count()} threads")
+    print(f"  Finished: {len(results)}/{count} in {elapsed:.2f} s")
+    print(f"  Throughput: {len(results) / elapsed:.0f} battles/s, {len(results) * turns / elapsed:.0f} turns/s")
+    if results:
+        durations = sorted(duration for duration, _ in results)
+        print(f"  Battle duration: median {statistics.median(durations) * 1000:.0f} ms, " +
+              f"max {durations[-1] * 1000:.0f} ms")
+    if not finished:
+        print(f"  Mismatch: {count - len(results)} battles didn't finish")
+        failures += 1
+    played = [played for _, played in results if played != turns]
+    if played:
+        print(f"  Mismatch: {len(played)} battles ended after {played[0]} turns instead of {turns}")
+        failures += 1
+
+    # Check the edges of the transport
+    print("Checking closing, partial lines and concurrent sends")
+    failures += check_close() + check_partial_lines() + check_concurrent_sends()
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
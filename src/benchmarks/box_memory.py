@@ -0,0 +1,100 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It measures how much memory a box of 10,000 Pokemon
+# takes up, comparing the slotted classes the game uses against the
+# same data stored in plain objects with a per-instance __dict__ (which
+# is how these classes were stored before they used __slots__).
+
+# Usage: python -m src.benchmarks.box_memory [box size]
+
+# Imports
+
+import random
+import sys
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.types.ball import Ball
+from src.pokemon.types.battle_condition import BattleCondition, BattleMove
+from src.pokemon.types.capture_data import CaptureData
+from src.pokemon.types.gender import Gender
+from src.pokemon.types.nature import Nature
+from src.pokemon.types.stat import Stat
+
+# Define a function that builds the fields of a random Pokemon
+def random_fields(i: int) -> dict:
+    return {
+        "nickname": f"Pokemon {i}",
+        "egg": False,
+        "shiny": random.random() < 0.01,
+        "species": "pidgey",
+        "ability": "keen_eye",
+        "tutor_machine_moves": [],
+        "gender": random.choice([Gender.MALE, Gender.FEMALE]),
+        "nature": random.choice(list(Nature)),
+        "ivs": {stat.value: random.randint(0, 31) for stat in Stat},
+        "evs": {stat.value: 0 for stat in Stat},
+        "level": random.randint(1, 100),
+        "experience": 0,
+        "friendship": 70
+    }
+
+# Define a function that builds a box using the slotted game classes
+def build_slotted_box(size: int) -> list[Pokemon]:
+    box = []
+    for i in range(size):
+        fields = random_fields(i)
+        box.append(Pokemon(
+            **fields,
+            condition=BattleCondition(
+                health=50, status_condition=None, confused=False, held_item=None,
+                move_set=[BattleMove(f"move_{j}", 35, 35, False) for j in range(4)],
+                stat_changes=None
+            ),
+            capture_data=CaptureData(Ball.POKE_BALL, "Red", 12345)
+        ))
+    return box
+
+# Define a function that builds the same box out of objects that have a __dict__
+def build_dict_box(size: int) -> list[SimpleNamespace]:
+    box = []
+    for i in range(size):
+        fields = random_fields(i)
+        box.append(SimpleNamespace(
+            **fields,
+            condition=SimpleNamespace(
+                health=50, status_condition=None, confused=False, held_item=None,
+                move_set=[SimpleNamespace(name=f"move_{j}", pp=35, max_pp=35, disabled=False) for j in range(4)],
+                stat_changes=None
+            ),
+            capture_data=SimpleNamespace(ball=Ball.POKE_BALL, original_trainer="Red", original_trainer_id=12345),
+            uuid=uuid.uuid4()
+        ))
+    return box
+
+# Define a function that returns the memory allocated while building a box
+def measure(builder, size: int) -> int:
+    # Use the same random values for both boxes
+    random.seed(0)
+    tracemalloc.start()
+    box = builder(size)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del box
+    return allocated
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    before = measure(build_dict_box, size)
+    after = measure(build_slotted_box, size)
+
+    # Print the results
+    print(f"Box of {size} Pokemon")
+    print(f"  __dict__ objects: {before / 1024 / 1024:.2f} MiB ({before / size:.0f} bytes per Pokemon)")
+    print(f"  __slots__ objects: {after / 1024 / 1024:.2f} MiB ({after / size:.0f} bytes per Pokemon)")
+    print(f"  Saved {(before - after) / 1024 / 1024:.2f} MiB ({(1 - after / before) * 100:.1f}%)")
@@ -0,0 +1,129 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It sends the five commands that set a battle up (start,
+# both teams and both layouts) over 'AsyncTransport' many times, once with
+# every line written on its own (how the transport used to send) and once
+# with the lines queued and written together, and measures how many writes
+# and server reads each setup needs and how long its round trip takes.
+
+# The server runs on its own event loop and answers once it has received
+# all five lines of a setup, the commands are sent from a listener like
+# 'BattleWindow.on_start' does.
+
+# Usage: python -m src.benchmarks.command_batching [setup count]
+
+# Imports
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+
+from src.game.transport import AsyncTransport, get_event_loop
+
+# Define the amount of commands in a battle setup
+SETUP_COMMANDS = 5
+
+# Define the 'CountingServer' class which counts the reads needed to receive the
+# lines and answers every setup once all of its lines have been received
+class CountingServer(asyncio.Protocol):
+    def __init__(self):
+        # Initialize fields
+        self.reads = 0
+        self.lines = 0
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.reads += 1
+        self.lines += data.count(b"\n")
+        # Answer each complete setup
+        while self.lines >= SETUP_COMMANDS:
+            self.lines -= SETUP_COMMANDS
+            self.transport.write(b'{"action": "message", "output": "|turn|1"}\n')
+
+# Define the 'UnbatchedTransport' class which writes every line on its own
+# the way 'AsyncTransport.send' used to, once connected
+class UnbatchedTransport(AsyncTransport):
+    def send(self, line: str):
+        self.loop.call_soon_threadsafe(self.writer.write, (line + "\n").encode())
+
+# Define a function that builds the commands of a battle setup, with teams about
+# as long as six packed Pokemon
+def build_setup() -> list[str]:
+    team = "]".join(["Pokemon|" + "0" * 36 + "|pikachu|tackle,growl,thunder_shock,quick_attack|hardy|" +
+                     "0,0,0,0,0,0|M|31,31,31,31,31,31||50|35/35,40/40,30/30,30/30|70,poke_ball,Red,12345,"] * 6)
+    return [
+        json.dumps({"action": "command", "command": '>start {"formatid":"gen9customgame"}', "battle_id": "1"}),
+        json.dumps({"action": "command", "command": ">player p1 " + json.dumps({"name": "Player", "team": team}), "battle_id": "1"}),
+        json.dumps({"action": "command", "command": ">player p2 " + json.dumps({"name": "Opponent", "team": team}), "battle_id": "1"}),
+        json.dumps({"action": "command", "command": ">p1 team 123456", "battle_id": "1"}),
+        json.dumps({"action": "command", "command": ">p2 team 123456", "battle_id": "1"})
+    ]
+
+# Define a function that sends a setup many times over a transport, returns the amount of
+# writes and of reads the server needed per setup, and each setup's round trip time
+def run(transport_class: type, port: int, servers: list[CountingServer], count: int) -> tuple[float, float, list[float]]:
+    loop = get_event_loop()
+    setup = build_setup()
+    answered = threading.Event()
+    connections = len(servers)
+    transport = transport_class("127.0.0.1", port)
+    transport.open(lambda line: answered.set())
+    # Wait for the connection before sending, 'UnbatchedTransport' can't queue lines
+    while transport.writer is None or len(servers) == connections:
+        time.sleep(0.001)
+    server = servers[-1]
+
+    # Count the writes, each write to an idle connection is a send system call
+    writes = 0
+    write = transport.writer.write
+    def counting_write(data: bytes):
+        nonlocal writes
+        writes += 1
+        write(data)
+    transport.writer.write = counting_write
+
+    # Define a function that sends the setup from the event loop's thread like a listener does
+    def send_setup():
+        for command in setup:
+            transport.send(command)
+
+    times = []
+    for _ in range(count):
+        answered.clear()
+        start = time.perf_counter()
+        loop.call_soon_threadsafe(send_setup)
+        answered.wait(5)
+        times.append(time.perf_counter() - start)
+    transport.close()
+    return writes / count, server.reads / count, times
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    # Start the counting server on its own event loop, so it reads while the lines are being written
+    servers = []
+    def create_server() -> CountingServer:
+        servers.append(CountingServer())
+        return servers[-1]
+    server_loop = asyncio.new_event_loop()
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(
+        server_loop.create_server(create_server, "127.0.0.1", 0), server_loop
+    ).result()
+    port = server.sockets[0].getsockname()[1]
+
+    # Send the setups both ways
+    print(f"Sending {count} battle setups of {SETUP_COMMANDS} commands ({sum(map(len, build_setup())) + SETUP_COMMANDS} bytes)")
+    for name, transport_class in (("Line by line", UnbatchedTransport), ("Queued", AsyncTransport)):
+        writes, reads, times = run(transport_class, port, servers, count)
+        # Interpolate the 99th percentile between the round trips, with a single one it is that one
+        p99 = statistics.quantiles(times, n=100, method="inclusive")[98] if len(times) >= 2 else times[0]
+        print(f"  {name}: {writes:.2f} writes and {reads:.2f} reads per setup, round trip median {statistics.median(times) * 1e6:.0f} us, " +
+              f"p99 {p99 * 1e6:.0f} us")
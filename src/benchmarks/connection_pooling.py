@@ -0,0 +1,113 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It plays battles one after another against the stand-in
+# battle simulation server from 'battle_stress', the way a player goes
+# from one wild encounter to the next, and measures the time from creating
+# each 'BattleClient' to its first turn with a new connection per battle
+# (how battles used to connect) and with a warm connection pool. It then
+# plays many battles at once over a pool of two connections to check that
+# battles sharing a connection are told apart by their battle ID.
+
+# The stand-in server waits before answering a new connection to act like
+# a distant server, the delay is given in milliseconds.
+
+# Usage: python -m src.benchmarks.connection_pooling [battle count] [connect delay]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import statistics
+import sys
+import threading
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.benchmarks.battle_stress import start_stand_in_server
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.game.connection_pool import ConnectionPool
+from src.game.transport import AsyncTransport
+from src.pack_processor import load_packs
+
+# Define a function that plays a battle over a transport, returns an event that is set once the
+# battle has ended and the list its time to first turn and whether it was won are added to
+def play_battle(transport, index: int) -> tuple[threading.Event, list]:
+    done = threading.Event()
+    result = []
+    species = holder.pack.species
+    started_at = time.perf_counter()
+    battle = BattleClient(
+        [species[index % len(species)].spawn(50)],
+        [species[(index * 7 + 3) % len(species)].spawn(50)],
+        False,
+        transport
+    )
+
+    # Define the turn callback, the player always uses their first move
+    def on_turn(turn: int):
+        if turn == 1:
+            result.append(time.perf_counter() - started_at)
+        battle.select_move(Battler.PLAYER, 1)
+
+    # Define the end callback
+    def on_end(won: bool):
+        result.append(won)
+        battle.disconnect()
+        done.set()
+
+    # Set the battle up the way 'BattleWindow' does
+    battle.on(BattleEvent.STARTED, lambda: (battle.start(), battle.send_teams(), battle.send_layouts()))
+    battle.on(BattleEvent.TURN_CHANGE, on_turn)
+    battle.on(BattleEvent.END, on_end)
+    battle.create()
+    return done, result
+
+# Define a function that plays battles one after another, returns each battle's time to first turn
+def play_in_sequence(count: int, new_transport) -> list[float]:
+    times = []
+    for i in range(count):
+        done, result = play_battle(new_transport(), i)
+        if not done.wait(10):
+            raise TimeoutError(f"Battle {i} didn't finish")
+        times.append(result[0])
+    return times
+
+# Define a function that prints a summary of times to first turn
+def print_times(name: str, times: list[float]):
+    # Interpolate the 90th percentile between the times, with a single time it is that time
+    p90 = statistics.quantiles(times, n=10, method="inclusive")[8] if len(times) >= 2 else times[0]
+    print(f"    {name}: median {statistics.median(times) * 1000:.2f} ms, p90 {p90 * 1000:.2f} ms")
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 20 / 1000
+
+    # Load the packs like the game does
+    holder.pack = load_packs("packs")
+
+    print(f"Time to first turn of {count} battles in a row")
+    for connect_delay in (0, delay):
+        port = start_stand_in_server(1, connect_delay)
+        print(f"  Server answering new connections after {connect_delay * 1000:.0f} ms")
+        print_times("New connection per battle", play_in_sequence(count, lambda: AsyncTransport("127.0.0.1", port)))
+
+        # Warm the pool and wait for its connections before playing
+        pool = ConnectionPool("127.0.0.1", port)
+        pool.warm()
+        while any(connection.transport.writer is None for connection in pool.connections):
+            time.sleep(0.001)
+        time.sleep(connect_delay)
+        print_times("Warm connection pool", play_in_sequence(count, pool.session))
+        pool.close()
+
+    # Play many battles at once over two connections, a line that reaches the wrong battle names
+    # Pokemon that aren't in it, which fails that battle
+    port = start_stand_in_server(5)
+    pool = ConnectionPool("127.0.0.1", port, size=2)
+    battles = [play_battle(pool.session(), i) for i in range(count)]
+    finished = all(done.wait(30) for done, _ in battles)
+    won = sum(1 for done, result in battles if result[-1:] == [True])
+    print(f"Played {count} battles at once over {len(pool.connections)} connections: {won} won")
+    if not finished or won != count:
+        print("FAILED, some battles didn't finish")
+        sys.exit(1)
@@ -0,0 +1,133 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It plays many concurrent battles with the in-process
+# engine while the main thread runs a Tcl event loop like the Tkinter
+# thread does, with every battle's listeners called through one
+# 'TkEventDispatcher'. The listeners stand in for 'BattleWindow' by making
+# Tcl calls worth about as much as updating a widget. It checks that every
+# listener runs on the main thread, and measures how long the event loop
+# is kept busy at once (the frame time) with and without the batch budget
+# and how many health updates are coalesced.
+
+# A Tcl interpreter without Tk is used so that no display is needed, its
+# 'after' and event loop are the ones Tkinter uses.
+
+# Usage: python -m src.benchmarks.event_dispatch [battle count]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import random
+import statistics
+import sys
+import threading
+import time
+import tkinter as tk
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.benchmarks.battle_engine import build_teams
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.game.battle_engine import BattleEngine, LocalTransport
+from src.game.transport import get_event_loop
+from src.pack_processor import load_packs
+from src.utils.event_dispatcher import TkEventDispatcher
+
+# Define the amount of Tcl calls a listener makes to stand in for updating a widget
+WIDGET_CALLS = 40
+
+# Define a function that runs every battle with its listeners called through a dispatcher, returns
+# the time each event loop iteration took, the amount of listener calls, the amount of calls
+# made off the main thread and the amount of coalesced events
+def run(tcl: tk.Tcl, count: int, batch_budget: float | None, coalesce: bool) -> tuple[list[float], int, int, int]:
+    dispatcher = TkEventDispatcher(
+        tcl, coalesced_events=(BattleEvent.HEALTH_UPDATE,) if coalesce else (), batch_budget=batch_budget
+    )
+    main_thread = threading.current_thread()
+    calls = 0
+    off_thread = 0
+    ended = 0
+
+    # Define a listener that updates a stand-in widget
+    def update_widget(*_):
+        nonlocal calls, off_thread
+        calls += 1
+        if threading.current_thread() is not main_thread:
+            off_thread += 1
+        for i in range(WIDGET_CALLS):
+            tcl.call("set", "widget", i)
+
+    # Define the faint callback, the player sends out its next healthy Pokemon like 'BattleWindow' does
+    def on_faint(battle: BattleClient, pokemon):
+        healthy = [entry for entry in battle.player if entry.get_health() > 0]
+        if pokemon in battle.player and healthy:
+            battle.switch(Battler.PLAYER, healthy[0])
+
+    # Define the end callback
+    def on_end(battle: BattleClient):
+        nonlocal ended
+        ended += 1
+        battle.disconnect()
+
+    random.seed(0)
+    for i in range(count):
+        player, opponent = build_teams(i, 3)
+        battle = BattleClient(player, opponent, False, LocalTransport(BattleEngine(i)))
+        battle.dispatcher = dispatcher
+        # Set the battle up the way 'BattleWindow' does
+        battle.on(BattleEvent.STARTED, lambda battle=battle: (battle.start(), battle.send_teams(), battle.send_layouts()))
+        battle.on(BattleEvent.TURN_CHANGE, lambda turn, battle=battle: battle.select_move(
+            Battler.PLAYER, turn % len(battle.current.condition.move_set) + 1
+        ))
+        battle.on(BattleEvent.FAINTED, lambda pokemon, battle=battle: on_faint(battle, pokemon))
+        for event in (BattleEvent.HEALTH_UPDATE, BattleEvent.LOG, BattleEvent.MOVE, BattleEvent.CURRENT_POKEMON_UPDATE):
+            battle.on(event, update_widget)
+        battle.on(BattleEvent.END, lambda _, battle=battle: on_end(battle))
+        battle.create()
+
+    # Run the event loop until every battle has ended, timing each iteration
+    frames = []
+    deadline = time.perf_counter() + 120
+    while ended < count and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        tcl.dooneevent(0)
+        frames.append(time.perf_counter() - start)
+    dispatcher.close()
+    if ended < count:
+        print(f"  Mismatch: {count - ended} battles didn't finish")
+    return frames, calls, off_thread, dispatcher.coalesced
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # Load the packs like the game does
+    holder.pack = load_packs("packs")
+    get_event_loop() # Start the transport's event loop before timing
+    # Create the interpreter once, on the main thread, it must also be deleted on the thread that created it
+    tcl = tk.Tcl()
+
+    failures = 0
+    print(f"{count} concurrent battles through one dispatcher, {WIDGET_CALLS} Tcl calls per listener")
+    for name, batch_budget, coalesce in (
+        ("Unbounded batches", None, False),
+        ("Unbounded batches, coalesced", None, True),
+        ("8 ms batches, coalesced", 0.008, True)
+    ):
+        start = time.perf_counter()
+        frames, calls, off_thread, coalesced = run(tcl, count, batch_budget, coalesce)
+        elapsed = time.perf_counter() - start
+        busy = sorted(frame for frame in frames if frame > 0.0005) # Iterations that called listeners
+        print(f"  {name}: {elapsed:.2f} s, {calls} listener calls, {coalesced} health updates coalesced")
+        if busy:
+            # Interpolate the 99th percentile between the frames, with a single frame it is that frame
+            p99 = statistics.quantiles(busy, n=100, method="inclusive")[98] if len(busy) >= 2 else busy[0]
+            print(f"    Frame time: median {statistics.median(busy) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, " +
+                  f"max {busy[-1] * 1000:.1f} ms")
+        if off_thread:
+            print(f"    Mismatch: {off_thread} listener calls were made off the main thread")
+            failures += 1
+
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All listeners were called on the main thread")
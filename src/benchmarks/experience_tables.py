@@ -0,0 +1,147 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It checks that the precomputed experience tables hold the
+# growth rate formulas' exact values, that adding experience with them
+# reaches the same level with the same experience as the loop the old
+# 'Pokemon.add_exp' ran (one level at a time against
+# 'calculate_experience_needed'), for every growth rate and level with
+# whole and fractional grants, and measures how long both ways take.
+
+# Usage: python -m src.benchmarks.experience_tables [grant count]
+
+# Imports
+
+import math
+import random
+import sys
+import time
+from fractions import Fraction
+
+from src.pokemon.types.growth_rate import EXPERIENCE_SCALE, GrowthRate, MAX_LEVEL
+
+# Define a function that levels up one level at a time like the old 'Pokemon.add_exp' did, returns
+# the final level and experience. Like it, 'experience' isn't reset when a level is gained (which
+# 'gain_exp' fixed), so it is only compared with experience 0 or within a single level. The old
+# loop subtracted floats, which can lose a whole EXP of the leftover to rounding (ex: 77 EXP from
+# level 1 on FAST left 48 instead of 49), so it is evaluated with exact fractions unless 'exact' is false.
+# Amounts are read to the tables' precision, a float like 77440.8 stands for the exact decimal
+def level_up_by_loop(rate: GrowthRate, level: int, experience: int, amount: float, exact: bool = True) -> tuple[int, int]:
+    if exact:
+        amount = Fraction(amount).limit_denominator(EXPERIENCE_SCALE)
+    while amount > 0:
+        needed = rate.calculate_experience_needed(level + 1)
+        exp_needed = (Fraction(needed).limit_denominator(EXPERIENCE_SCALE) if exact else needed) - experience
+        if amount > exp_needed:
+            amount -= exp_needed
+            level += 1
+            if level >= MAX_LEVEL:
+                return level, 0 # Left over EXP is lost at the max level
+        else:
+            experience += int(amount)
+            amount = 0
+    return level, experience
+
+# Define a function that levels up with a single lookup in the experience tables the
+# way 'Pokemon.gain_exp' does, returns the final level and experience
+def level_up_by_table(rate: GrowthRate, level: int, experience: int, amount: float) -> tuple[int, int]:
+    return rate.add_experience(level, experience, amount)
+
+# Define a function that checks the tables against the formulas, returns the amount of mismatches
+def check_tables() -> int:
+    mismatches = 0
+    for rate in GrowthRate:
+        total = Fraction(0)
+        for level in range(2, MAX_LEVEL + 1):
+            expected = Fraction(rate.calculate_experience_needed(level)).limit_denominator(EXPERIENCE_SCALE)
+            total += expected
+            # The formula's value must be a whole amount of the tables' parts for the tables to be exact
+            if abs(rate.calculate_experience_needed(level) - float(expected)) > 1e-6 or \
+                    rate.get_experience_needed(level) != float(expected) or rate.get_total_experience(level) != float(total):
+                print(f"  Mismatch: {rate.name} at level {level}")
+                mismatches += 1
+    return mismatches
+
+# Define a function that checks whether a grant reaches the same level with the same experience both
+# ways, with experience the old loop kept it when a level is gained so only the level is compared then
+def matches(grant: tuple[GrowthRate, int, int, float]) -> bool:
+    rate, level, experience, amount = grant
+    expected = level_up_by_loop(rate, level, experience, amount)
+    actual = level_up_by_table(rate, level, experience, amount)
+    if experience > 0 and expected[0] > level:
+        return expected[0] == actual[0]
+    return expected == actual
+
+# Define a function that builds the grants around every level threshold of every growth rate: from
+# each level with no experience, every whole and half amount within 2 EXP of the amount needed to
+# gain 1, 2 or 3 levels, and with experience, every whole and half amount within 2 EXP of the
+# amount needed to gain 1 level
+def build_threshold_grants() -> list[tuple[GrowthRate, int, int, float]]:
+    grants = []
+    for rate in GrowthRate:
+        for level in range(1, MAX_LEVEL):
+            needed = 0
+            for target in range(level + 1, min(level + 3, MAX_LEVEL) + 1):
+                needed += rate.calculate_experience_needed(target)
+                for halves in range(max(1, math.floor(needed * 2) - 4), math.ceil(needed * 2) + 5):
+                    grants.append((rate, level, 0, halves / 2))
+            experience = int(rate.calculate_experience_needed(level + 1)) // 2
+            needed = rate.calculate_experience_needed(level + 1) - experience
+            # Stay within a single level, the old loop counted 'experience' again for every level gained
+            limit = needed + rate.calculate_experience_needed(level + 2) - experience if level + 2 <= MAX_LEVEL else math.inf
+            for halves in range(max(1, math.floor(needed * 2) - 4), math.ceil(needed * 2) + 5):
+                if halves / 2 <= limit:
+                    grants.append((rate, level, experience, halves / 2))
+    return grants
+
+# Define a function that builds random experience grants from no experience, some small enough to
+# stay within a level and some large enough to skip many levels
+def build_random_grants(count: int) -> list[tuple[GrowthRate, int, int, float]]:
+    random.seed(0)
+    grants = []
+    for _ in range(count):
+        rate = random.choice(list(GrowthRate))
+        level = random.randint(1, MAX_LEVEL - 1)
+        amount = random.choice([
+            random.randint(1, 500),
+            random.randint(1, 2_000_000),
+            random.randint(1, 4000) * 0.5, # Shared EXP is halved
+            rate.calculate_experience_needed(level + 1) # Exactly the EXP needed, doesn't level up
+        ])
+        grants.append((rate, level, 0, amount))
+    return grants
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    # Check the tables against the formulas
+    print(f"Checking {len(GrowthRate)} growth rates across levels 2-{MAX_LEVEL}")
+    failures = check_tables()
+
+    # Check that both ways of levelling up give the same result
+    threshold_grants = build_threshold_grants()
+    random_grants = build_random_grants(count)
+    print(f"Checking {len(threshold_grants)} grants around every level threshold and {count} random grants")
+    for grant in threshold_grants + random_grants:
+        if not matches(grant):
+            print(f"  Mismatch: {grant[0].name} level {grant[1]} with {grant[2]} EXP given {grant[3]} EXP: " +
+                  f"{level_up_by_loop(*grant)} level by level, {level_up_by_table(*grant)} with the tables")
+            failures += 1
+
+    # Time both ways of levelling up, the old loop in floats like it ran
+    start = time.perf_counter()
+    for grant in random_grants:
+        level_up_by_loop(*grant, exact=False)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for grant in random_grants:
+        level_up_by_table(*grant)
+    table_time = time.perf_counter() - start
+
+    # Print the results
+    print(f"  Level by level: {loop_time * 1000:.1f} ms")
+    print(f"  Table lookup: {table_time * 1000:.1f} ms ({loop_time / table_time:.1f}x faster)")
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
@@ -0,0 +1,131 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It frames 1 MB bursts of battle simulation server output
+# into lines three ways: appending to a string and splitting one line off
+# at a time (how 'BattleClient' used to), 'asyncio.StreamReader.readline'
+# and the 'LineFramer' the transport uses now. It checks that all three
+# give the same lines, and that 'LineFramer' decodes characters that are
+# split between two chunks, then measures how fast each frames the bursts.
+
+# Usage: python -m src.benchmarks.line_framing [burst count]
+
+# Imports
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+from src.game.transport import LineFramer
+
+# Define the size of each burst
+BURST_SIZE = 1 << 20
+
+# Define a function that builds a burst of battle output, mostly short protocol messages with
+# the occasional long one (such as a team request), with or without non-ASCII characters
+def build_burst(seed: int, ascii_only: bool = True) -> bytes:
+    random.seed(seed)
+    names = ["Pikachu", "Charizard", "Mr. Mime"] if ascii_only else ["Pikachu", "Flabébé", "Nidoran♀", "Mr. Mime"]
+    lines = []
+    size = 0
+    while size < BURST_SIZE:
+        if random.random() < 0.01:
+            output = "|request|" + json.dumps({"side": {"pokemon": [{"details": random.choice(names)}] * 60}}, ensure_ascii=False)
+        else:
+            output = f"|move|p1a: {random.choice(names)}|Tackle|p2a: {random.choice(names)}"
+        line = json.dumps({"action": "message", "battle_id": str(seed), "output": output}, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line.encode("utf-8"))
+    return "".join(lines).encode("utf-8")
+
+# Define a function that frames a burst received in chunks by appending each decoded chunk
+# to a string and splitting one line off at a time, the way 'BattleClient' used to
+def frame_by_string(burst: bytes, chunk_size: int) -> list[str]:
+    lines = []
+    buffer = ""
+    for offset in range(0, len(burst), chunk_size):
+        data = burst[offset:offset + chunk_size]
+        buffer += data.decode('utf-8')
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            lines.append(line)
+    return lines
+
+# Define a function that frames a burst received in chunks with 'asyncio.StreamReader.readline'
+def frame_by_stream_reader(burst: bytes, chunk_size: int) -> list[str]:
+    async def frame() -> list[str]:
+        reader = asyncio.StreamReader(limit=BURST_SIZE)
+        lines = []
+        for offset in range(0, len(burst), chunk_size):
+            reader.feed_data(burst[offset:offset + chunk_size])
+            # Read the lines that are complete, a line that isn't stays in the reader
+            while b"\n" in reader._buffer:
+                lines.append((await reader.readline())[:-1].decode("utf-8"))
+        return lines
+    return asyncio.run(frame())
+
+# Define a function that frames a burst received in chunks with a 'LineFramer', every chunk
+# is copied into the framer's buffer the way the event loop receives into it
+def frame_by_framer(burst: bytes, chunk_size: int) -> list[str]:
+    framer = LineFramer(buffer_size=chunk_size)
+    view = framer.get_buffer()
+    burst = memoryview(burst)
+    lines = []
+    for offset in range(0, len(burst), chunk_size):
+        data = burst[offset:offset + chunk_size]
+        view[:len(data)] = data
+        lines += framer.feed(len(data))
+    return lines
+
+# Define a function that checks that a 'LineFramer' decodes non-ASCII lines received
+# in random chunk sizes, returns the amount of mismatches
+def check_split_characters(bursts: int) -> int:
+    mismatches = 0
+    for seed in range(bursts):
+        burst = build_burst(seed, ascii_only=False)
+        expected = burst.decode("utf-8").split("\n")[:-1]
+        framer = LineFramer(buffer_size=4096)
+        lines = []
+        offset = 0
+        while offset < len(burst):
+            size = random.randint(1, 4096)
+            lines += framer.feed_data(burst[offset:offset + size])
+            offset += size
+        if lines != expected:
+            mismatches += 1
+    return mismatches
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    bursts = [build_burst(seed) for seed in range(count)]
+
+    # Check that split characters are decoded
+    failures = check_split_characters(3)
+
+    line_count = sum(burst.count(b"\n") for burst in bursts)
+    print(f"Framing {count} bursts of 1 MB ({line_count} lines)")
+    for chunk_size in (4096, 1 << 16, BURST_SIZE):
+        print(f"  Received in chunks of {chunk_size // 1024} KB")
+        expected = None
+        for name, frame in (
+            ("String split", frame_by_string),
+            ("StreamReader", frame_by_stream_reader),
+            ("LineFramer", frame_by_framer)
+        ):
+            start = time.perf_counter()
+            lines = [frame(burst, chunk_size) for burst in bursts]
+            elapsed = time.perf_counter() - start
+            print(f"    {name}: {count * BURST_SIZE / elapsed / (1 << 20):,.1f} MB/s")
+            # Check that every way gives the same lines
+            if expected is None:
+                expected = lines
+            elif lines != expected:
+                print(f"    Mismatch: {name}")
+                failures += 1
+
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All lines match")
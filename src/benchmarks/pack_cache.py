@@ -0,0 +1,88 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It checks that loading packs the way the game does
+# ('load_packs' with the default arguments) builds every JSON pack and
+# writes its cache on the first launch, restores it from the cache on the
+# next launch without writing it again, and that 'lazy' only keeps raw
+# records when the cache isn't used. The packs are copied to a temporary
+# folder so the real cache is left alone.
+
+# Usage: python -m src.benchmarks.pack_cache [packs directory]
+
+# Imports
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.pack_cache import get_cache_path, load_cached_pack
+from src.pack_processor import RecordList, load_pack, load_packs
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else "packs"
+
+    # Copy the JSON packs to a temporary folder without their compiled forms or cache
+    directory = tempfile.mkdtemp()
+    paths = []
+    for file_name in sorted(os.listdir(source)):
+        if file_name.endswith(".json"):
+            shutil.copy(os.path.join(source, file_name), directory)
+            paths.append(os.path.join(directory, file_name))
+    if not paths:
+        print(f"No JSON packs in {source}")
+        sys.exit(1)
+
+    failures = 0
+    print(f"{len(paths)} JSON packs")
+
+    # Load the packs the first time, every pack should be built and cached
+    start = time.perf_counter()
+    first = load_packs(directory)
+    print(f"  First launch: {(time.perf_counter() - start) * 1000:.1f} ms")
+    written = {}
+    for path in paths:
+        cached = load_cached_pack(path)
+        if cached is None:
+            print(f"  Mismatch: the first launch didn't cache {path}")
+            failures += 1
+            continue
+        written[path] = os.stat(get_cache_path(path)).st_mtime_ns
+        if isinstance(cached.species, RecordList) or isinstance(cached.moves, RecordList):
+            print(f"  Mismatch: the cache of {path} holds raw records")
+            failures += 1
+
+    # Load the packs again, every pack should be restored from its cache without writing it
+    start = time.perf_counter()
+    second = load_packs(directory)
+    print(f"  Second launch: {(time.perf_counter() - start) * 1000:.1f} ms")
+    for path, mtime in written.items():
+        if os.stat(get_cache_path(path)).st_mtime_ns != mtime:
+            print(f"  Mismatch: the second launch wrote the cache of {path} again")
+            failures += 1
+    if [entry.name for entry in first.species] != [entry.name for entry in second.species] or \
+            [entry.name for entry in first.moves] != [entry.name for entry in second.moves]:
+        print("  Mismatch: the cached packs differ from the packs they were built from")
+        failures += 1
+
+    # A pack loaded lazily without the cache keeps raw records and writes no cache
+    lazy_directory = tempfile.mkdtemp()
+    lazy_path = shutil.copy(paths[0], lazy_directory)
+    lazy = load_pack(lazy_path, lazy=True, use_cache=False)
+    if not isinstance(lazy.species, RecordList) or os.path.exists(get_cache_path(lazy_path)):
+        print("  Mismatch: a lazy load without the cache didn't keep raw records or wrote a cache")
+        failures += 1
+    # While the cache is used 'lazy' is ignored, the cached pack is returned
+    if isinstance(load_pack(paths[0], lazy=True).species, RecordList):
+        print("  Mismatch: a lazy load with a valid cache didn't restore the cached pack")
+        failures += 1
+
+    shutil.rmtree(directory)
+    shutil.rmtree(lazy_directory)
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
@@ -0,0 +1,507 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It records a corpus of battle simulation server messages
+# for a battle, checks that the protocol dispatcher produces the same events
+# as the 'if/elif' chain 'BattleClient' used before it, and measures how
+# many messages per second both can handle.
+
+# The corpus is weighted like a real battle log, most messages are moves,
+# damage and turns. Boosts are left out of the check since the chain gave
+# every boost a negative amount. The corpus leaves out '-prepare' messages and
+# switches with a status condition entirely since the chain failed on them.
+
+# Usage: python -m src.benchmarks.protocol_dispatch [message count]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import random
+import sys
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.pack_processor import load_packs
+
+# Define the 'RecordedTransport' class which stands in for a connection, nothing is
+# ever received and everything sent is dropped since the corpus is handled directly
+class RecordedTransport:
+    def open(self, on_line, on_close=None, on_message=None):
+        pass
+
+    def send(self, line: str):
+        pass
+
+    def close(self):
+        pass
+
+# Define a function that records a corpus of messages between the current Pokemon of a battle
+def record_corpus(battle: BattleClient, count: int) -> list[str]:
+    random.seed(0)
+    player = f"p1a: {battle.current.uuid}"
+    opponent = f"p2a: {battle.current_opponent.uuid}"
+    sides = [(player, battle.current), (opponent, battle.current_opponent)]
+
+    # Define functions that build each kind of message for a side, with the weight of each kind
+    def health(pokemon) -> str:
+        max_health = pokemon.get_max_health()
+        return f"{random.randint(1, max_health)}/{max_health}" + random.choice(["", "", " par", " brn"])
+
+    def pp(pokemon) -> str:
+        return ", ".join(f"{move.replace('_', '')}: {random.randint(0, 30)}" for move in pokemon.get_moves())
+
+    kinds = [
+        (30, lambda uuid, pokemon, other: f"|move|{uuid}|Tackle|{other}" + random.choice(["", "", "|[miss]", "|[still]"])),
+        (25, lambda uuid, pokemon, other: f"|-damage|{uuid}|{health(pokemon)}"),
+        (10, lambda uuid, pokemon, other: f"|-damage|{uuid}|{random.randint(1, 100)}/100"),
+        (10, lambda uuid, pokemon, other: f"|turn|{random.randint(1, 50)}"),
+        (8, lambda uuid, pokemon, other: f"|pp_update|{uuid}|{pp(pokemon)}"),
+        (4, lambda uuid, pokemon, other: f"|-supereffective|{uuid}"),
+        (4, lambda uuid, pokemon, other: f"|-resisted|{uuid}"),
+        (3, lambda uuid, pokemon, other: f"|-crit|{uuid}"),
+        (3, lambda uuid, pokemon, other: f"|-boost|{uuid}|atk|{random.randint(1, 2)}"),
+        (3, lambda uuid, pokemon, other: f"|-unboost|{uuid}|def|{random.randint(1, 2)}"),
+        (2, lambda uuid, pokemon, other: f"|switch|{uuid}|Pokemon, L50|{pokemon.get_max_health()}/{pokemon.get_max_health()}"),
+        (2, lambda uuid, pokemon, other: f"|heal|{uuid}|{health(pokemon)}|[from] item: Leftovers"),
+        (2, lambda uuid, pokemon, other: f"|-status|{uuid}|{random.choice(['par', 'brn', 'slp', 'tox'])}"),
+        (1, lambda uuid, pokemon, other: f"|-curestatus|{uuid}|par"),
+        (1, lambda uuid, pokemon, other: f"|-immune|{uuid}"),
+        (1, lambda uuid, pokemon, other: f"|-fail|{uuid}|move: Substitute"),
+        (1, lambda uuid, pokemon, other: f"|-start|{uuid}|confusion"),
+        (1, lambda uuid, pokemon, other: f"|-end|{uuid}|confusion"),
+        (1, lambda uuid, pokemon, other: f"|-ability|{uuid}|Intimidate"),
+        (1, lambda uuid, pokemon, other: f"|-ability|{uuid}|Trace|[from] ability: Trace"),
+        (1, lambda uuid, pokemon, other: f"|-weather|{random.choice(['RainDance', 'Sandstorm', 'none'])}"),
+        (1, lambda uuid, pokemon, other: f"|-sidestart|p1: Player|move: Reflect"),
+        (1, lambda uuid, pokemon, other: f"|-hitcount|{other}|{random.randint(2, 5)}"),
+        (1, lambda uuid, pokemon, other: f"|-singleturn|{uuid}|Protect"),
+        (1, lambda uuid, pokemon, other: "|"),
+        (1, lambda uuid, pokemon, other: "|upkeep"),
+        (1, lambda uuid, pokemon, other: f"|-activate|{uuid}|move: Protect"), # Not handled by either
+    ]
+    weights = [weight for weight, _ in kinds]
+    builders = [builder for _, builder in kinds]
+
+    corpus = []
+    for _ in range(count):
+        side = random.randint(0, 1)
+        uuid, pokemon = sides[side]
+        corpus.append(random.choices(builders, weights)[0](uuid, pokemon, sides[1 - side][0]))
+    return corpus
+
+# Define a function that handles a message with the 'if/elif' chain 'BattleClient' used
+# before the protocol dispatcher, copied as it was with 'call' in place of '__call_event'
+def handle_by_chain(battle: BattleClient, message: str, call):
+    # Check if message contains any pipe deliminators
+    if "|" in message:
+        # Split the message by the pipe deliminator
+        args = message.split("|")
+
+        # Message action
+        action = args[1]
+
+        # Handle each action accordingly
+
+        if action == "move":
+            # Split arguments
+            user = battle.get_pokemon_by_uuid(args[2])
+            move = args[3]
+            target = battle.get_pokemon_by_uuid(args[4]) if len(args) >= 5 and ": " in args[4] else None
+            # Call the move event
+            call(
+                BattleEvent.MOVE,
+                user, move, target,
+                True if "[miss]" in message else False,
+                True if "[still]" in message else False,
+            )
+        elif action == "-boost" or action == "-unboost":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            stat = args[3]
+            amount = int(args[4])
+            # Flip sign of 'amount' if action is unboost
+            amount *= -1
+            # Call the stat change event
+            call(
+                BattleEvent.STAT_CHANGE,
+                target, stat, amount,
+            )
+        elif action == "turn":
+            # Split arguments
+            current_turn = int(args[2])
+            # Call the turn update event
+            call(
+                BattleEvent.TURN_CHANGE,
+                current_turn
+            )
+        elif action == "switch":
+            # Split arguments
+            side = args[2].split(":")[0][1:-1] # Slice a string, ex: abcde -> bcd
+            target = battle.get_pokemon_by_uuid(args[2])
+
+            # Check battler and assign current Pokemon
+            if side == Battler.PLAYER.value:
+                battle.current = target
+            elif side == Battler.AI.value:
+                battle.current_opponent = target
+
+            # Call the switch Pokemon event
+            call(
+                BattleEvent.CURRENT_POKEMON_UPDATE,
+                battle.current, battle.current_opponent
+            )
+
+            # Split arguments to determine health
+            raw_health = args[4].split("/")
+            health = int(raw_health[0])
+            max_health = int(raw_health[1])
+
+            # Check if max health matches the Pokemon's health stat
+            # This is because HP is sent in two formats, current/max and
+            # current hp percent / 100
+            if max_health == target.get_max_health():
+                # Determine targeted battler
+                if target == battle.current:
+                    battler = Battler.PLAYER
+                else:
+                    battler = Battler.AI
+                # Call a health update event
+                call(BattleEvent.HEALTH_UPDATE, battler, health)
+        elif action == "-damage" and "fnt" not in message:
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Split arguments to determine health
+            raw_health = args[3].split("/")
+            # Clean out the status condition
+            if " " in raw_health[1]:
+                raw_health[1] = raw_health[1].split(" ")[0]
+            health = int(raw_health[0])
+            max_health = int(raw_health[1])
+
+            # Check if max health matches the Pokemon's health stat
+            # This is because HP is sent in two formats, current/max and
+            # current hp percent / 100
+            if max_health == target.get_max_health():
+                # Determine targeted battler
+                if target == battle.current:
+                    battler = Battler.PLAYER
+                    # Update battle condition
+                    battle.current.condition.health = health
+                else:
+                    battler = Battler.AI
+                    # Update battle condition
+                    battle.current_opponent.condition.health = health
+                # Call a health update event
+                call(BattleEvent.HEALTH_UPDATE, battler, health)
+        elif action == "pp_update":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            raw_move_pps = args[3]
+            raw_pps = raw_move_pps.split(", ")
+            # Initialize PP dictionary
+            pp = {}
+            # Iterate each move
+            for data in raw_pps:
+                # Split arguments
+                move_name = data.split(": ")[0]
+                # Iterate target's move set
+                for move in target.get_moves():
+                    # Check if move_name matches this move loosely
+                    if move.replace("_", "").lower() == move_name.lower():
+                        # Move's match
+                        move_name = move
+                pp_count = int(data.split(": ")[1])
+                # Add pair to PP dictionary
+                pp[move_name] = pp_count
+            # Call the PP update event
+            call(BattleEvent.PP_UPDATE, target, pp)
+        elif action == "-crit":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.CRITICAL_HIT, target)
+        elif action == "-supereffective":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.SUPER_EFFECTIVE, target)
+        elif action == "-resisted":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.RESISTED, target)
+        elif action == "-immune":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.IMMUNE, target)
+        elif action == "faint":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Set Pokemon's health to 0
+            target.condition.health = 0
+            # Call the faint event
+            call(BattleEvent.FAINTED, target)
+        elif action == "win":
+            # Split arguments
+            winner = args[2]
+            # Check if winner is 'player'
+            if winner == "player":
+                won = True
+            else:
+                won = False
+            # Call the event
+            call(BattleEvent.END, won)
+        elif action == "-fail":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            action = args[3]
+            # Call the event
+            call(BattleEvent.FAILED, target, action)
+        elif action == "-block":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            effect = args[3]
+            move = args[4]
+            attacker = battle.get_pokemon_by_uuid(args[5])
+            # Call the event
+            call(BattleEvent.BLOCKED, target, effect, move, attacker)
+        elif action == "heal":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Split arguments to determine health
+            raw_health = args[3].split("/")
+            # Clean out the status condition
+            if " " in raw_health[1]:
+                raw_health[1] = raw_health[1].split(" ")[0]
+            health = int(raw_health[0])
+            max_health = int(raw_health[1])
+
+            # Call the heal event
+            call(BattleEvent.HEAL, target)
+
+            # Check if max health matches the Pokemon's health stat
+            # This is because HP is sent in two formats, current/max and
+            # current hp percent / 100
+            if max_health == target.get_max_health():
+                # Determine targeted battler
+                if target == battle.current:
+                    battler = Battler.PLAYER
+                    # Update battle condition
+                    battle.current.condition.health = health
+                else:
+                    battler = Battler.AI
+                    # Update battle condition
+                    battle.current_opponent.condition.health = health
+                # Call a health update event
+                call(BattleEvent.HEALTH_UPDATE, battler, health)
+        elif action == "-status":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            status = battle.resolve_status_condition_message(args[3])
+            # Call the event
+            call(BattleEvent.STATUS_INFLICTED, target, status)
+        elif action == "-curestatus":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            status = battle.resolve_status_condition_message(args[3])
+            # Call the event
+            call(BattleEvent.STATUS_CURED, target, status)
+        elif action == "-cureteam":
+            # Split arguments
+            user = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.TEAM_STATUS_CURED, user)
+        elif action == "-swapboost":
+            # Split arguments
+            user = battle.get_pokemon_by_uuid(args[2])
+            target = battle.get_pokemon_by_uuid(args[3])
+            stats = args[4]
+            # Call the event
+            call(BattleEvent.STAT_SWAPPED, user, target, stats)
+        elif action == "-invertboost":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.STAT_CHANGES_INVERTED, target)
+        elif action == "-clearboost":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.STAT_CHANGES_CLEARED, target)
+        elif action == "-clearallboost":
+            # Call the event
+            call(BattleEvent.ALL_STAT_CHANGES_CLEARED)
+        elif action == "-clearpositiveboost":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            user = battle.get_pokemon_by_uuid(args[3])
+            effect = battle.get_pokemon_by_uuid(args[4])
+            # Call the event
+            call(BattleEvent.CLEAR_POSITIVE_STAT_CHANGES, target, user, effect)
+        elif action == "-clearnegativeboost":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.CLEAR_NEGATIVE_STAT_CHANGES, target)
+        elif action == "-copyboost":
+            # Split arguments
+            user = battle.get_pokemon_by_uuid(args[2])
+            target = battle.get_pokemon_by_uuid(args[3])
+            # Call the event
+            call(BattleEvent.COPY_STAT_CHANGES, user, target)
+        elif action == "-weather":
+            # Split arguments
+            weather = args[2]
+            # Call the event
+            call(BattleEvent.WEATHER, weather)
+        elif action == "-fieldstart":
+            # Split arguments
+            condition = args[2]
+            # Call the event
+            call(BattleEvent.FIELD_START, condition)
+        elif action == "-fieldend":
+            # Split arguments
+            condition = args[2]
+            # Call the event
+            call(BattleEvent.FIELD_END, condition)
+        elif action == "-sidestart":
+            # Split arguments
+            side = args[2]
+            condition = args[3]
+            # Call the event
+            call(BattleEvent.SIDE_START, side, condition)
+        elif action == "-sideend":
+            # Split arguments
+            side = args[2]
+            condition = args[3]
+            # Call the event
+            call(BattleEvent.SIDE_END, side, condition)
+        elif action == "-swapsideconditions":
+            # Call the event
+            call(BattleEvent.SWAP_SIDE_CONDITIONS)
+        elif action == "-start":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            effect = args[3]
+            # Call the event
+            call(BattleEvent.VOLATILE_STATUS_STARTED, target, effect)
+        elif action == "-end":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            effect = args[3]
+            # Call the event
+            call(BattleEvent.VOLATILE_STATUS_ENDED, target, effect)
+        elif action == "-ability" and "[from]" in message:
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            ability = args[3]
+            effect = args[4].replace("[from]", "")
+            # Call the event
+            call(BattleEvent.ABILITY_CHANGED, target, ability, effect)
+        elif action == "-ability" and "[from]" not in message:
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            ability = args[3]
+            # Call the event
+            call(BattleEvent.ABILITY_ACTIVATED, target, ability)
+        elif action == "-endability":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            # Call the event
+            call(BattleEvent.ABILITY_ENDED, target)
+        elif action == "-transform":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            species = args[3]
+            # Call the event
+            call(BattleEvent.TRANSFORM, target, species)
+        elif action == "-prepare" and len(args) == 3:
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            move = args[3]
+            # Call the event
+            call(BattleEvent.PREPARE_AGAINST_UNKNOWN, target, move)
+        elif action == "-prepare" and len(args) == 4:
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            move = args[3]
+            defender = args[4]
+            # Call the event
+            call(BattleEvent.PREPARE_AGAINST_UNKNOWN, target, move, defender)
+        elif action == "-nothing":
+            # Call the event
+            call(BattleEvent.NOTHING)
+        elif action == "-hitcount":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            hits = int(args[3])
+            # Call the event
+            call(BattleEvent.MOVE_MULTI_HIT, target, hits)
+        elif action == "-singlemove":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            move = args[3]
+            # Call the event
+            call(BattleEvent.SINGLE_MOVE, target, move)
+        elif action == "-singleturn":
+            # Split arguments
+            target = battle.get_pokemon_by_uuid(args[2])
+            move = args[3]
+            # Call the event
+            call(BattleEvent.SINGLE_TURN, target, move)
+
+# Define a function that handles a message with the protocol dispatcher the way 'BattleClient' does
+def handle_by_dispatcher(battle: BattleClient, message: str, call):
+    battle.protocol.dispatch(battle, message, call)
+
+# Define a function that returns the shortest time out of several runs of a handler over the messages
+def best_time(handler, battle: BattleClient, messages: list[str], call, runs: int = 5) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for message in messages:
+            handler(battle, message, call)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    # Load the packs like the game does and create a battle that isn't connected anywhere
+    holder.pack = load_packs("packs")
+    species = holder.pack.species
+    battle = BattleClient([species[0].spawn(50)], [species[3].spawn(50)], False, RecordedTransport())
+    battle.listeners.clear() # Don't let the AI pick moves while the corpus is handled
+    corpus = record_corpus(battle, count)
+
+    # Check that both produce the same events
+    mismatches = 0
+    for message in corpus:
+        if message.startswith("|-boost|"):
+            continue
+        chain_events, dispatcher_events = [], []
+        handle_by_chain(battle, message, lambda event, *args: chain_events.append((event, args)))
+        handle_by_dispatcher(battle, message, lambda event, *args: dispatcher_events.append((event, args)))
+        if chain_events != dispatcher_events:
+            if mismatches < 5:
+                print(f"  Mismatch: {message}\n    {chain_events}\n    {dispatcher_events}")
+            mismatches += 1
+
+    # Time both ways of handling the whole corpus and only the messages with less common actions,
+    # which the chain compared against most of its actions first. Events are called without listeners
+    call = battle._BattleClient__call_event
+    common = ("|move|", "|-damage|", "|turn|", "|-boost|", "|-unboost|", "|switch|", "|pp_update|")
+    rare = [message for message in corpus if not message.startswith(common)]
+    print(f"Handling {count} recorded messages across {len(battle.protocol.parsers)} actions (best of 5 runs)")
+    for name, messages in (("All messages", corpus), (f"{len(rare)} less common messages", rare)):
+        chain_time = best_time(handle_by_chain, battle, messages, call)
+        dispatcher_time = best_time(handle_by_dispatcher, battle, messages, call)
+        print(f"  {name}")
+        print(f"    If/elif chain: {len(messages) / chain_time:,.0f} messages/s")
+        print(f"    Dispatch table: {len(messages) / dispatcher_time:,.0f} messages/s ({chain_time / dispatcher_time:.2f}x the chain)")
+    if mismatches:
+        print(f"FAILED with {mismatches} mismatched messages")
+        sys.exit(1)
+    print("All events match")
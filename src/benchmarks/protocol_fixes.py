@@ -0,0 +1,101 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It checks the messages the 'if/elif' chain 'BattleClient'
+# used before the protocol dispatcher got wrong: boosts were reported as
+# negative, '-heal' and '-mustrecharge' weren't handled, '-prepare' raised
+# an IndexError and a switch with a status condition (ex: 52/100 par) failed
+# to parse its health. Every message is delivered as a line the way a
+# transport would and the events the battle's listeners are called with are
+# compared against the expected ones.
+
+# Usage: python -m src.benchmarks.protocol_fixes
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import json
+import sys
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.pack_processor import load_packs
+
+# Define the 'LineTransport' class which stands in for a connection, lines are delivered
+# to the battle by hand and everything sent is dropped
+class LineTransport:
+    def __init__(self):
+        # Initialize fields
+        self.on_line = None
+
+    def open(self, on_line, on_close=None, on_message=None):
+        self.on_line = on_line
+
+    def send(self, line: str):
+        pass
+
+    def close(self):
+        pass
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    # Load the packs like the game does and create a battle that isn't connected anywhere
+    holder.pack = load_packs("packs")
+    species = holder.pack.species
+    transport = LineTransport()
+    battle = BattleClient([species[0].spawn(50)], [species[3].spawn(50)], False, transport)
+    battle.listeners.clear() # Don't let the AI pick moves while the messages are handled
+
+    # Record every event the battle calls
+    events = []
+    for event_type in BattleEvent:
+        battle.on(event_type, lambda *args, event_type=event_type: events.append((event_type, args)))
+
+    player, opponent = battle.current, battle.current_opponent
+    player_id, opponent_id = f"p1a: {player.uuid}", f"p2a: {opponent.uuid}"
+    max_health = opponent.get_max_health()
+
+    # Define each message with the events it should call, in order
+    cases = [
+        (f"|-boost|{player_id}|atk|2", [(BattleEvent.STAT_CHANGE, (player, "atk", 2))]),
+        (f"|-unboost|{opponent_id}|def|1", [(BattleEvent.STAT_CHANGE, (opponent, "def", -1))]),
+        (f"|-heal|{opponent_id}|30/{max_health}|[from] item: Leftovers", [
+            (BattleEvent.HEAL, (opponent,)), (BattleEvent.HEALTH_UPDATE, (Battler.AI, 30))
+        ]),
+        (f"|heal|{opponent_id}|31/{max_health} brn", [
+            (BattleEvent.HEAL, (opponent,)), (BattleEvent.HEALTH_UPDATE, (Battler.AI, 31))
+        ]),
+        (f"|-mustrecharge|{player_id}", [(BattleEvent.MUST_RECHARGE, (player,))]),
+        (f"|-prepare|{player_id}|Solar Beam", [(BattleEvent.PREPARE_AGAINST_UNKNOWN, (player, "Solar Beam"))]),
+        (f"|-prepare|{player_id}|Solar Beam|{opponent_id}", [
+            (BattleEvent.PREPARE_AGAINST_KNOWN, (player, "Solar Beam", opponent_id))
+        ]),
+        (f"|switch|{opponent_id}|Pokemon, L50|52/{max_health} par", [
+            (BattleEvent.CURRENT_POKEMON_UPDATE, (player, opponent)), (BattleEvent.HEALTH_UPDATE, (Battler.AI, 52))
+        ]),
+    ]
+
+    failures = 0
+    print(f"Checking {len(cases)} messages")
+    for message, expected in cases:
+        events.clear()
+        try:
+            transport.on_line(json.dumps({"action": "message", "output": message}))
+        except Exception as e:
+            print(f"  Mismatch: {message} raised {e!r}")
+            failures += 1
+            continue
+        # Leave out the log event every message calls
+        actual = [event for event in events if event[0] != BattleEvent.LOG]
+        if actual != expected:
+            print(f"  Mismatch: {message}\n    expected {expected}\n    got {actual}")
+            failures += 1
+
+    # A heal updates the battle condition of the Pokemon, a switch in doesn't
+    if opponent.condition.health != 31:
+        print(f"  Mismatch: the opponent's battle condition has {opponent.condition.health} health after healing to 31")
+        failures += 1
+
+    if failures:
+        print(f"FAILED with {failures} mismatches")
+        sys.exit(1)
+    print("All checks passed")
@@ -0,0 +1,111 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It measures how long 'Save.from_obj' takes to restore
+# a large save (a full team and many boxes of Pokemon), and how long the
+# enum lookups it performs take with the lookup tables compared to the
+# linear scan every enum's 'of' method used to do.
+
+# Usage: python -m src.benchmarks.save_load [box count]
+
+# Imports
+
+import random
+import sys
+import time
+from enum import Enum
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.save import Save
+from src.generator.tools.purifier import purify_obj
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.types.ball import Ball
+from src.pokemon.types.battle_condition import BattleCondition, BattleMove
+from src.pokemon.types.capture_data import CaptureData
+from src.pokemon.types.gender import Gender
+from src.pokemon.types.nature import Nature
+from src.pokemon.types.stat import Stat
+
+# Define the amount of Pokemon in a box
+BOX_SIZE = 30
+
+# Define a function that builds a random Pokemon
+def random_pokemon(i: int) -> Pokemon:
+    return Pokemon(
+        f"Pokemon {i}",
+        False,
+        random.random() < 0.01,
+        "pidgey",
+        "keen_eye",
+        [],
+        random.choice([Gender.MALE, Gender.FEMALE]),
+        random.choice(list(Nature)),
+        {stat.value: random.randint(0, 31) for stat in Stat},
+        {stat.value: 0 for stat in Stat},
+        random.randint(1, 100),
+        0,
+        70,
+        BattleCondition(
+            health=50, status_condition=None, confused=False, held_item=None,
+            move_set=[BattleMove(f"move_{j}", 35, 35, False) for j in range(4)],
+            stat_changes=None
+        ),
+        CaptureData(random.choice(list(Ball)), "Red", 12345)
+    )
+
+# Define a function that builds the purified dictionary of a large save, the
+# same form 'Save.from_obj' receives after the save file is read
+def build_save_obj(box_count: int) -> dict:
+    random.seed(0)
+    save = Save(
+        "Red", 12345, 0, "bulbasaur", 1,
+        [random_pokemon(i) for i in range(6)],
+        [[random_pokemon(i) for i in range(BOX_SIZE)] for _ in range(box_count)],
+        0, {"poke_ball": 10}, 0, 0, 0
+    )
+    return purify_obj(save)
+
+# Define a function that looks up an enumeration the way every 'of' method used to,
+# by iterating all enumerations and comparing their lower-case names
+def linear_of(enum: type[Enum], value: str) -> Enum:
+    for entry in enum:
+        if entry.name.lower() == value.lower():
+            return entry
+    raise KeyError(value)
+
+# Define a function that collects the enum strings a save's Pokemon are parsed from
+def collect_enum_values(obj: dict) -> list[tuple[type[Enum], str]]:
+    values = []
+    for entry in obj["team"] + [entry for box in obj["box"] for entry in box]:
+        values.append((Gender, entry["gender"]))
+        values.append((Nature, entry["nature"]))
+        values.append((Ball, entry["capture_data"]["ball"]))
+    return values
+
+# Define a function that returns the fastest time out of several runs of a callback
+def best_of(callback, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        callback()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    box_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    obj = build_save_obj(box_count)
+    values = collect_enum_values(obj)
+
+    # Time restoring the whole save
+    restore = best_of(lambda: Save.from_obj(obj))
+    # Time only the enum lookups, using the lookup tables and using a linear scan
+    table = best_of(lambda: [enum.of(value) for enum, value in values])
+    linear = best_of(lambda: [linear_of(enum, value) for enum, value in values])
+
+    # Print the results
+    pokemon_count = 6 + box_count * BOX_SIZE
+    print(f"Save with {pokemon_count} Pokemon ({len(values)} enum lookups)")
+    print(f"  Save.from_obj: {restore * 1000:.1f} ms ({restore / pokemon_count * 1e6:.2f} us per Pokemon)")
+    print(f"  Enum lookups (lookup table): {table * 1000:.1f} ms")
+    print(f"  Enum lookups (linear scan): {linear * 1000:.1f} ms")
+    print(f"  Lookup tables are {linear / table:.1f}x faster")
@@ -0,0 +1,69 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It checks that the NumPy stat engine calculates exactly
+# the same stats as 'Pokemon.calculate_stat' and measures how long both
+# take for a large amount of Pokemon. Requires NumPy.
+
+# Usage: python -m src.benchmarks.stat_engine [pokemon count]
+
+# Imports
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.stat_engine import STAT_ORDER, calculate_stats, get_nature_modifier_table
+from src.pokemon.types.gender import Gender
+from src.pokemon.types.nature import Nature
+
+# Define a function that builds a Pokemon with random IVs, EVs, level and nature,
+# along with random base stats for its species
+def random_pokemon() -> tuple[Pokemon, dict]:
+    pokemon = Pokemon(
+        "Pokemon", False, False, "pidgey", "keen_eye", [], Gender.MALE,
+        random.choice(list(Nature)),
+        {stat.value: random.randint(0, 31) for stat in STAT_ORDER},
+        {stat.value: random.choice([0, 252, random.randint(0, 252)]) for stat in STAT_ORDER},
+        random.randint(1, 100), 0, 70, None, None
+    )
+    base_stats = {stat.value: random.randint(1, 255) for stat in STAT_ORDER}
+    return pokemon, base_stats
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    random.seed(0)
+    entries = [random_pokemon() for _ in range(count)]
+
+    # Calculate the stats one at a time
+    start = time.perf_counter()
+    expected = [[pokemon.calculate_stat(stat, base_stats) for stat in STAT_ORDER] for pokemon, base_stats in entries]
+    single_time = time.perf_counter() - start
+
+    # Gather the arrays for the engine
+    base_stats = np.array([[base[stat.value] for stat in STAT_ORDER] for _, base in entries])
+    ivs = np.array([[pokemon.ivs[stat.value] for stat in STAT_ORDER] for pokemon, _ in entries])
+    evs = np.array([[pokemon.evs[stat.value] for stat in STAT_ORDER] for pokemon, _ in entries])
+    levels = np.array([pokemon.level for pokemon, _ in entries])
+    modifiers = get_nature_modifier_table(pokemon.nature for pokemon, _ in entries)
+
+    # Calculate the stats in one pass
+    start = time.perf_counter()
+    stats = calculate_stats(base_stats, ivs, evs, levels, modifiers)
+    batch_time = time.perf_counter() - start
+
+    # Compare every stat
+    mismatches = int(np.count_nonzero(stats != np.array(expected)))
+
+    # Print the results
+    print(f"Stats of {count} Pokemon")
+    print(f"  Pokemon.calculate_stat: {single_time * 1000:.1f} ms")
+    print(f"  Stat engine: {batch_time * 1000:.1f} ms ({single_time / batch_time:.0f}x faster)")
+    if mismatches:
+        print(f"FAILED with {mismatches} mismatched stats")
+        sys.exit(1)
+    print("All stats match")
@@ -0,0 +1,97 @@
+# This file acts as a one-time script instead of a module of the
+# main program. It checks that the cached 'Pokemon.pack_string' gives
+# exactly the same strings as building the whole string every time
+# (how it used to work) and measures how many six-Pokemon teams both
+# can pack per second while health and PP change between battles.
+
+# Usage: python -m src.benchmarks.team_packing [team count]
+
+# Imports
+
+import random
+import sys
+import time
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.types.ball import Ball
+from src.pokemon.types.battle_condition import BattleCondition, BattleMove
+from src.pokemon.types.capture_data import CaptureData
+from src.pokemon.types.gender import Gender
+from src.pokemon.types.nature import Nature
+from src.pokemon.types.stat import Stat
+
+# Define a function that packs a Pokemon by building the whole string, the way
+# 'Pokemon.pack_string' did before its parts were cached
+def pack_string_uncached(pokemon: Pokemon) -> str:
+    head, middle, tail = pokemon.build_pack_parts()
+    pps = ",".join([f"{move.pp}/{move.max_pp}" for move in pokemon.condition.move_set])
+    return f"{head}{pokemon.condition.health}{middle}{pps}{tail}"
+
+# Define a function that builds a random Pokemon
+def random_pokemon(i: int) -> Pokemon:
+    return Pokemon(
+        f"Pokemon {i}", False, random.random() < 0.05, "pidgey", "keen_eye", [],
+        random.choice([Gender.MALE, Gender.FEMALE, Gender.GENDERLESS]),
+        random.choice(list(Nature)),
+        {stat.value: random.randint(0, 31) for stat in Stat},
+        {stat.value: random.randint(0, 252) for stat in Stat},
+        random.randint(1, 100), 0, 70,
+        BattleCondition(
+            health=random.randint(1, 300), status_condition=None, confused=False, held_item=None,
+            move_set=[BattleMove(f"move_{j}", 35, 35, False) for j in range(random.randint(1, 4))],
+            stat_changes=None
+        ),
+        CaptureData(random.choice(list(Ball)), "Red", 12345)
+    )
+
+# Define a function that changes the volatile fields of a team the way a battle does,
+# and every so often a field that is cached
+def play_battle(team: list[Pokemon]):
+    for pokemon in team:
+        pokemon.condition.health = random.randint(0, 300)
+        for move in pokemon.condition.move_set:
+            move.pp = random.randint(0, move.max_pp)
+    pokemon = random.choice(team)
+    change = random.random()
+    if change < 0.05:
+        pokemon.level = min(100, pokemon.level + 1)
+    elif change < 0.1:
+        pokemon.evs["attack"] = min(252, pokemon.evs["attack"] + 1)
+        pokemon.invalidate_stats()
+    elif change < 0.15:
+        pokemon.condition.move_set[0] = BattleMove(f"move_{random.randint(0, 100)}", 20, 20, False)
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    random.seed(0)
+    teams = [[random_pokemon(i) for i in range(6)] for _ in range(50)]
+
+    # Check that both ways give the same strings while the teams change
+    mismatches = 0
+    for _ in range(2000):
+        team = random.choice(teams)
+        play_battle(team)
+        if "]".join(pokemon.pack_string() for pokemon in team) != "]".join(pack_string_uncached(pokemon) for pokemon in team):
+            mismatches += 1
+
+    # Time packing teams both ways
+    start = time.perf_counter()
+    for i in range(count):
+        "]".join([pack_string_uncached(pokemon) for pokemon in teams[i % len(teams)]])
+    uncached_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(count):
+        "]".join([pokemon.pack_string() for pokemon in teams[i % len(teams)]])
+    cached_time = time.perf_counter() - start
+
+    # Print the results
+    print(f"Packing {count} teams of 6 Pokemon")
+    print(f"  Building every string: {count / uncached_time:,.0f} teams/s")
+    print(f"  Cached parts: {count / cached_time:,.0f} teams/s ({uncached_time / cached_time:.1f}x faster)")
+    if mismatches:
+        print(f"FAILED with {mismatches} mismatched teams")
+        sys.exit(1)
+    print("All packed teams match")
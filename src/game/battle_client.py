@@ -6,12 +6,13 @@
 import json
 import math
 import random
-import socket
-import threading
 from enum import Enum
 from typing import Any, Callable
 
 from src import holder
+from src.game.battle_recorder import INBOUND, OUTBOUND, BattleRecorder
+from src.game.protocol import ProtocolDispatcher
+from src.game.connection_pool import get_connection_pool
 from src.pokemon.pokemon import Pokemon
 from src.pokemon.types.ball import Ball
 from src.pokemon.types.catch_context import CatchContext
@@ -21,6 +22,10 @@ from src.pokemon.types.encounter_type import EncounterType
 host = "129.153.58.254"
 port = 3000
 
+# Define whether battles are simulated in-process by the battle engine instead of
+# on the battle simulation server
+simulate_locally = True
+
 # Define an enum to separate the player and an AI opponent
 class Battler(Enum):
     PLAYER = "1"
@@ -81,8 +86,10 @@ class BattleEvent(Enum):
 class BattleClient:
     # Class constructor method takes a list of Pokemon for the
     # player's team and a list of Pokemon for the opponents team
-    # and an is_trainer flag
-    def __init__(self, player: list[Pokemon], opponent: list[Pokemon], is_trainer: bool):
+    # and an is_trainer flag, and optionally the transport to reach
+    # the battle simulation server with (defaults to the in-process battle
+    # engine or a pooled connection to the public server)
+    def __init__(self, player: list[Pokemon], opponent: list[Pokemon], is_trainer: bool, transport=None):
         # Initialize fields
         self.player = player
         self.opponent = opponent
@@ -100,23 +107,36 @@ class BattleClient:
         self.is_trainer = is_trainer
         self.turn = 0
 
-        # Create socket for making TCP requests
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((host, port))
-        self.connected = True
-        self.logs = []
-
-        # Add debugging print to notify that a connection was established
-        print(f"Established connection with battle simulation server ({host}:{port})")
-
-        # Start listening to messages
-        self.start_listening()
-
         # Initialize list for listeners
         self.listeners: dict[BattleEvent, list[Callable[[...], None]]] = {}
+        self.logs = []
+        # Initialize the dispatcher that listeners are called through, without one listeners are called
+        # right away on the thread the event happened on (see 'TkEventDispatcher')
+        self.dispatcher = None
+        # Initialize the recorder that every line sent and received is written to, if any (see 'record')
+        self.recorder: BattleRecorder | None = None
+
+        # Use the shared protocol dispatcher, a battle that needs its own parsers
+        # can replace this with a copy of it
+        self.protocol = protocol
+
+        # Use the in-process battle engine or a pooled connection to the battle simulation server, this
+        # doesn't wait for the connection and anything sent while connecting is sent once connected
+        if transport is None:
+            if simulate_locally:
+                # Import here to avoid circular import error
+                from src.game.battle_engine import LocalTransport
+                transport = LocalTransport()
+            else:
+                transport = get_connection_pool(host, port).session()
+        self.transport = transport
+        self.connected = True
+        self.start_listening()
 
         # Initialize a list to store all Pokemon relevant to this battle by their UUID
         self.pokemon: dict[str, Pokemon] = {}
+        # Initialize a dictionary of the identifiers used in messages (ex: p1a: UUID) resolved to their Pokemon
+        self.identifiers: dict[str, Pokemon] = {}
 
         # Add each Pokemon from player's team
         for pokemon in self.player:
@@ -153,426 +173,80 @@ class BattleClient:
         # Call the log event
         self.__call_event(BattleEvent.LOG, message)
 
-    # Define the listener callback for the socket
-    def __listen(self):
-        buffer = ""
-        while True:
-            try:
-                data = self.socket.recv(4096)
-            except Exception: # Socket has been closed
-                break # Break out of the loop
-            if not data:
-                break
-            buffer += data.decode('utf-8')
-            while '\n' in buffer:
-                line, buffer = buffer.split('\n', 1)
-                try:
-                    # Load line as a JSON object
-                    obj = json.loads(line.strip())
-
-                    # Check if response has an error
-                    if "error" in obj:
-                        # Raise an error
-                        raise Exception(obj["error"])
-
-                    # Ensure every response has an action
-                    if not "action" in obj:
-                        # Raise an error
-                        raise KeyError("Requests must specify an action")
-
-                    # Check if this is a 'create' action
-                    if obj["action"] == "create" and "battle_id" in obj:
-                        self.battle_id = obj["battle_id"]
-                        self.__log(f"Loaded battle: {self.battle_id}")
-                        # Call STARTED event
-                        self.__call_event(BattleEvent.STARTED)
-                        # Send out starting Pokemon
-                        self.__call_event(
-                            BattleEvent.CURRENT_POKEMON_UPDATE,
-                            self.current, self.current_opponent
-                        )
-                    elif obj["action"] == "message" and "output" in obj: # Check if this is a 'message' action
-                        message = obj["output"]
-                        self.__log(f"< {message}")
-
-                        # Check if message contains any pipe deliminators
-                        if "|" in message:
-                            # Split the message by the pipe deliminator
-                            args = obj["output"].split("|")
-
-                            # Message action
-                            action = args[1]
-
-                            # Handle each action accordingly
-
-                            if action == "move":
-                                # Split arguments
-                                user = self.get_pokemon_by_uuid(args[2])
-                                move = args[3]
-                                target = self.get_pokemon_by_uuid(args[4]) if len(args) >= 5 and ": " in args[4] else None
-                                # Call the move event
-                                self.__call_event(
-                                    BattleEvent.MOVE,
-                                    user, move, target,
-                                    True if "[miss]" in message else False,
-                                    True if "[still]" in message else False,
-                                )
-                            elif action == "-boost" or action == "-unboost":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                stat = args[3]
-                                amount = int(args[4])
-                                # Flip sign of 'amount' if action is unboost
-                                amount *= -1
-                                # Call the stat change event
-                                self.__call_event(
-                                    BattleEvent.STAT_CHANGE,
-                                    target, stat, amount,
-                                )
-                            elif action == "turn":
-                                # Split arguments
-                                current_turn = int(args[2])
-                                # Call the turn update event
-                                self.__call_event(
-                                    BattleEvent.TURN_CHANGE,
-                                    current_turn
-                                )
-                            elif action == "switch":
-                                # Split arguments
-                                side = args[2].split(":")[0][1:-1] # Slice a string, ex: abcde -> bcd
-                                target = self.get_pokemon_by_uuid(args[2])
-
-                                # Check battler and assign current Pokemon
-                                if side == Battler.PLAYER.value:
-                                    self.current = target
-                                elif side == Battler.AI.value:
-                                    self.current_opponent = target
-
-                                # Call the switch Pokemon event
-                                self.__call_event(
-                                    BattleEvent.CURRENT_POKEMON_UPDATE,
-                                    self.current, self.current_opponent
-                                )
-
-                                # Split arguments to determine health
-                                raw_health = args[4].split("/")
-                                health = int(raw_health[0])
-                                max_health = int(raw_health[1])
-
-                                # Check if max health matches the Pokemon's health stat
-                                # This is because HP is sent in two formats, current/max and
-                                # current hp percent / 100
-                                if max_health == target.get_max_health():
-                                    # Determine targeted battler
-                                    if target == self.current:
-                                        battler = Battler.PLAYER
-                                    else:
-                                        battler = Battler.AI
-                                    # Call a health update event
-                                    self.__call_event(BattleEvent.HEALTH_UPDATE, battler, health)
-                            elif action == "-damage" and "fnt" not in message:
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Split arguments to determine health
-                                raw_health = args[3].split("/")
-                                # Clean out the status condition
-                                if " " in raw_health[1]:
-                                    raw_health[1] = raw_health[1].split(" ")[0]
-                                health = int(raw_health[0])
-                                max_health = int(raw_health[1])
-
-                                # Check if max health matches the Pokemon's health stat
-                                # This is because HP is sent in two formats, current/max and
-                                # current hp percent / 100
-                                if max_health == target.get_max_health():
-                                    # Determine targeted battler
-                                    if target == self.current:
-                                        battler = Battler.PLAYER
-                                        # Update battle condition
-                                        self.current.condition.health = health
-                                    else:
-                                        battler = Battler.AI
-                                        # Update battle condition
-                                        self.current_opponent.condition.health = health
-                                    # Call a health update event
-                                    self.__call_event(BattleEvent.HEALTH_UPDATE, battler, health)
-                            elif action == "pp_update":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                raw_move_pps = args[3]
-                                raw_pps = raw_move_pps.split(", ")
-                                # Initialize PP dictionary
-                                pp = {}
-                                # Iterate each move
-                                for data in raw_pps:
-                                    # Split arguments
-                                    move_name = data.split(": ")[0]
-                                    # Iterate target's move set
-                                    for move in target.get_moves():
-                                        # Check if move_name matches this move loosely
-                                        if move.replace("_", "").lower() == move_name.lower():
-                                            # Move's match
-                                            move_name = move
-                                    pp_count = int(data.split(": ")[1])
-                                    # Add pair to PP dictionary
-                                    pp[move_name] = pp_count
-                                # Call the PP update event
-                                self.__call_event(BattleEvent.PP_UPDATE, target, pp)
-                            elif action == "-crit":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.CRITICAL_HIT, target)
-                            elif action == "-supereffective":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.SUPER_EFFECTIVE, target)
-                            elif action == "-resisted":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.RESISTED, target)
-                            elif action == "-immune":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.IMMUNE, target)
-                            elif action == "faint":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Set Pokemon's health to 0
-                                target.condition.health = 0
-                                # Call the faint event
-                                self.__call_event(BattleEvent.FAINTED, target)
-                            elif action == "win":
-                                # Split arguments
-                                winner = args[2]
-                                # Check if winner is 'player'
-                                if winner == "player":
-                                    won = True
-                                else:
-                                    won = False
-                                # Call the event
-                                self.__call_event(BattleEvent.END, won)
-                            elif action == "-fail":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                action = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.FAILED, target, action)
-                            elif action == "-block":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                effect = args[3]
-                                move = args[4]
-                                attacker = self.get_pokemon_by_uuid(args[5])
-                                # Call the event
-                                self.__call_event(BattleEvent.BLOCKED, target, effect, move, attacker)
-                            elif action == "heal":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Split arguments to determine health
-                                raw_health = args[3].split("/")
-                                # Clean out the status condition
-                                if " " in raw_health[1]:
-                                    raw_health[1] = raw_health[1].split(" ")[0]
-                                health = int(raw_health[0])
-                                max_health = int(raw_health[1])
-
-                                # Call the heal event
-                                self.__call_event(BattleEvent.HEAL, target)
-
-                                # Check if max health matches the Pokemon's health stat
-                                # This is because HP is sent in two formats, current/max and
-                                # current hp percent / 100
-                                if max_health == target.get_max_health():
-                                    # Determine targeted battler
-                                    if target == self.current:
-                                        battler = Battler.PLAYER
-                                        # Update battle condition
-                                        self.current.condition.health = health
-                                    else:
-                                        battler = Battler.AI
-                                        # Update battle condition
-                                        self.current_opponent.condition.health = health
-                                    # Call a health update event
-                                    self.__call_event(BattleEvent.HEALTH_UPDATE, battler, health)
-                            elif action == "-status":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                status = self.resolve_status_condition_message(args[3])
-                                # Call the event
-                                self.__call_event(BattleEvent.STATUS_INFLICTED, target, status)
-                            elif action == "-curestatus":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                status = self.resolve_status_condition_message(args[3])
-                                # Call the event
-                                self.__call_event(BattleEvent.STATUS_CURED, target, status)
-                            elif action == "-cureteam":
-                                # Split arguments
-                                user = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.TEAM_STATUS_CURED, user)
-                            elif action == "-swapboost":
-                                # Split arguments
-                                user = self.get_pokemon_by_uuid(args[2])
-                                target = self.get_pokemon_by_uuid(args[3])
-                                stats = args[4]
-                                # Call the event
-                                self.__call_event(BattleEvent.STAT_SWAPPED, user, target, stats)
-                            elif action == "-invertboost":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.STAT_CHANGES_INVERTED, target)
-                            elif action == "-clearboost":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.STAT_CHANGES_CLEARED, target)
-                            elif action == "-clearallboost":
-                                # Call the event
-                                self.__call_event(BattleEvent.ALL_STAT_CHANGES_CLEARED)
-                            elif action == "-clearpositiveboost":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                user = self.get_pokemon_by_uuid(args[3])
-                                effect = self.get_pokemon_by_uuid(args[4])
-                                # Call the event
-                                self.__call_event(BattleEvent.CLEAR_POSITIVE_STAT_CHANGES, target, user, effect)
-                            elif action == "-clearnegativeboost":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.CLEAR_NEGATIVE_STAT_CHANGES, target)
-                            elif action == "-copyboost":
-                                # Split arguments
-                                user = self.get_pokemon_by_uuid(args[2])
-                                target = self.get_pokemon_by_uuid(args[3])
-                                # Call the event
-                                self.__call_event(BattleEvent.COPY_STAT_CHANGES, user, target)
-                            elif action == "-weather":
-                                # Split arguments
-                                weather = args[2]
-                                # Call the event
-                                self.__call_event(BattleEvent.WEATHER, weather)
-                            elif action == "-fieldstart":
-                                # Split arguments
-                                condition = args[2]
-                                # Call the event
-                                self.__call_event(BattleEvent.FIELD_START, condition)
-                            elif action == "-fieldend":
-                                # Split arguments
-                                condition = args[2]
-                                # Call the event
-                                self.__call_event(BattleEvent.FIELD_END, condition)
-                            elif action == "-sidestart":
-                                # Split arguments
-                                side = args[2]
-                                condition = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.SIDE_START, side, condition)
-                            elif action == "-sideend":
-                                # Split arguments
-                                side = args[2]
-                                condition = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.SIDE_END, side, condition)
-                            elif action == "-swapsideconditions":
-                                # Call the event
-                                self.__call_event(BattleEvent.SWAP_SIDE_CONDITIONS)
-                            elif action == "-start":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                effect = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.VOLATILE_STATUS_STARTED, target, effect)
-                            elif action == "-end":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                effect = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.VOLATILE_STATUS_ENDED, target, effect)
-                            elif action == "-ability" and "[from]" in message:
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                ability = args[3]
-                                effect = args[4].replace("[from]", "")
-                                # Call the event
-                                self.__call_event(BattleEvent.ABILITY_CHANGED, target, ability, effect)
-                            elif action == "-ability" and "[from]" not in message:
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                ability = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.ABILITY_ACTIVATED, target, ability)
-                            elif action == "-endability":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                # Call the event
-                                self.__call_event(BattleEvent.ABILITY_ENDED, target)
-                            elif action == "-transform":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                species = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.TRANSFORM, target, species)
-                            elif action == "-prepare" and len(args) == 3:
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                move = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.PREPARE_AGAINST_UNKNOWN, target, move)
-                            elif action == "-prepare" and len(args) == 4:
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                move = args[3]
-                                defender = args[4]
-                                # Call the event
-                                self.__call_event(BattleEvent.PREPARE_AGAINST_UNKNOWN, target, move, defender)
-                            elif action == "-nothing":
-                                # Call the event
-                                self.__call_event(BattleEvent.NOTHING)
-                            elif action == "-hitcount":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                hits = int(args[3])
-                                # Call the event
-                                self.__call_event(BattleEvent.MOVE_MULTI_HIT, target, hits)
-                            elif action == "-singlemove":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                move = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.SINGLE_MOVE, target, move)
-                            elif action == "-singleturn":
-                                # Split arguments
-                                target = self.get_pokemon_by_uuid(args[2])
-                                move = args[3]
-                                # Call the event
-                                self.__call_event(BattleEvent.SINGLE_TURN, target, move)
-                except json.JSONDecodeError as e:
-                    self.__log(f"Failed to decode JSON: {e}")
-
-    # Define the start listening function to attach the listen function
+    # Define the callback for every line received from the battle simulation server
+    def __handle_line(self, line: str):
+        # Record the line before handling it
+        if self.recorder is not None:
+            self.recorder.record(INBOUND, line)
+        try:
+            # Load line as a JSON object
+            obj = json.loads(line.strip())
+        except json.JSONDecodeError as e:
+            self.__log(f"Failed to decode JSON: {e}")
+            return
+        self.__handle_message(obj)
+
+    # Define the callback for every message a transport has already decoded (ex: a pooled connection
+    # decodes lines to route them), so the line isn't decoded again
+    def __receive_message(self, obj: dict[str, Any]):
+        # Record the message as the line it was received as
+        if self.recorder is not None:
+            self.recorder.record(INBOUND, json.dumps(obj))
+        self.__handle_message(obj)
+
+    # Define the function that handles a decoded message
+    def __handle_message(self, obj: dict[str, Any]):
+        # Check if response has an error
+        if "error" in obj:
+            # Raise an error
+            raise Exception(obj["error"])
+
+        # Ensure every response has an action
+        if not "action" in obj:
+            # Raise an error
+            raise KeyError("Requests must specify an action")
+
+        # Check if this is a 'create' action
+        if obj["action"] == "create" and "battle_id" in obj:
+            self.battle_id = obj["battle_id"]
+            self.__log(f"Loaded battle: {self.battle_id}")
+            # Call STARTED event
+            self.__call_event(BattleEvent.STARTED)
+            # Send out starting Pokemon
+            self.__call_event(
+                BattleEvent.CURRENT_POKEMON_UPDATE,
+                self.current, self.current_opponent
+            )
+        elif obj["action"] == "message" and "output" in obj: # Check if this is a 'message' action
+            message = obj["output"]
+            self.__log(f"< {message}")
+
+            # Hand the message to the parser registered for its action, which calls its events
+            self.protocol.dispatch(self, message, self.__call_event)
+
+    # Define the start listening function to open the transport with the line and message handlers
     def start_listening(self):
-        listener_thread = threading.Thread(target=self.__listen, daemon=True)
-        listener_thread.start()
+        self.transport.open(self.__handle_line, self.__handle_close, self.__receive_message)
+
+    # Define the callback for when the connection to the battle simulation server has closed
+    def __handle_close(self):
+        # Mark battle as unconnected
+        self.connected = False
 
     # Define the send request private method to send a request to the
     # battle simulation server
     def __send_request(self, request: dict[str, Any]):
-        # Ensure socket is connected
-        if not self.socket or not self.connected:
+        # Ensure the transport is connected
+        if not self.connected:
             raise ConnectionError("Not connected to socket")
 
         # Safely execute following code in a try-except block
         try:
             # Send the request as raw JSON
-            request_json = json.dumps(request) + "\n"
-            self.socket.send(request_json.encode())
+            line = json.dumps(request)
+            if self.recorder is not None:
+                self.recorder.record(OUTBOUND, line)
+            self.transport.send(line)
         except Exception as e: # Catch any errors
             # Notify that an error occurred
             self.__log("An error occurred in the battle simulator connection")
@@ -583,22 +257,9 @@ class BattleClient:
     # Define the send request private method to send a request to
     # the battle simulation server using the battle id
     def __send_identified_request(self, request: dict[str, Any]):
-        # Ensure socket is connected
-        if not self.socket or not self.connected:
-            raise ConnectionError("Not connected to socket")
-
-        # Safely execute following code in a try-except block
-        try:
-            # Send the request as raw JSON
-            request["battle_id"] = self.battle_id
-            request_json = json.dumps(request) + "\n"
-            self.socket.send(request_json.encode())
-        except Exception as e: # Catch any errors
-            # Notify that an error occurred
-            self.__log("An error occurred in the battle simulator connection")
-            # Close the connection
-            self.disconnect()
-            raise e
+        # Add the battle id and delegate to the send request function
+        request["battle_id"] = self.battle_id
+        self.__send_request(request)
 
     # Define the send request private method to send a request to
     # the battle simulation server using the battle id
@@ -613,24 +274,40 @@ class BattleClient:
         # Delegate to private method
         self.__send_command(command)
 
+    # Define a function that records every line sent and received from now on to a file, the
+    # battle is appended to the file and the recording is closed when the battle disconnects
+    def record(self, path: str):
+        self.recorder = BattleRecorder(path)
+
     # Define a function to call an event
     def __call_event(self, event: BattleEvent, *args, **kwargs) -> Any:
         # Check if event type has any listeners
-        if not event in self.listeners:
+        listeners = self.listeners.get(event)
+        if listeners is None:
             return # Exit
+        # Check if the listeners have to be called through the dispatcher, on another thread
+        if self.dispatcher is not None:
+            self.dispatcher.post(self, event, listeners, args, kwargs)
+            return
         # Iterate all listeners
-        for listener in self.listeners[event]:
+        for listener in listeners:
             # Call the listener callback with *args and **kwargs
             listener(*args, **kwargs)
 
     # Define a function to get a Pokemon by their UUID
     def get_pokemon_by_uuid(self, uuid: str):
+        # Check if this identifier has been resolved before, most messages name one of the two current Pokemon
+        pokemon = self.identifiers.get(uuid)
+        if pokemon is not None:
+            return pokemon
         # Check if 'uuid' contains a colon
         if ":" in uuid:
             # Split by the colin, remove all spaces and then reutnr the Pokemon by that identifier
-            return self.pokemon[uuid.split(":")[1].replace(" ", "")]
+            pokemon = self.pokemon[uuid.split(":")[1].replace(" ", "")]
         else: # otherwise, just return the Pokemon
-            return self.pokemon[uuid]
+            pokemon = self.pokemon[uuid]
+        self.identifiers[uuid] = pokemon
+        return pokemon
 
     # Define a function to handle events
     def on(self, event: BattleEvent, listener: Callable[[...], None]):
@@ -775,12 +452,22 @@ class BattleClient:
             # Send a pass command
             self.__send_command(f">p{Battler.PLAYER.value} pass")
 
-    # Define a function to make the AI use a move
-    def ai_use_move(self, _: int):
+    # Define a function to get the current Pokemon of a side
+    def get_current(self, battler: Battler) -> Pokemon:
+        if battler == Battler.PLAYER:
+            return self.current
+        elif battler == Battler.AI:
+            return self.current_opponent
+
+    # Define a function to make the AI use a move, the AI's policy can also choose the
+    # player's moves (ex: battles played without a window)
+    def ai_use_move(self, _: int, battler: Battler = Battler.AI):
+        # Get the Pokemon choosing a move
+        current = self.get_current(battler)
         # Initialize a move map
         moves = {}
-        # Iterate each of the AI's moves
-        for move in self.current_opponent.condition.move_set:
+        # Iterate each of the Pokemon's moves
+        for move in current.condition.move_set:
             # If we don't have enough PP then skip
             if move.pp <= 0:
                 continue
@@ -789,11 +476,15 @@ class BattleClient:
             move_obj = holder.get_move(move.name)
 
             # Calculate the STAB (Same-Type-Attack-Bonus) modifier
-            stab_bonus = (1.5 if move_obj.type in self.current_opponent.get_species().types else 1)
+            stab_bonus = (1.5 if move_obj.type in current.get_species().types else 1)
             # Determine the power of the move
             power = move_obj.power if move_obj.power is not None else 0
             # Calculate the effective power of this move and place it in the map
             moves[move.name] = power * stab_bonus
+        # Check if every move is out of PP, the first move is selected and the server makes the Pokemon struggle
+        if not moves:
+            self.select_move(battler, 1)
+            return
         # Chance of 30%
         if random.random() <= 0.3:
             # Shuffle the moves map for some randomness
@@ -806,21 +497,249 @@ class BattleClient:
         # Get first move
         selected_move, _ = next(iter(moves.items()))
         # Get the index of the selected move in the Pokemon's move set
-        move_index = self.current_opponent.get_moves().index(selected_move)
+        move_index = current.get_moves().index(selected_move)
         # Select the move
-        self.select_move(Battler.AI, move_index + 1)
+        self.select_move(battler, move_index + 1)
 
     # Define a function to switch current Pokemon
     def switch(self, battler: Battler, pokemon: Pokemon):
         # Send the command
         self.__send_command(f">p{battler.value} switch {pokemon.uuid}")
 
-    # Define a function to disconnect the socket
+    # Define a function to disconnect from the battle simulation server
     def disconnect(self):
-        # Check if there is an active socket
-        if self.socket:
-            # Close and remove the socket
-            self.socket.close()
-            self.socket = None
+        # Close the transport, a pooled connection is handed back to the pool and stays open
+        self.transport.close()
+        # Close the recording, if any
+        if self.recorder is not None:
+            self.recorder.close()
         # Mark battle as unconnected
-        self.connected = False
\ No newline at end of file
+        self.connected = False
+
+# Define the protocol dispatcher shared by every battle, each parser below handles
+# one action of the battle simulation server's messages. More actions can be
+# handled by registering a parser, ex: @protocol.register("-activate")
+protocol = ProtocolDispatcher()
+
+# Define a function that calls the health update event for a Pokemon from a health field
+# (ex: 52/100 par) if the health was sent as current/max, optionally updating the battle
+# condition of the Pokemon
+def health_update(battle: BattleClient, target: Pokemon, raw_health: str, update_condition: bool, call: Callable):
+    # Split the health field, cleaning out the status condition
+    health, max_health = raw_health.split(" ", 1)[0].split("/")
+    health, max_health = int(health), int(max_health)
+
+    # Check if max health matches the Pokemon's health stat
+    # This is because HP is sent in two formats, current/max and
+    # current hp percent / 100
+    if max_health != target.get_max_health():
+        return
+
+    # Determine targeted battler
+    if target == battle.current:
+        battler = Battler.PLAYER
+    else:
+        battler = Battler.AI
+    # Update battle condition
+    if update_condition:
+        target.condition.health = health
+    call(BattleEvent.HEALTH_UPDATE, battler, health)
+
+# Define functions that build the parsers of actions that only call an event with their
+# fields, the fields that name a Pokemon are resolved to it
+
+def target_parser(event: BattleEvent) -> Callable:
+    # |action|POKEMON
+    def parse(battle: BattleClient, fields: str, call: Callable):
+        call(event, battle.get_pokemon_by_uuid(fields.split("|", 1)[0]))
+    return parse
+
+def target_value_parser(event: BattleEvent) -> Callable:
+    # |action|POKEMON|VALUE
+    def parse(battle: BattleClient, fields: str, call: Callable):
+        args = fields.split("|")
+        call(event, battle.get_pokemon_by_uuid(args[0]), args[1])
+    return parse
+
+def value_parser(event: BattleEvent, count: int) -> Callable:
+    # |action|VALUE...
+    def parse(battle: BattleClient, fields: str, call: Callable):
+        call(event, *fields.split("|")[:count])
+    return parse
+
+# Register the parsers of actions that only call an event
+protocol.register("-crit", target_parser(BattleEvent.CRITICAL_HIT))
+protocol.register("-supereffective", target_parser(BattleEvent.SUPER_EFFECTIVE))
+protocol.register("-resisted", target_parser(BattleEvent.RESISTED))
+protocol.register("-immune", target_parser(BattleEvent.IMMUNE))
+protocol.register("-cureteam", target_parser(BattleEvent.TEAM_STATUS_CURED))
+protocol.register("-invertboost", target_parser(BattleEvent.STAT_CHANGES_INVERTED))
+protocol.register("-clearboost", target_parser(BattleEvent.STAT_CHANGES_CLEARED))
+protocol.register("-clearnegativeboost", target_parser(BattleEvent.CLEAR_NEGATIVE_STAT_CHANGES))
+protocol.register("-endability", target_parser(BattleEvent.ABILITY_ENDED))
+protocol.register("-mustrecharge", target_parser(BattleEvent.MUST_RECHARGE))
+protocol.register("-fail", target_value_parser(BattleEvent.FAILED))
+protocol.register("-start", target_value_parser(BattleEvent.VOLATILE_STATUS_STARTED))
+protocol.register("-end", target_value_parser(BattleEvent.VOLATILE_STATUS_ENDED))
+protocol.register("-transform", target_value_parser(BattleEvent.TRANSFORM))
+protocol.register("-singlemove", target_value_parser(BattleEvent.SINGLE_MOVE))
+protocol.register("-singleturn", target_value_parser(BattleEvent.SINGLE_TURN))
+protocol.register("-weather", value_parser(BattleEvent.WEATHER, 1))
+protocol.register("-fieldstart", value_parser(BattleEvent.FIELD_START, 1))
+protocol.register("-fieldend", value_parser(BattleEvent.FIELD_END, 1))
+protocol.register("-sidestart", value_parser(BattleEvent.SIDE_START, 2))
+protocol.register("-sideend", value_parser(BattleEvent.SIDE_END, 2))
+protocol.register("-clearallboost", value_parser(BattleEvent.ALL_STAT_CHANGES_CLEARED, 0))
+protocol.register("-swapsideconditions", value_parser(BattleEvent.SWAP_SIDE_CONDITIONS, 0))
+protocol.register("-nothing", value_parser(BattleEvent.NOTHING, 0))
+
+@protocol.register("move")
+def parse_move(battle: BattleClient, fields: str, call: Callable):
+    # |move|POKEMON|MOVE|TARGET|[miss]|[still]
+    args = fields.split("|")
+    user = battle.get_pokemon_by_uuid(args[0])
+    target = battle.get_pokemon_by_uuid(args[2]) if len(args) >= 3 and ": " in args[2] else None
+    call(BattleEvent.MOVE, user, args[1], target, "[miss]" in args, "[still]" in args)
+
+@protocol.register("-boost")
+def parse_boost(battle: BattleClient, fields: str, call: Callable):
+    # |-boost|POKEMON|STAT|AMOUNT
+    target, stat, amount = fields.split("|", 2)
+    call(BattleEvent.STAT_CHANGE, battle.get_pokemon_by_uuid(target), stat, int(amount))
+
+@protocol.register("-unboost")
+def parse_unboost(battle: BattleClient, fields: str, call: Callable):
+    # |-unboost|POKEMON|STAT|AMOUNT, the amount is sent as a positive number
+    target, stat, amount = fields.split("|", 2)
+    call(BattleEvent.STAT_CHANGE, battle.get_pokemon_by_uuid(target), stat, -int(amount))
+
+@protocol.register("turn")
+def parse_turn(battle: BattleClient, fields: str, call: Callable):
+    # |turn|NUMBER
+    call(BattleEvent.TURN_CHANGE, int(fields))
+
+@protocol.register("switch")
+def parse_switch(battle: BattleClient, fields: str, call: Callable):
+    # |switch|POKEMON|DETAILS|HP STATUS
+    args = fields.split("|")
+    side = args[0].split(":")[0][1:-1] # Slice a string, ex: abcde -> bcd
+    target = battle.get_pokemon_by_uuid(args[0])
+
+    # Check battler and assign current Pokemon
+    if side == Battler.PLAYER.value:
+        battle.current = target
+    elif side == Battler.AI.value:
+        battle.current_opponent = target
+
+    # Call the switch Pokemon event and then the health update event
+    call(BattleEvent.CURRENT_POKEMON_UPDATE, battle.current, battle.current_opponent)
+    health_update(battle, target, args[2], False, call)
+
+@protocol.register("-damage")
+def parse_damage(battle: BattleClient, fields: str, call: Callable):
+    # |-damage|POKEMON|HP STATUS, fainting is handled by the 'faint' action
+    args = fields.split("|")
+    if "fnt" in args[1]:
+        return
+    health_update(battle, battle.get_pokemon_by_uuid(args[0]), args[1], True, call)
+
+@protocol.register("heal")
+@protocol.register("-heal")
+def parse_heal(battle: BattleClient, fields: str, call: Callable):
+    # |-heal|POKEMON|HP STATUS|[from] EFFECT
+    args = fields.split("|")
+    target = battle.get_pokemon_by_uuid(args[0])
+    call(BattleEvent.HEAL, target)
+    health_update(battle, target, args[1], True, call)
+
+@protocol.register("pp_update")
+def parse_pp_update(battle: BattleClient, fields: str, call: Callable):
+    # |pp_update|POKEMON|MOVE: PP, MOVE: PP...
+    args = fields.split("|")
+    target = battle.get_pokemon_by_uuid(args[0])
+    # Map the move names the server sends (ex: thunderbolt) to the move set's names (ex: thunder_bolt)
+    moves = {move.replace("_", "").lower(): move for move in target.get_moves()}
+    # Initialize PP dictionary
+    pp = {}
+    for data in args[1].split(", "):
+        move_name, pp_count = data.split(": ")
+        pp[moves.get(move_name.lower(), move_name)] = int(pp_count)
+    call(BattleEvent.PP_UPDATE, target, pp)
+
+@protocol.register("faint")
+def parse_faint(battle: BattleClient, fields: str, call: Callable):
+    # |faint|POKEMON
+    target = battle.get_pokemon_by_uuid(fields.split("|", 1)[0])
+    # Set Pokemon's health to 0
+    target.condition.health = 0
+    call(BattleEvent.FAINTED, target)
+
+@protocol.register("win")
+def parse_win(battle: BattleClient, fields: str, call: Callable):
+    # |win|USER, the event is called with whether the player has won
+    call(BattleEvent.END, fields.split("|", 1)[0] == "player")
+
+@protocol.register("-block")
+def parse_block(battle: BattleClient, fields: str, call: Callable):
+    # |-block|POKEMON|EFFECT|MOVE|ATTACKER
+    args = fields.split("|")
+    call(BattleEvent.BLOCKED, battle.get_pokemon_by_uuid(args[0]), args[1], args[2], battle.get_pokemon_by_uuid(args[3]))
+
+@protocol.register("-status")
+def parse_status(battle: BattleClient, fields: str, call: Callable):
+    # |-status|POKEMON|STATUS
+    args = fields.split("|")
+    call(BattleEvent.STATUS_INFLICTED, battle.get_pokemon_by_uuid(args[0]), battle.resolve_status_condition_message(args[1]))
+
+@protocol.register("-curestatus")
+def parse_cure_status(battle: BattleClient, fields: str, call: Callable):
+    # |-curestatus|POKEMON|STATUS
+    args = fields.split("|")
+    call(BattleEvent.STATUS_CURED, battle.get_pokemon_by_uuid(args[0]), battle.resolve_status_condition_message(args[1]))
+
+@protocol.register("-swapboost")
+def parse_swap_boost(battle: BattleClient, fields: str, call: Callable):
+    # |-swapboost|SOURCE|TARGET|STATS
+    args = fields.split("|")
+    call(BattleEvent.STAT_SWAPPED, battle.get_pokemon_by_uuid(args[0]), battle.get_pokemon_by_uuid(args[1]), args[2])
+
+@protocol.register("-clearpositiveboost")
+def parse_clear_positive_boost(battle: BattleClient, fields: str, call: Callable):
+    # |-clearpositiveboost|TARGET|POKEMON|EFFECT
+    args = fields.split("|")
+    call(
+        BattleEvent.CLEAR_POSITIVE_STAT_CHANGES,
+        battle.get_pokemon_by_uuid(args[0]), battle.get_pokemon_by_uuid(args[1]), battle.get_pokemon_by_uuid(args[2])
+    )
+
+@protocol.register("-copyboost")
+def parse_copy_boost(battle: BattleClient, fields: str, call: Callable):
+    # |-copyboost|SOURCE|TARGET
+    args = fields.split("|")
+    call(BattleEvent.COPY_STAT_CHANGES, battle.get_pokemon_by_uuid(args[0]), battle.get_pokemon_by_uuid(args[1]))
+
+@protocol.register("-ability")
+def parse_ability(battle: BattleClient, fields: str, call: Callable):
+    # |-ability|POKEMON|ABILITY|[from] EFFECT, without the effect the ability has activated
+    args = fields.split("|")
+    target = battle.get_pokemon_by_uuid(args[0])
+    if len(args) >= 3 and args[2].startswith("[from]"):
+        call(BattleEvent.ABILITY_CHANGED, target, args[1], args[2].replace("[from]", ""))
+    else:
+        call(BattleEvent.ABILITY_ACTIVATED, target, args[1])
+
+@protocol.register("-prepare")
+def parse_prepare(battle: BattleClient, fields: str, call: Callable):
+    # |-prepare|ATTACKER|MOVE|DEFENDER, the defender is left out when it isn't known yet
+    args = fields.split("|")
+    attacker = battle.get_pokemon_by_uuid(args[0])
+    if len(args) >= 3 and args[2]:
+        call(BattleEvent.PREPARE_AGAINST_KNOWN, attacker, args[1], args[2])
+    else:
+        call(BattleEvent.PREPARE_AGAINST_UNKNOWN, attacker, args[1])
+
+@protocol.register("-hitcount")
+def parse_hit_count(battle: BattleClient, fields: str, call: Callable):
+    # |-hitcount|POKEMON|NUM
+    args = fields.split("|")
+    call(BattleEvent.MOVE_MULTI_HIT, battle.get_pokemon_by_uuid(args[0]), int(args[1]))
@@ -0,0 +1,653 @@
+# This file defines a battle engine that simulates battles in-process instead of on the
+# battle simulation server. It reads the same requests and commands a 'BattleClient' sends
+# (ex: >p1 move 1) and answers with the same protocol messages (ex: |move|p1a: ...|Tackle|p2a: ...),
+# so a battle played through a 'LocalTransport' calls every 'BattleEvent' the same way a
+# battle on the server does, without any network at all.
+
+# The mechanics are a subset of the main series games: damage (with critical hits, STAB, type
+# effectiveness and the random roll), accuracy and evasion, priority and speed, multi-hit moves,
+# drain and recoil, healing, status conditions, confusion, flinching and stat stages. Abilities,
+# held items, weather and field conditions aren't simulated.
+
+# Imports
+
+import itertools
+import json
+import random
+from collections import OrderedDict
+from typing import Any, Callable
+
+from src import holder
+from src.game.transport import get_event_loop
+from src.pokemon.move import Move
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.types.battle_condition import BattleCondition, BattleMove
+from src.pokemon.types.damage_class import DamageClass
+from src.pokemon.types.gender import Gender
+from src.pokemon.types.move_ailment import MoveAilment
+from src.pokemon.types.move_category import MoveCategory
+from src.pokemon.types.move_target import MoveTarget
+from src.pokemon.types.nature import Nature
+from src.pokemon.types.stat import Stat
+from src.pokemon.types.type_chart import get_effectiveness
+
+# Define the sides of a battle, the player is always 'p1' and the opponent 'p2'
+SIDES = ("p1", "p2")
+
+# Define the genders of the packed string
+GENDERS = {"M": Gender.MALE, "F": Gender.FEMALE}
+
+# Define the names the protocol uses for the stats that can be boosted
+BOOST_IDS = {
+    "attack": "atk",
+    "defense": "def",
+    "special_attack": "spa",
+    "special_defense": "spd",
+    "speed": "spe",
+    "accuracy": "accuracy",
+    "evasion": "evasion"
+}
+
+# Define the status conditions the engine inflicts and their protocol names, along with the
+# types that are immune to each
+STATUS_IDS = {
+    MoveAilment.PARALYSIS: "par",
+    MoveAilment.BURN: "brn",
+    MoveAilment.POISON: "psn",
+    MoveAilment.SLEEP: "slp",
+    MoveAilment.FREEZE: "frz"
+}
+STATUS_IMMUNITIES = {
+    "par": ("electric",),
+    "brn": ("fire",),
+    "psn": ("poison", "steel"),
+    "frz": ("ice",),
+    "slp": ()
+}
+
+# Define the chance of a critical hit at each critical hit stage (Generation VII onwards)
+CRIT_CHANCES = (1 / 24, 1 / 8, 1 / 2, 1)
+
+# Define the chance that a paralyzed Pokemon can't move and that a frozen Pokemon thaws
+PARALYSIS_CHANCE = 0.25
+THAW_CHANCE = 0.2
+
+# Define the amount of ended battles an engine remembers, a command sent to an older one is
+# answered with an 'Unknown battle' error
+RECENT_BATTLES = 256
+
+# Define a move used by a Pokemon that has no PP left, it is typeless and hurts the user
+STRUGGLE = Move(
+    0, "struggle", "", None, None, None, 1, 0, 50, DamageClass.PHYSICAL, {}, MoveTarget.OTHER,
+    MoveAilment.NONE, MoveCategory.DAMAGE, None, None, None, None, None, None, None, None, None
+)
+
+# Define the moves of the loaded pack by the names the packed string uses (ex: thundershock),
+# built the first time a team is unpacked and rebuilt if another pack is loaded
+_packed_moves: dict[str, Move] = {}
+_packed_moves_pack = None
+
+# Define a function that returns a move by the name the packed string uses
+def get_packed_move(name: str) -> Move:
+    global _packed_moves, _packed_moves_pack
+    if _packed_moves_pack is not holder.pack:
+        _packed_moves = {move.name.replace("_", "").lower(): move for move in holder.pack.moves}
+        _packed_moves_pack = holder.pack
+    try:
+        return _packed_moves[name]
+    except KeyError:
+        # Raise a KeyError to indicate an invalid move name
+        raise KeyError("Invalid move: " + name) from None
+
+# Define a function that returns the multiplier of a stat stage, accuracy and evasion use
+# thirds instead of halves
+def get_stage_multiplier(stage: int, accuracy: bool = False) -> float:
+    base = 3 if accuracy else 2
+    return max(base, base + stage) / max(base, base - stage)
+
+# Define a function that returns the chance of a move's effect happening as a number between
+# 0 and 1, the pack leaves the chance empty (or 0) when the effect always happens
+def get_effect_chance(chance: float | None) -> float:
+    return chance / 100 if chance else 1
+
+# Define the 'BattlePokemon' class which is the state of a Pokemon during a simulated battle
+class BattlePokemon:
+    # Use slots, every battle creates one of these for each Pokemon of both teams
+    __slots__ = (
+        "identifier", "uuid", "pokemon", "types", "stats", "max_health", "health", "moves", "pps",
+        "status", "sleep_turns", "toxic_turns", "confusion_turns", "flinched", "boosts"
+    )
+
+    def __init__(self, side: str, pokemon: Pokemon, uuid: str, moves: list[Move], pps: list[int]):
+        # Initialize fields
+        self.identifier = f"{side}a: {uuid}" # The name of the Pokemon in protocol messages, ex: p1a: UUID
+        self.uuid = uuid
+        self.pokemon = pokemon
+        self.types = pokemon.get_species().types
+        self.stats = {stat.value: value for stat, value in pokemon.get_stats().items()} # The stats by name, ex: attack
+        self.max_health = self.stats["hp"]
+        self.health = pokemon.condition.health
+        self.moves = moves
+        self.pps = pps
+        self.status: str | None = None # The status condition by its protocol name, ex: par
+        self.sleep_turns = 0 # The amount of times the Pokemon has to try to move before waking up
+        self.toxic_turns = 0 # The amount of turns the Pokemon has been badly poisoned for
+        self.confusion_turns = 0 # The amount of times the Pokemon has to try to move before snapping out of confusion
+        self.flinched = False
+        self.boosts: dict[str, int] = dict.fromkeys(BOOST_IDS, 0)
+
+    # Define a function that returns the protocol field of the Pokemon's health, ex: 52/100 par
+    def format_health(self) -> str:
+        if self.health <= 0:
+            return "0 fnt"
+        if self.status is not None:
+            return f"{self.health}/{self.max_health} {self.status}"
+        return f"{self.health}/{self.max_health}"
+
+    # Define a function that returns the Pokemon's speed with its stage and paralysis applied
+    def get_speed(self) -> float:
+        speed = self.stats["speed"] * get_stage_multiplier(self.boosts["speed"])
+        return speed / 2 if self.status == "par" else speed
+
+    # Define a static method that builds the state of a Pokemon from its packed string
+    # (see 'Pokemon.pack_string'), the stats are calculated by a 'Pokemon' the same way the
+    # game calculates them so the health sent back matches the player's Pokemon
+    @staticmethod
+    def unpack(side: str, packed: str) -> "BattlePokemon":
+        fields = packed.split("|")
+        stats = [stat.value for stat in Stat]
+        moves = [get_packed_move(name) for name in fields[8].split(",") if name]
+        pps = [tuple(map(int, pp.split("/"))) for pp in fields[9].split(",") if pp]
+        pokemon = Pokemon(
+            fields[0], False, fields[14] == "S", fields[0], fields[7], [],
+            GENDERS.get(fields[12], Gender.GENDERLESS),
+            Nature.of(fields[10]),
+            dict(zip(stats, map(int, fields[13].split(",")))),
+            dict(zip(stats, map(int, fields[11].split(",")))),
+            int(fields[15]), 0, int(fields[16].split(",")[0]),
+            BattleCondition(
+                int(fields[3]), None, False, None,
+                [BattleMove(move.name, pp, max_pp, False) for move, (pp, max_pp) in zip(moves, pps)], None
+            ),
+            None
+        )
+        return BattlePokemon(side, pokemon, fields[2], moves, [pp for pp, _ in pps])
+
+# Define the 'LocalBattle' class which simulates one battle, every command returns the
+# protocol messages it caused
+class LocalBattle:
+    def __init__(self, battle_id: str, seed: Any = None):
+        # Initialize fields
+        self.battle_id = battle_id
+        self.random = random.Random(seed)
+        self.names: dict[str, str] = {} # The name of each side, the winner is announced by its name
+        self.teams: dict[str, list[BattlePokemon]] = {}
+        self.layouts: set[str] = set() # The sides that have sent their team layout
+        self.active: dict[str, BattlePokemon] = {} # The Pokemon on the field of each side
+        self.choices: dict[str, tuple] = {} # The choice of each side this turn, ex: ("move", 0)
+        self.fainted: list[str] = [] # The sides in the order their Pokemon fainted this turn
+        self.forced: str | None = None # The side that has to switch in a Pokemon before the next turn
+        self.turn = 0
+        self.ended = False
+
+    # Define a function that handles a command, returns the protocol messages it caused
+    def command(self, command: str) -> list[str]:
+        out = []
+        # Ignore every command once the battle has ended
+        if self.ended:
+            return out
+
+        if command.startswith(">start"):
+            pass # Only one format is simulated
+        elif command.startswith(">player "):
+            # >player SIDE {"name": NAME, "team": TEAM}
+            _, side, data = command.split(" ", 2)
+            obj = json.loads(data)
+            self.names[side] = obj["name"]
+            self.teams[side] = [BattlePokemon.unpack(side, packed) for packed in obj["team"].split("]")]
+        elif command.startswith(">capture"):
+            # The opponent's Pokemon has been caught, which ends the battle
+            self.ended = True
+        elif command.startswith(">forcelose "):
+            # >forcelose SIDE, the side forfeits (ex: the player left the battle) and the other side wins
+            side = command.split(" ", 1)[1].strip()
+            if side not in SIDES:
+                out.append(f"|error|[Invalid choice] Unknown side: {side}")
+            else:
+                winner = SIDES[1 - SIDES.index(side)]
+                out.append(f"|win|{self.names.get(winner, winner)}")
+                self.ended = True
+        else:
+            # >SIDE ACTION ARGUMENT, ex: >p1 move 1
+            side, action, *argument = command[1:].split(" ", 2)
+            if side not in SIDES:
+                out.append(f"|error|[Invalid choice] Unknown side: {side}")
+            elif action == "team":
+                self.choose_layout(side, argument[0] if argument else "", out)
+            elif action in ("move", "switch", "pass"):
+                self.choose(side, action, argument[0] if argument else "", out)
+            else:
+                out.append(f"|error|[Invalid choice] Unknown action: {action}")
+        return out
+
+    # Define a function that orders a team by its layout (ex: 213), the battle starts once both
+    # sides have sent theirs
+    def choose_layout(self, side: str, layout: str, out: list[str]):
+        team = self.teams[side]
+        order = [int(index) - 1 for index in layout if index.isdigit() and 0 < int(index) <= len(team)]
+        self.teams[side] = [team[index] for index in order] + [pokemon for i, pokemon in enumerate(team) if i not in order]
+        self.layouts.add(side)
+        if len(self.layouts) == 2 and self.turn == 0:
+            # Send out the first healthy Pokemon of each side
+            for side in SIDES:
+                self.switch_in(side, next(pokemon for pokemon in self.teams[side] if pokemon.health > 0), out)
+            self.turn = 1
+            out.append("|turn|1")
+
+    # Define a function that records the choice of a side, the turn is played once both sides have chosen
+    def choose(self, side: str, action: str, argument: str, out: list[str]):
+        # Ensure the battle has started
+        if self.turn == 0:
+            out.append("|error|[Invalid choice] The battle hasn't started yet")
+            return
+
+        # Parse the choice
+        if action == "move":
+            pokemon = self.active[side]
+            index = int(argument) - 1 if argument.isdigit() else -1
+            if not 0 <= index < len(pokemon.moves):
+                out.append(f"|error|[Invalid choice] {pokemon.identifier} doesn't have a move {argument}")
+                return
+            choice = (action, index)
+        elif action == "switch":
+            target = next((pokemon for pokemon in self.teams[side] if pokemon.uuid == argument), None)
+            if target is None or target.health <= 0 or target is self.active[side]:
+                out.append(f"|error|[Invalid choice] Can't switch to {argument}")
+                return
+            choice = (action, target)
+        else:
+            choice = (action,)
+
+        # Check if this side has to replace a fainted Pokemon before the next turn
+        if self.forced is not None:
+            if side != self.forced or action != "switch":
+                out.append("|error|[Invalid choice] A fainted Pokemon has to be replaced first")
+                return
+            self.forced = None
+            self.switch_in(side, choice[1], out)
+            self.next_turn(out)
+            return
+
+        self.choices[side] = choice
+        if len(self.choices) == 2:
+            self.play_turn(out)
+
+    # Define a function that switches a Pokemon in, its stat stages and volatile conditions are reset
+    def switch_in(self, side: str, pokemon: BattlePokemon, out: list[str]):
+        previous = self.active.get(side)
+        if previous is not None:
+            previous.boosts = dict.fromkeys(BOOST_IDS, 0)
+            previous.confusion_turns = 0
+            previous.toxic_turns = 0
+        self.active[side] = pokemon
+        details = f"{pokemon.pokemon.species}, L{pokemon.pokemon.level}"
+        out.append(f"|switch|{pokemon.identifier}|{details}|{pokemon.format_health()}")
+
+    # Define a function that plays a turn once both sides have chosen, switches go first and
+    # moves are used in order of priority and then speed, ties are broken at random
+    def play_turn(self, out: list[str]):
+        choices = self.choices
+        self.choices = {}
+        self.fainted = []
+
+        for side in SIDES:
+            if choices[side][0] == "switch":
+                self.switch_in(side, choices[side][1], out)
+
+        movers = [side for side in SIDES if choices[side][0] == "move"]
+        movers.sort(key=lambda side: (
+            -self.get_move(self.active[side], choices[side][1]).priority,
+            -self.active[side].get_speed(),
+            self.random.random()
+        ))
+        for i, side in enumerate(movers):
+            user = self.active[side]
+            if user.health > 0:
+                self.use_move(user, self.active[self.get_foe(side)], choices[side][1], i < len(movers) - 1, out)
+
+        # Apply the damage of burns and poison at the end of the turn
+        for side in SIDES:
+            pokemon = self.active[side]
+            if pokemon.health <= 0 or pokemon.status not in ("brn", "psn", "tox"):
+                continue
+            if pokemon.status == "tox":
+                pokemon.toxic_turns += 1
+                damage = pokemon.max_health * pokemon.toxic_turns // 16
+            else:
+                damage = pokemon.max_health // (16 if pokemon.status == "brn" else 8)
+            self.damage(pokemon, max(1, damage), out, f"|[from] {pokemon.status}")
+
+        for side in SIDES:
+            self.active[side].flinched = False
+        self.end_turn(out)
+
+    # Define a function that ends the battle if a side has no healthy Pokemon left, otherwise the
+    # fainted Pokemon are replaced (the opponent's automatically) before the next turn
+    def end_turn(self, out: list[str]):
+        defeated = [side for side in SIDES if all(pokemon.health <= 0 for pokemon in self.teams[side])]
+        if defeated:
+            # If both sides are out of Pokemon, the side whose Pokemon fainted last wins
+            winner = self.get_foe(defeated[0]) if len(defeated) == 1 else self.fainted[-1]
+            out.append(f"|win|{self.names[winner]}")
+            self.ended = True
+            return
+
+        if self.active["p2"].health <= 0:
+            self.switch_in("p2", next(pokemon for pokemon in self.teams["p2"] if pokemon.health > 0), out)
+        if self.active["p1"].health <= 0:
+            # Wait for the player to choose which Pokemon to send out
+            self.forced = "p1"
+            return
+        self.next_turn(out)
+
+    # Define a function that starts the next turn
+    def next_turn(self, out: list[str]):
+        self.turn += 1
+        out.append(f"|turn|{self.turn}")
+
+    # Define a function that returns the other side
+    @staticmethod
+    def get_foe(side: str) -> str:
+        return "p2" if side == "p1" else "p1"
+
+    # Define a function that returns the move a Pokemon uses for the index of its move set,
+    # a Pokemon without PP for that move struggles
+    @staticmethod
+    def get_move(pokemon: BattlePokemon, index: int) -> Move:
+        return pokemon.moves[index] if pokemon.pps[index] > 0 else STRUGGLE
+
+    # Define a function that checks whether a Pokemon is able to move this turn
+    def can_move(self, pokemon: BattlePokemon, out: list[str]) -> bool:
+        if pokemon.status == "slp":
+            pokemon.sleep_turns -= 1
+            if pokemon.sleep_turns > 0:
+                out.append(f"|cant|{pokemon.identifier}|slp")
+                return False
+            pokemon.status = None
+            out.append(f"|-curestatus|{pokemon.identifier}|slp")
+        elif pokemon.status == "frz":
+            if self.random.random() >= THAW_CHANCE:
+                out.append(f"|cant|{pokemon.identifier}|frz")
+                return False
+            pokemon.status = None
+            out.append(f"|-curestatus|{pokemon.identifier}|frz")
+
+        if pokemon.flinched:
+            out.append(f"|cant|{pokemon.identifier}|flinch")
+            return False
+
+        if pokemon.confusion_turns > 0:
+            pokemon.confusion_turns -= 1
+            if pokemon.confusion_turns == 0:
+                out.append(f"|-end|{pokemon.identifier}|confusion")
+            else:
+                out.append(f"|-activate|{pokemon.identifier}|confusion")
+                # A confused Pokemon hurts itself a third of the time, with a typeless 40 power physical attack
+                if self.random.random() < 1 / 3:
+                    self.damage(pokemon, self.calculate_damage(pokemon, pokemon, None, 40, True, False, 1), out, "|[from] confusion")
+                    return False
+
+        if pokemon.status == "par" and self.random.random() < PARALYSIS_CHANCE:
+            out.append(f"|cant|{pokemon.identifier}|par")
+            return False
+        return True
+
+    # Define a function that uses a move, 'target' is the Pokemon on the other side of the field
+    def use_move(self, user: BattlePokemon, target: BattlePokemon, index: int, moves_first: bool, out: list[str]):
+        if not self.can_move(user, out):
+            return
+        move = self.get_move(user, index)
+        name = "Struggle" if move is STRUGGLE else move.format()
+        # Status moves that affect the user (ex: Swords Dance) have their effects applied to it
+        effect_target = user if move.target == MoveTarget.SELF and move.damage_class == DamageClass.STATUS else target
+
+        # Use up the move's PP
+        if move is not STRUGGLE:
+            user.pps[index] -= 1
+            pps = ", ".join(f"{entry.name.replace('_', '')}: {pp}" for entry, pp in zip(user.moves, user.pps))
+            out.append(f"|pp_update|{user.identifier}|{pps}")
+
+        # Check if the move hits, moves without an accuracy never miss
+        if move.accuracy is not None and effect_target is target:
+            stage = max(-6, min(6, user.boosts["accuracy"] - target.boosts["evasion"]))
+            if self.random.random() * 100 >= move.accuracy * get_stage_multiplier(stage, accuracy=True):
+                out.append(f"|move|{user.identifier}|{name}|{target.identifier}|[miss]")
+                out.append(f"|-miss|{user.identifier}|{target.identifier}")
+                return
+        out.append(f"|move|{user.identifier}|{name}|{effect_target.identifier}")
+
+        if move.damage_class != DamageClass.STATUS and move.power:
+            # Check if the target is immune to the move
+            effectiveness = 1 if move is STRUGGLE else get_effectiveness(move.type, target.types)
+            if effectiveness == 0:
+                out.append(f"|-immune|{target.identifier}")
+                return
+
+            # Deal the damage of every hit, the effectiveness is only announced once
+            if effectiveness > 1:
+                out.append(f"|-supereffective|{target.identifier}")
+            elif effectiveness < 1:
+                out.append(f"|-resisted|{target.identifier}")
+            hits = self.random.randint(move.min_hits, move.max_hits) if move.min_hits and move.max_hits else 1
+            crit_chance = CRIT_CHANCES[max(0, min(3, int(move.crit_chance or 0)))]
+            physical = move.damage_class == DamageClass.PHYSICAL
+            dealt = 0
+            for hit in range(hits):
+                crit = self.random.random() < crit_chance
+                if crit:
+                    out.append(f"|-crit|{target.identifier}")
+                damage = self.calculate_damage(user, target, move.type, move.power, physical, crit, effectiveness)
+                dealt += min(damage, target.health)
+                self.damage(target, damage, out)
+                if target.health <= 0:
+                    hits = hit + 1
+                    break
+            if hits > 1:
+                out.append(f"|-hitcount|{target.identifier}|{hits}")
+
+            # Drain heals the user by a percent of the damage dealt, recoil hurts it instead
+            if move is STRUGGLE:
+                self.damage(user, max(1, user.max_health // 4), out, "|[from] Recoil")
+            elif move.drain and move.drain > 0:
+                self.heal(user, max(1, dealt * move.drain // 100), out, f"|[from] drain|[of] {target.identifier}")
+            elif move.drain and move.drain < 0:
+                self.damage(user, max(1, dealt * -move.drain // 100), out, "|[from] Recoil")
+
+            # The target can only flinch if it hasn't moved yet this turn
+            if moves_first and target.health > 0 and move.flinch_chance and self.random.random() < move.flinch_chance / 100:
+                target.flinched = True
+
+        # Heal the user by a percent of its max health
+        if move.healing and move.healing > 0 and user.health > 0:
+            if user.health >= user.max_health:
+                out.append(f"|-fail|{user.identifier}|heal")
+            else:
+                self.heal(user, max(1, user.max_health * move.healing // 100), out)
+
+        # Apply the move's ailment and stat changes, a damaging move can only apply them while the target is standing
+        if effect_target.health <= 0:
+            return
+        if move.ailment is not None and move.ailment != MoveAilment.NONE and \
+                self.random.random() < get_effect_chance(move.ailment_chance):
+            self.inflict(effect_target, move, out)
+        if move.stat_changes and self.random.random() < get_effect_chance(move.stat_chance):
+            # Moves that raise the user's stats as a side effect (ex: Close Combat) change the user's stats
+            stat_target = user if move.category in (MoveCategory.DAMAGE_RAISE, MoveCategory.NET_GOOD_STATS) else effect_target
+            for stat, change in move.stat_changes.items():
+                self.boost(stat_target, stat, change, out)
+
+    # Define a function that calculates the damage of an attack
+    # Formula is from Bulbapedia, link: https://bulbapedia.bulbagarden.net/wiki/Damage
+    def calculate_damage(self, user: BattlePokemon, target: BattlePokemon, move_type: str | None, power: int,
+                         physical: bool, crit: bool, effectiveness: float) -> int:
+        attack_stat, defense_stat = ("attack", "defense") if physical else ("special_attack", "special_defense")
+        attack_stage = user.boosts[attack_stat]
+        defense_stage = target.boosts[defense_stat]
+        # A critical hit ignores the attacker's drops and the defender's boosts
+        if crit:
+            attack_stage = max(0, attack_stage)
+            defense_stage = min(0, defense_stage)
+        attack = user.stats[attack_stat] * get_stage_multiplier(attack_stage)
+        defense = target.stats[defense_stat] * get_stage_multiplier(defense_stage)
+
+        damage = int(int(int(2 * user.pokemon.level / 5 + 2) * power * attack / defense) / 50) + 2
+        damage = damage * self.random.randint(85, 100) // 100
+        if crit:
+            damage *= 1.5
+        if move_type in user.types:
+            damage *= 1.5
+        damage *= effectiveness
+        if physical and user.status == "brn":
+            damage *= 0.5
+        return max(1, int(damage))
+
+    # Define a function that damages a Pokemon, a Pokemon left without health faints
+    def damage(self, pokemon: BattlePokemon, amount: int, out: list[str], source: str = ""):
+        pokemon.health = max(0, pokemon.health - amount)
+        out.append(f"|-damage|{pokemon.identifier}|{pokemon.format_health()}{source}")
+        if pokemon.health <= 0:
+            self.fainted.append(pokemon.identifier[:2])
+            out.append(f"|faint|{pokemon.identifier}")
+
+    # Define a function that heals a Pokemon, up to its max health
+    def heal(self, pokemon: BattlePokemon, amount: int, out: list[str], source: str = ""):
+        pokemon.health = min(pokemon.max_health, pokemon.health + amount)
+        out.append(f"|-heal|{pokemon.identifier}|{pokemon.format_health()}{source}")
+
+    # Define a function that inflicts a move's ailment on a Pokemon, only status conditions and
+    # confusion are simulated
+    def inflict(self, pokemon: BattlePokemon, move: Move, out: list[str]):
+        if move.ailment == MoveAilment.CONFUSION:
+            if pokemon.confusion_turns > 0:
+                if move.damage_class == DamageClass.STATUS:
+                    out.append(f"|-fail|{pokemon.identifier}|confusion")
+                return
+            # Confusion lasts for 1 to 4 turns
+            pokemon.confusion_turns = self.random.randint(2, 5)
+            out.append(f"|-start|{pokemon.identifier}|confusion")
+            return
+
+        status = STATUS_IDS.get(move.ailment)
+        if status is None:
+            return
+        # A Pokemon can only have one status condition and some types are immune to some conditions
+        if pokemon.status is not None or any(pokemon_type in STATUS_IMMUNITIES[status] for pokemon_type in pokemon.types):
+            if move.damage_class == DamageClass.STATUS:
+                out.append(f"|-fail|{pokemon.identifier}|{status}")
+            return
+        # Toxic badly poisons instead of poisoning
+        if status == "psn" and move.name == "toxic":
+            status = "tox"
+        pokemon.status = status
+        if status == "slp":
+            # Sleep lasts for 1 to 3 turns
+            pokemon.sleep_turns = self.random.randint(2, 4)
+        out.append(f"|-status|{pokemon.identifier}|{status}")
+
+    # Define a function that changes a stat stage of a Pokemon, stages range from -6 to 6
+    def boost(self, pokemon: BattlePokemon, stat: str, change: int, out: list[str]):
+        if stat not in pokemon.boosts:
+            return
+        stage = max(-6, min(6, pokemon.boosts[stat] + change))
+        amount = stage - pokemon.boosts[stat]
+        pokemon.boosts[stat] = stage
+        action = "-boost" if change > 0 else "-unboost"
+        out.append(f"|{action}|{pokemon.identifier}|{BOOST_IDS[stat]}|{abs(amount)}")
+
+# Define the 'BattleEngine' class which answers the requests of the battle simulation server's
+# protocol (see 'BattleClient') by simulating every battle in-process
+class BattleEngine:
+    def __init__(self, seed: Any = None):
+        # Initialize fields
+        self.random = random.Random(seed) # Seeds every battle, so a seeded engine plays the same battles
+        self.battles: dict[str, LocalBattle] = {}
+        self.ended: OrderedDict[str, None] = OrderedDict() # The IDs of the most recent battles that have ended, commands sent to them are ignored
+        self.next_id = itertools.count(1)
+
+    # Define a function that handles a request, returns the responses to send back
+    def handle(self, request: dict[str, Any]) -> list[dict[str, Any]]:
+        action = request.get("action")
+        if action == "create":
+            battle = LocalBattle(str(next(self.next_id)), self.random.getrandbits(64))
+            self.battles[battle.battle_id] = battle
+            return [{"action": "create", "battle_id": battle.battle_id}]
+
+        if action == "command":
+            battle = self.battles.get(request.get("battle_id"))
+            if battle is None:
+                # A listener can send a command as the battle ends (ex: a switch after the last faint)
+                if request.get("battle_id") in self.ended:
+                    return []
+                return [{"error": f"Unknown battle: {request.get('battle_id')}", "battle_id": request.get("battle_id")}]
+            messages = battle.command(request.get("command", ""))
+            # Forget the battle once it has ended
+            if battle.ended:
+                del self.battles[battle.battle_id]
+                self.ended[battle.battle_id] = None
+                if len(self.ended) > RECENT_BATTLES:
+                    self.ended.popitem(last=False)
+            return [{"action": "message", "battle_id": battle.battle_id, "output": message} for message in messages]
+
+        return [{"error": f"Unknown action: {action}"}]
+
+# Define the 'LocalTransport' class which is used like an 'AsyncTransport' but answers
+# with a 'BattleEngine' instead of a connection. Lines are handled on the shared event
+# loop's thread like received lines are, so listeners are called on the same thread and
+# a listener that sends a command never handles its answer before it has returned
+class LocalTransport:
+    def __init__(self, engine: BattleEngine | None = None):
+        # Initialize fields
+        self.engine = engine if engine is not None else BattleEngine()
+        self.loop = get_event_loop()
+        self.closed = False
+        self.on_line: Callable[[str], None] | None = None
+        self.on_message: Callable[[dict], None] | None = None
+        self.on_close: Callable[[], None] | None = None
+
+    # Define a function that starts handling lines, 'on_line' is called with every line answered
+    # and 'on_close' once the transport has closed, both are called on the event loop's thread. If
+    # 'on_message' is given it is called with every answer instead of 'on_line', without encoding it
+    def open(self, on_line: Callable[[str], None], on_close: Callable[[], None] | None = None,
+             on_message: Callable[[dict], None] | None = None):
+        self.on_line = on_line
+        self.on_message = on_message
+        self.on_close = on_close
+
+    # Define a function to send a line
+    def send(self, line: str):
+        # Ensure the transport is open
+        if self.closed:
+            raise ConnectionError("Transport is closed")
+        self.loop.call_soon_threadsafe(self.__handle, line)
+
+    # Define the function that answers a line on the event loop's thread
+    def __handle(self, line: str):
+        try:
+            for response in self.engine.handle(json.loads(line)):
+                if self.closed:
+                    return
+                if self.on_message is not None:
+                    self.on_message(response)
+                else:
+                    self.on_line(json.dumps(response))
+        except Exception as e: # Catch any errors, closing the transport like a failed read would
+            print(f"Local battle failed: {e}")
+            self.close()
+
+    # Define a function to close the transport
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.on_close is not None:
+            self.loop.call_soon_threadsafe(self.on_close)
@@ -0,0 +1,173 @@
+# This file defines the recorder and replayer of battle protocol traffic. A recorder
+# writes every line a 'BattleClient' sends and receives, with the time since the
+# recording started, to a gzip compressed file that is only ever appended to. A
+# recording can then be replayed through a new 'BattleClient' without any connection,
+# at full speed (to profile or regression-test the parsers) or in real time (to watch
+# a battle again).
+
+# Every battle recorded to a file starts with a header line (#1 <unix time>) and is
+# followed by one line per protocol line: <nanoseconds>\t<direction>\t<line>, where the
+# direction is '<' for a line received and '>' for a line sent. Lines are JSON so they
+# never contain tabs or newlines.
+
+# Imports
+
+import gzip
+import json
+import threading
+import time
+import uuid
+from typing import Callable, Iterator
+
+from src.pokemon.pokemon import Pokemon
+
+# Define the version of the recording format
+RECORDING_VERSION = 1
+
+# Define the directions of a recorded line
+INBOUND = "<"
+OUTBOUND = ">"
+
+# Define the 'BattleRecorder' class which appends the lines of one battle to a recording
+class BattleRecorder:
+    def __init__(self, path: str, compress_level: int = 6):
+        # Initialize fields
+        self.path = path
+        self.lock = threading.Lock() # Lines are received and sent on different threads
+        self.file = gzip.open(path, "at", encoding="utf-8", compresslevel=compress_level)
+        self.start = time.monotonic_ns()
+        self.closed = False
+        self.file.write(f"#{RECORDING_VERSION} {time.time():.3f}\n")
+
+    # Define a function that records a line in a direction
+    def record(self, direction: str, line: str):
+        timestamp = time.monotonic_ns() - self.start
+        with self.lock:
+            if not self.closed:
+                self.file.write(f"{timestamp}\t{direction}\t{line.strip()}\n")
+
+    # Define a function that closes the recording, the lines are only sure to be written once it has closed
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.file.close()
+
+# Define the 'Recording' class which is one recorded battle
+class Recording:
+    def __init__(self, started_at: float, records: list[tuple[int, str, str]]):
+        # Initialize fields
+        self.started_at = started_at # The unix time the recording started at
+        self.records = records # Every line as (nanoseconds since the start, direction, line)
+
+    # Define a function that returns the duration of the recording in seconds
+    def get_duration(self) -> float:
+        return self.records[-1][0] / 1e9 if self.records else 0
+
+    # Define a function that returns the recorded lines in a direction
+    def get_lines(self, direction: str) -> list[str]:
+        return [line for _, record_direction, line in self.records if record_direction == direction]
+
+    # Define a function that rebuilds the teams sent by the battle's '>player' commands, every
+    # Pokemon keeps its UUID so the recorded messages name the same Pokemon
+    def get_teams(self) -> dict[str, list[Pokemon]]:
+        # Import here to avoid circular import error
+        from src.game.battle_engine import BattlePokemon
+
+        teams = {}
+        for line in self.get_lines(OUTBOUND):
+            command = json.loads(line).get("command", "")
+            if not command.startswith(">player "):
+                continue
+            _, side, data = command.split(" ", 2)
+            team = []
+            for packed in json.loads(data)["team"].split("]"):
+                pokemon = BattlePokemon.unpack(side, packed).pokemon
+                pokemon.uuid = uuid.UUID(packed.split("|")[2])
+                team.append(pokemon)
+            teams[side] = team
+        return teams
+
+# Define a function that reads every battle of a recording file in order
+def read_recordings(path: str) -> Iterator[Recording]:
+    recording = None
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            # Check if this is the header of the next battle
+            if line.startswith("#"):
+                if recording is not None:
+                    yield recording
+                version, started_at = line[1:].split()
+                # Ensure the recording can be read
+                if int(version) != RECORDING_VERSION:
+                    raise ValueError(f"Unsupported recording version: {version}")
+                recording = Recording(float(started_at), [])
+                continue
+            timestamp, direction, data = line.rstrip("\n").split("\t", 2)
+            recording.records.append((int(timestamp), direction, data))
+    if recording is not None:
+        yield recording
+
+# Define the 'ReplayTransport' class which is used like an 'AsyncTransport' but hands a recording's
+# received lines to the battle instead of a connection. The lines sent are kept instead of being
+# sent, so they can be compared with the recorded ones
+class ReplayTransport:
+    def __init__(self, recording: Recording, realtime: bool = False):
+        # Initialize fields
+        self.recording = recording
+        self.realtime = realtime # Whether the lines are handed over at the pace they were received
+        self.sent: list[str] = []
+        self.closed = False
+        self.on_line: Callable[[str], None] | None = None
+        self.on_close: Callable[[], None] | None = None
+
+    # Define a function that stores the callbacks, nothing is handed over until 'replay' is called.
+    # The recorded lines are handed over as lines so they go through the same parsing as when they
+    # were received, 'on_message' (see 'BattleSession.open') is never called
+    def open(self, on_line: Callable[[str], None], on_close: Callable[[], None] | None = None,
+             on_message: Callable[[dict], None] | None = None):
+        self.on_line = on_line
+        self.on_close = on_close
+
+    # Define a function to send a line
+    def send(self, line: str):
+        # Ensure the transport is open
+        if self.closed:
+            raise ConnectionError("Transport is closed")
+        self.sent.append(line)
+
+    # Define a function that hands every received line to the battle on the calling thread, returns
+    # once the recording has been replayed or the transport has been closed
+    def replay(self):
+        start = time.monotonic_ns()
+        for timestamp, direction, line in self.recording.records:
+            if self.closed:
+                break
+            if direction != INBOUND:
+                continue
+            # Wait until the line was received, when replaying in real time
+            if self.realtime:
+                delay = (start + timestamp - time.monotonic_ns()) / 1e9
+                if delay > 0:
+                    time.sleep(delay)
+            self.on_line(line)
+        self.close()
+
+    # Define a function to close the transport
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.on_close is not None:
+            self.on_close()
+
+# Define a function that creates a battle that replays a recording, with the recorded teams.
+# Listeners can be attached to the battle before calling 'replay' on the returned transport
+def create_replay(recording: Recording, realtime: bool = False):
+    # Import here to avoid circular import error
+    from src.game.battle_client import BattleClient
+
+    teams = recording.get_teams()
+    transport = ReplayTransport(recording, realtime)
+    return BattleClient(teams["p1"], teams["p2"], False, transport), transport
@@ -0,0 +1,168 @@
+# This file defines the headless battle runner, which plays many battles between
+# generated teams without a Tkinter root or a 'BattleWindow'. Both sides choose
+# their moves with the AI's policy ('BattleClient.ai_use_move') and the player side
+# sends out its next healthy Pokemon when one faints, like 'BattleWindow' does. The
+# battles are spread across a process pool, every worker loads the packs once and
+# plays its share of the battles at once on its own transport event loop with the
+# in-process battle engine. Once every battle has ended the battles per second, the
+# distribution of the amount of turns and the win rate of each side are reported. The
+# time is measured from the start of the first chunk to the end of the last one, the
+# time the workers took to load the packs is reported apart from it.
+
+# Usage: python -m src.game.battle_runner [battle count] [team size] [processes] [seed]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_client import BattleClient, BattleEvent, Battler
+from src.game.battle_engine import BattleEngine, LocalTransport
+from src.pack_processor import load_packs
+from src.pokemon.pokemon import Pokemon
+
+# Define the level of every generated Pokemon
+LEVEL = 50
+
+# Define the amount of battles a worker plays at once, per task
+CHUNK_SIZE = 50
+
+# Define the most time (in seconds) a battle can take before it is counted as unfinished
+BATTLE_TIMEOUT = 60
+
+# Define the width of a turn count bucket in the reported distribution
+BUCKET_SIZE = 5
+
+# Define the time (in seconds) the worker process took to load the packs, handed back with the
+# first chunk it plays and cleared afterwards so each worker's time is only counted once
+load_time: float | None = None
+
+# Define a function that loads the packs in a worker process, called once when the worker starts
+def init_worker(packs_path: str):
+    global load_time
+    start = time.perf_counter()
+    holder.pack = load_packs(packs_path)
+    load_time = time.perf_counter() - start
+
+# Define a function that generates the teams of a battle, the species only depend on the seed
+# and the battle's index so the same battles are played with any amount of processes
+def generate_teams(seed: int, index: int, team_size: int) -> tuple[list[Pokemon], list[Pokemon]]:
+    rng = random.Random(seed * 1_000_003 + index)
+    species = rng.sample(holder.pack.species, team_size * 2)
+    return [entry.spawn(LEVEL) for entry in species[:team_size]], [entry.spawn(LEVEL) for entry in species[team_size:]]
+
+# Define a function that starts a battle with both sides played by the AI, returns an event that
+# is set once the battle has ended. The result (the amount of turns and whether the player won)
+# is appended to the results
+def start_battle(player: list[Pokemon], opponent: list[Pokemon], seed: int, results: list) -> threading.Event:
+    done = threading.Event()
+    battle = BattleClient(player, opponent, False, LocalTransport(BattleEngine(seed)))
+
+    # Define the turn callback, the opponent's move is chosen by the listener the battle attaches itself
+    def on_turn(turn: int):
+        battle.turn = turn
+        battle.ai_use_move(turn, Battler.PLAYER)
+
+    # Define the faint callback, the player sends out its next healthy Pokemon
+    def on_faint(pokemon: Pokemon):
+        if pokemon in battle.player:
+            healthy = [entry for entry in battle.player if entry.get_health() > 0]
+            if healthy:
+                battle.switch(Battler.PLAYER, healthy[0])
+
+    # Define the end callback
+    def on_end(won: bool):
+        results.append((battle.turn, won))
+        battle.disconnect()
+        done.set()
+
+    battle.on(BattleEvent.STARTED, lambda: (battle.start(), battle.send_teams(), battle.send_layouts()))
+    battle.on(BattleEvent.TURN_CHANGE, on_turn)
+    battle.on(BattleEvent.FAINTED, on_faint)
+    battle.on(BattleEvent.END, on_end)
+    battle.create()
+    return done
+
+# Define a function that plays a chunk of battles at once in a worker, returns the result of every
+# battle that finished, the amount of battles that didn't, when the chunk started and ended (wall
+# clock time, which every process shares) and the worker's pack loading time if it hasn't been
+# returned yet
+def run_chunk(seed: int, indices: range, team_size: int) -> tuple[list[tuple[int, bool]], int, float, float, float | None]:
+    global load_time
+    started = time.time()
+    results = []
+    events = [start_battle(*generate_teams(seed, index, team_size), seed + index, results) for index in indices]
+    deadline = time.monotonic() + BATTLE_TIMEOUT
+    unfinished = sum(1 for event in events if not event.wait(max(0.0, deadline - time.monotonic())))
+    worker_load_time, load_time = load_time, None
+    # Copy the results, a battle that didn't finish in time could still append to them
+    return list(results), unfinished, started, time.time(), worker_load_time
+
+# Define a function that plays every battle across a process pool, returns the results of the
+# battles that finished, the amount that didn't, the time from the start of the first chunk to
+# the end of the last one and the time each worker took to load the packs
+def run_battles(count: int, team_size: int, processes: int, seed: int = 0,
+                packs_path: str = "packs") -> tuple[list[tuple[int, bool]], int, float, list[float]]:
+    results = []
+    unfinished = 0
+    load_times = []
+    started, ended = math.inf, 0.0
+    with ProcessPoolExecutor(processes, initializer=init_worker, initargs=(packs_path,)) as pool:
+        futures = [
+            pool.submit(run_chunk, seed, range(first, min(first + CHUNK_SIZE, count)), team_size)
+            for first in range(0, count, CHUNK_SIZE)
+        ]
+        for future in futures:
+            chunk_results, chunk_unfinished, chunk_started, chunk_ended, worker_load_time = future.result()
+            results += chunk_results
+            unfinished += chunk_unfinished
+            started, ended = min(started, chunk_started), max(ended, chunk_ended)
+            if worker_load_time is not None:
+                load_times.append(worker_load_time)
+    return results, unfinished, max(0.0, ended - started), load_times
+
+# Define a function that prints the report of a run
+def report(results: list[tuple[int, bool]], unfinished: int, elapsed: float, load_times: list[float]):
+    turns = sorted(turn for turn, _ in results)
+    won = sum(1 for _, player_won in results if player_won)
+    if load_times:
+        print(f"  Pack loading (not timed): {len(load_times)} workers, {statistics.mean(load_times):.2f} s each on average")
+    print(f"  {len(results)} battles finished in {elapsed:.2f} s, {len(results) / elapsed:,.1f} battles/s, " +
+          f"{sum(turns) / elapsed:,.0f} turns/s")
+    if unfinished:
+        print(f"  {unfinished} battles didn't finish within {BATTLE_TIMEOUT} s")
+    if not results:
+        return
+
+    # Report the win rate of each side, both play with the same policy
+    print(f"  Win rate: player {won / len(results):.1%}, opponent {1 - won / len(results):.1%}")
+
+    # Report the distribution of the amount of turns
+    print(f"  Turns: min {turns[0]}, median {statistics.median(turns):g}, mean {statistics.mean(turns):.1f}, " +
+          f"p90 {turns[int(len(turns) * 0.9) - 1] if len(turns) >= 10 else turns[-1]}, max {turns[-1]}")
+    buckets = {}
+    for turn in turns:
+        bucket = turn // BUCKET_SIZE * BUCKET_SIZE
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    largest = max(buckets.values())
+    for bucket, amount in sorted(buckets.items()):
+        print(f"    {bucket:>4}-{bucket + BUCKET_SIZE - 1:<4} {amount:>6} {'#' * max(1, round(amount / largest * 40))}")
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    team_size = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    print(f"{count} battles of {team_size} against {team_size} Pokemon on {processes} processes")
+    report(*run_battles(count, team_size, processes, seed))
@@ -0,0 +1,110 @@
+# This file defines a local battle server that speaks the same JSON lines protocol as
+# the battle simulation server, with every battle simulated by the in-process battle
+# engine. It accepts 'create' and 'command' requests and streams back the 'create'
+# replies and 'message' lines, so a 'BattleClient' can play against it over a real
+# connection (ex: to load-test the client or measure the protocol's overhead) without
+# the public server. One asyncio event loop serves every client.
+
+# Usage: python -m src.game.battle_server [port] [seed]
+# Must be run from the game folder, the packs are loaded from 'packs'
+
+# Imports
+
+import asyncio
+import json
+import random
+import sys
+from typing import Any
+
+from src import holder # Imported first to resolve the circular imports the same way the game does
+from src.game.battle_engine import BattleEngine
+from src.game.transport import LineFramer
+from src.pack_processor import load_packs
+
+# Define the port the server listens on by default, the same as the battle simulation server
+DEFAULT_PORT = 3000
+
+# Define the 'BattleServerProtocol' class which serves one client connection, the client's
+# battles are simulated by an engine of its own and forgotten when the connection closes
+class BattleServerProtocol(asyncio.BufferedProtocol):
+    def __init__(self, seed: Any = None):
+        # Initialize fields
+        self.engine = BattleEngine(seed)
+        self.framer = LineFramer()
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.framer.get_buffer()
+
+    def buffer_updated(self, nbytes: int):
+        try:
+            lines = self.framer.feed(nbytes)
+        except ValueError as e: # The line is too long, the connection can't be read any further
+            self.write([{"error": str(e)}])
+            self.transport.close()
+            return
+
+        # Answer every line received, all the answers are written at once
+        responses = []
+        for line in lines:
+            if line.strip():
+                responses += self.handle(line)
+        if responses:
+            self.write(responses)
+
+    # Define a function that answers a request line
+    def handle(self, line: str) -> list[dict[str, Any]]:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return [{"error": f"Invalid JSON: {e}"}]
+        if not isinstance(request, dict):
+            return [{"error": "Requests must be JSON objects"}]
+        # Ensure every request has an action
+        if "action" not in request:
+            return [{"error": "Requests must specify an action"}]
+        try:
+            return self.engine.handle(request)
+        except Exception as e: # Catch any errors, a bad command only fails its own request
+            return [{"error": f"Failed to handle request: {e}", "battle_id": request.get("battle_id")}]
+
+    # Define a function that writes responses as JSON lines
+    def write(self, responses: list[dict[str, Any]]):
+        if not self.transport.is_closing():
+            self.transport.write("".join(json.dumps(response) + "\n" for response in responses).encode())
+
+    def connection_lost(self, exc: Exception | None):
+        self.engine.battles.clear()
+        self.engine.ended.clear()
+
+# Define a coroutine that starts a battle server on the running event loop, a seeded server plays
+# the same battles for the same requests. Port 0 picks a free port, see 'asyncio.Server.sockets'
+async def start_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, seed: Any = None) -> asyncio.Server:
+    seeds = random.Random(seed)
+    return await asyncio.get_running_loop().create_server(
+        lambda: BattleServerProtocol(seeds.getrandbits(64)), host, port, backlog=4096
+    )
+
+# Define a coroutine that runs a battle server until it is stopped
+async def serve(host: str, port: int, seed: Any = None):
+    server = await start_server(host, port, seed)
+    # Print the address, a parent process reads the port from this line when it starts the server on port 0
+    print(f"Battle server listening on {host}:{server.sockets[0].getsockname()[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    # Load the packs like the game does, the engine looks the moves of every team up in them
+    holder.pack = load_packs("packs")
+    try:
+        asyncio.run(serve("127.0.0.1", port, seed))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,254 @@
+# This file defines the pool of connections to the battle simulation server. Rather than
+# opening a connection for every battle and closing it afterwards, battles share a few
+# connections that are kept open, so a battle doesn't wait for a connection to be made.
+# Every battle on a connection is told apart by its battle ID, the 'create' replies are
+# matched to the battles that asked for them in the order they were asked for.
+
+# Imports
+
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Callable
+
+from src.game.transport import AsyncTransport
+
+# Define the amount of connections a pool keeps open by default
+DEFAULT_POOL_SIZE = 2
+
+# Define the command that ends a battle that is closed before it has ended (ex: the player ran
+# away), the player's side forfeits. The battle simulator ends a battle the same way
+END_COMMAND = ">forcelose p1"
+
+# Define the amount of closed battles a connection remembers, the lines still sent for them
+# (ex: the win message after a forfeit) are dropped without a warning
+RECENT_BATTLES = 256
+
+# Define the 'PooledConnection' class which shares one connection between many battles
+class PooledConnection:
+    def __init__(self, host: str, port: int, on_close: Callable[["PooledConnection"], None]):
+        # Initialize fields
+        self.transport = AsyncTransport(host, port)
+        self.on_close = on_close
+        self.closed = False
+        self.lock = threading.Lock()
+        self.sessions: set[BattleSession] = set() # Every battle using this connection
+        self.battles: dict[str, BattleSession] = {} # The battles that have been created by their battle ID
+        self.creating: deque[BattleSession] = deque() # The battles waiting for their 'create' reply, in order
+        self.closed_battles: OrderedDict[str, None] = OrderedDict() # The IDs of the most recently closed battles
+        self.transport.open(self.__handle_line, self.__handle_close)
+
+    # Define a function that adds a battle to this connection
+    def attach(self, session: "BattleSession"):
+        with self.lock:
+            self.sessions.add(session)
+
+    # Define a function that removes a battle from this connection, the connection stays open. A battle
+    # that hasn't ended is ended on the server, one still waiting for its 'create' reply is ended once
+    # the reply arrives, so it stays queued
+    def detach(self, session: "BattleSession"):
+        with self.lock:
+            self.sessions.discard(session)
+            if session.battle_id is None:
+                return
+            self.battles.pop(session.battle_id, None)
+            self.__remember(session.battle_id)
+        if not session.ended:
+            self.end(session.battle_id)
+
+    # Define a function that remembers the ID of a closed battle, must be called with the lock held
+    def __remember(self, battle_id: str):
+        self.closed_battles[battle_id] = None
+        if len(self.closed_battles) > RECENT_BATTLES:
+            self.closed_battles.popitem(last=False)
+
+    # Define a function that ends a battle on the server
+    def end(self, battle_id: str):
+        # Ensure the connection is open, the server ends every battle on a connection that has closed
+        if self.closed:
+            return
+        try:
+            self.transport.send(json.dumps({"action": "command", "command": END_COMMAND, "battle_id": battle_id}))
+        except ConnectionError:
+            pass
+
+    # Define a function that sends a line for a battle, the first line a battle sends
+    # before it has a battle ID is its 'create' request
+    def send(self, session: "BattleSession", line: str):
+        with self.lock:
+            if session.battle_id is None and session not in self.creating:
+                self.creating.append(session)
+        self.transport.send(line)
+
+    # Define a function that returns the battle a decoded line is meant for
+    def __route(self, obj: dict) -> "BattleSession | None":
+        with self.lock:
+            battle_id = obj.get("battle_id")
+            # Match a 'create' reply to the oldest battle waiting for one
+            if obj.get("action") == "create" and battle_id is not None and self.creating:
+                session = self.creating.popleft()
+                session.battle_id = battle_id
+                # Check if the battle was closed while it was being created, it is ended right away
+                if session.closed:
+                    self.__remember(battle_id)
+                else:
+                    self.battles[battle_id] = session
+                return session
+            if battle_id is not None:
+                session = self.battles.get(battle_id)
+                # Check if this is the battle's win message, a battle that has ended isn't ended again when it's closed
+                if session is not None and str(obj.get("output", "")).startswith("|win|"):
+                    session.ended = True
+                return session
+            # An error without a battle ID answers the oldest 'create' request
+            if "error" in obj and self.creating:
+                return self.creating.popleft()
+            # Otherwise the line can only be routed if one battle is using this connection
+            if len(self.sessions) == 1:
+                return next(iter(self.sessions))
+        return None
+
+    # Define the callback for every line received, decodes it once and passes it on to its battle
+    def __handle_line(self, line: str):
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            obj = None
+        # A value that isn't an object (ex: null) can't be routed either, it is passed on as a line
+        decoded = isinstance(obj, dict)
+        if not decoded:
+            obj = {}
+
+        session = self.__route(obj)
+        if session is None:
+            # Add debugging print to notify that a line couldn't be routed, unless its battle was closed
+            with self.lock:
+                closed_battle = obj.get("battle_id") in self.closed_battles
+            if not closed_battle:
+                print(f"Dropped a battle simulation server message for an unknown battle: {line.strip()}")
+            return
+        # Check if the battle was closed before its 'create' reply arrived
+        if session.closed:
+            self.end(session.battle_id)
+            return
+        try:
+            # Hand the decoded message over if the battle takes one, so it isn't decoded again
+            if decoded and session.on_message is not None:
+                session.on_message(obj)
+            else:
+                session.on_line(line)
+        except Exception as e: # Catch any errors, only the battle that failed is closed since others share the connection
+            print(f"Battle {session.battle_id} failed: {e}")
+            session.close()
+            if session.on_close is not None:
+                session.on_close()
+
+    # Define the callback for when the connection has closed, every battle on it is closed too
+    def __handle_close(self):
+        with self.lock:
+            self.closed = True
+            sessions = list(self.sessions)
+        for session in sessions:
+            if session.on_close is not None:
+                session.on_close()
+        self.on_close(self)
+
+    # Define a function to close the connection
+    def close(self):
+        self.transport.close()
+
+# Define the 'BattleSession' class which is the transport of one battle on a pooled connection,
+# it is used like an 'AsyncTransport' but closing it hands the connection back to the pool
+class BattleSession:
+    def __init__(self, connection: PooledConnection):
+        # Initialize fields
+        self.connection = connection
+        self.battle_id: str | None = None
+        self.closed = False
+        self.ended = False # Whether the server has ended the battle (ex: one side won)
+        self.on_line: Callable[[str], None] | None = None
+        self.on_message: Callable[[dict], None] | None = None
+        self.on_close: Callable[[], None] | None = None
+
+    # Define a function that starts receiving the battle's lines, the connection is already open and
+    # the session was attached to it by the pool. Lines are decoded to be routed, if 'on_message' is
+    # given it is called with the decoded message instead of 'on_line' so it isn't decoded again
+    def open(self, on_line: Callable[[str], None], on_close: Callable[[], None] | None = None,
+             on_message: Callable[[dict], None] | None = None):
+        self.on_line = on_line
+        self.on_message = on_message
+        self.on_close = on_close
+
+    # Define a function to send a line
+    def send(self, line: str):
+        # Ensure the session is open
+        if self.closed or self.connection.closed:
+            raise ConnectionError("Transport is closed")
+        self.connection.send(self, line)
+
+    # Define a function that hands the connection back to the pool, ending the battle on the
+    # server if it hasn't ended
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.connection.detach(self)
+
+# Define the 'ConnectionPool' class which keeps connections to a battle simulation server open
+class ConnectionPool:
+    def __init__(self, host: str, port: int, size: int = DEFAULT_POOL_SIZE):
+        # Initialize fields
+        self.host = host
+        self.port = port
+        self.size = size
+        self.lock = threading.Lock()
+        self.connections: list[PooledConnection] = []
+
+    # Define a function that opens connections until the pool is full, without waiting for them
+    def warm(self):
+        with self.lock:
+            while len(self.connections) < self.size:
+                self.__open()
+
+    # Define a function that opens a connection, must be called with the lock held
+    def __open(self) -> PooledConnection:
+        connection = PooledConnection(self.host, self.port, self.__remove)
+        self.connections.append(connection)
+        return connection
+
+    # Define the callback for when a connection has closed, a new one is opened when it's needed
+    def __remove(self, connection: PooledConnection):
+        with self.lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+
+    # Define a function that returns a transport for a new battle, on the connection with the fewest battles
+    def session(self) -> BattleSession:
+        with self.lock:
+            connections = [connection for connection in self.connections if not connection.closed]
+            if len(connections) < self.size:
+                connections.append(self.__open())
+            connection = min(connections, key=lambda entry: len(entry.sessions))
+            # Attach the session while the lock is held, so battles started together are spread across the connections
+            session = BattleSession(connection)
+            connection.attach(session)
+        return session
+
+    # Define a function that closes every connection of the pool
+    def close(self):
+        with self.lock:
+            connections = self.connections
+            self.connections = []
+        for connection in connections:
+            connection.close()
+
+# Define the pools by the server they connect to and the lock that guards their creation
+_pools: dict[tuple[str, int], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Define a function that returns the pool of connections to a server, creating it the first time
+def get_connection_pool(host: str, port: int) -> ConnectionPool:
+    with _pools_lock:
+        if (host, port) not in _pools:
+            _pools[(host, port)] = ConnectionPool(host, port)
+        return _pools[(host, port)]
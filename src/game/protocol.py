@@ -0,0 +1,57 @@
+# This file defines the dispatch table used to handle the messages sent by the
+# battle simulation server. Every message is a line of fields separated by pipes
+# with its action in the second field (ex: |move|p1a: ...|Tackle|p2a: ...), only
+# the action is split off and the rest of the message is handed to the parser
+# registered for it.
+
+# Imports
+
+from typing import Any, Callable
+
+# Define the type of a parser, it takes the context the message is handled for (such as
+# a 'BattleClient'), the fields after the action (ex: p1a: ...|Tackle|p2a: ...) and the
+# function to call each event with, ex: call(BattleEvent.TURN_CHANGE, 2). Events are called
+# directly instead of returned so that no list or tuple is built for every message
+Parser = Callable[[Any, str, Callable[..., Any]], None]
+
+# Define the 'ProtocolDispatcher' class which maps each action to its parser
+class ProtocolDispatcher:
+    def __init__(self):
+        # Initialize fields
+        self.parsers: dict[str, Parser] = {}
+
+    # Define a function to register the parser of an action, replacing any previous parser.
+    # Without a parser this returns a decorator, ex: @dispatcher.register("-activate")
+    def register(self, action: str, parser: Parser | None = None):
+        if parser is None:
+            def decorator(function: Parser) -> Parser:
+                self.parsers[action] = function
+                return function
+            return decorator
+        self.parsers[action] = parser
+        return parser
+
+    # Define a function to remove the parser of an action
+    def unregister(self, action: str):
+        # Ensure the action has a parser
+        if action not in self.parsers:
+            raise KeyError(f"No parser registered for action '{action}'")
+        del self.parsers[action]
+
+    # Define a function that returns a copy of this dispatcher, so that the
+    # copy's parsers can be changed without affecting this one
+    def copy(self) -> "ProtocolDispatcher":
+        dispatcher = ProtocolDispatcher()
+        dispatcher.parsers = self.parsers.copy()
+        return dispatcher
+
+    # Define a function that hands a message to the parser of its action, messages without an
+    # action or with an action that has no parser are ignored
+    def dispatch(self, context: Any, message: str, call: Callable[..., Any]):
+        # Split off the action only, ex: |turn|2 -> ["", "turn", "2"]
+        head = message.split("|", 2)
+        if len(head) < 2:
+            return
+        parser = self.parsers.get(head[1])
+        if parser is not None:
+            parser(context, head[2] if len(head) == 3 else "", call)
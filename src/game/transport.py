@@ -0,0 +1,226 @@
+# This file defines the transport that carries the JSON lines between a
+# 'BattleClient' and the battle simulation server. Every connection is driven
+# by one shared asyncio event loop running in a background thread, so opening
+# a connection never blocks the Tkinter thread and one thread can drive many
+# concurrent battles.
+
+# Imports
+
+import asyncio
+import threading
+from typing import Callable
+
+# Define the longest line that can be received, battle messages can be long
+MAX_LINE_LENGTH = 1 << 20
+
+# Define the size of the buffer the event loop receives data into
+RECEIVE_BUFFER_SIZE = 1 << 16
+
+# Define the shared event loop and the lock that guards its creation
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+# Define the set of open transports, the event loop only keeps weak references to
+# its tasks so this keeps a transport (and its task) alive until it has closed
+_open_transports: set = set()
+
+# Define a function that returns the shared event loop, starting it in a
+# background thread the first time it is needed
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            # Run the loop forever in a daemon thread so it stops with the game
+            threading.Thread(target=_loop.run_forever, name="battle-transport", daemon=True).start()
+        return _loop
+
+# Define the 'LineFramer' class which splits received data into lines. Data is received into
+# one reusable buffer and only complete lines are decoded (all of a chunk's complete lines at
+# once), so a burst of many lines is framed in linear time and a character split between two
+# chunks is decoded correctly
+class LineFramer:
+    def __init__(self, buffer_size: int = RECEIVE_BUFFER_SIZE, max_line_length: int = MAX_LINE_LENGTH):
+        # Initialize fields
+        self.buffer = bytearray(buffer_size) # The buffer data is received into
+        self.view = memoryview(self.buffer)
+        self.partial = bytearray() # The start of a line that hasn't been fully received yet
+        self.max_line_length = max_line_length
+
+    # Define a function that returns the buffer to receive data into
+    def get_buffer(self) -> memoryview:
+        return self.view
+
+    # Define a function that frames the data copied into the start of the buffer, returns the
+    # complete lines without their newlines. The data after the last newline is kept until
+    # the rest of its line is received
+    def feed(self, size: int) -> list[str]:
+        buffer = self.buffer
+        view = self.view
+        last = buffer.rfind(b"\n", 0, size)
+
+        # Keep the data if it doesn't complete a line
+        if last == -1:
+            self.__keep(view[:size])
+            return []
+
+        # Complete the line that was started by the previous data
+        lines = []
+        start = 0
+        if self.partial:
+            start = buffer.find(b"\n", 0, size) + 1
+            self.partial += view[:start - 1]
+            lines.append(self.partial.decode("utf-8"))
+            self.partial.clear()
+
+        # Decode every other complete line at once and split it into lines
+        if start <= last:
+            lines += str(view[start:last], "utf-8").split("\n")
+
+        # Keep the start of the next line
+        if last + 1 < size:
+            self.__keep(view[last + 1:size])
+        return lines
+
+    # Define a function that keeps the start of a line until the rest of it is received
+    def __keep(self, data: memoryview):
+        self.partial += data
+        # Ensure a line can't grow without limit
+        if len(self.partial) > self.max_line_length:
+            self.partial.clear()
+            raise ValueError(f"Received a line longer than {self.max_line_length} bytes")
+
+    # Define a function that frames data that has already been received, copying it into the buffer in parts
+    def feed_data(self, data: bytes) -> list[str]:
+        lines = []
+        data = memoryview(data)
+        for offset in range(0, len(data), len(self.buffer)):
+            part = data[offset:offset + len(self.buffer)]
+            self.view[:len(part)] = part
+            lines += self.feed(len(part))
+        return lines
+
+# Define the 'LineProtocol' class which receives data straight into a 'LineFramer' and calls
+# 'on_line' with every line, the 'closed' future is done once the connection has closed
+class LineProtocol(asyncio.BufferedProtocol):
+    def __init__(self, on_line: Callable[[str], None]):
+        # Initialize fields
+        self.on_line = on_line
+        self.framer = LineFramer()
+        self.transport: asyncio.Transport | None = None
+        self.closed = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.framer.get_buffer()
+
+    def buffer_updated(self, nbytes: int):
+        try:
+            for line in self.framer.feed(nbytes):
+                self.on_line(line)
+        except Exception as e: # Catch any errors, closing the connection like a failed read would
+            if not self.closed.done():
+                self.closed.set_exception(e)
+            self.transport.close()
+
+    def connection_lost(self, exc: Exception | None):
+        if not self.closed.done():
+            if exc is None:
+                self.closed.set_result(None)
+            else:
+                self.closed.set_exception(exc)
+
+# Define the 'AsyncTransport' class which connects to the battle simulation server
+# with asyncio streams, every method can be called from any thread
+class AsyncTransport:
+    def __init__(self, host: str, port: int):
+        # Initialize fields
+        self.host = host
+        self.port = port
+        self.loop = get_event_loop()
+        self.writer: asyncio.Transport | None = None
+        self.outgoing: list[bytes] = [] # Lines waiting to be written, kept while connecting
+        self.outgoing_lock = threading.Lock()
+        self.flush_scheduled = False
+        self.task: asyncio.Future | None = None
+        self.closed = False
+        self.on_line: Callable[[str], None] | None = None
+        self.on_close: Callable[[], None] | None = None
+
+    # Define a function that starts connecting without waiting for the connection, 'on_line'
+    # is called with every line received and 'on_close' once the connection has closed,
+    # both are called on the event loop's thread. Lines are handed over as they were received,
+    # so 'on_message' (see 'BattleSession.open') is never called
+    def open(self, on_line: Callable[[str], None], on_close: Callable[[], None] | None = None,
+             on_message: Callable[[dict], None] | None = None):
+        self.on_line = on_line
+        self.on_close = on_close
+        _open_transports.add(self)
+        self.task = asyncio.run_coroutine_threadsafe(self.__run(), self.loop)
+
+    # Define the coroutine that connects and then reads lines until the connection closes
+    async def __run(self):
+        try:
+            self.writer, protocol = await self.loop.create_connection(
+                lambda: LineProtocol(self.on_line), self.host, self.port
+            )
+            # Add debugging print to notify that a connection was established
+            print(f"Established connection with battle simulation server ({self.host}:{self.port})")
+            # Send the lines that were sent while connecting
+            self.__flush()
+            # Wait until the server closes the connection, every line is handled as it is received
+            await protocol.closed
+        except asyncio.CancelledError:
+            pass # The transport has been closed
+        except Exception as e: # Catch any errors
+            print(f"Battle simulation server connection ({self.host}:{self.port}) failed: {e}")
+        finally:
+            self.__close_writer()
+            _open_transports.discard(self)
+            if self.on_close is not None:
+                self.on_close()
+
+    # Define a function to send a line, the newline is added here. Lines are queued and every
+    # line sent before the event loop's next iteration is written at once, so a battle's
+    # setup commands (start, both teams and both layouts) are sent in a single write
+    def send(self, line: str):
+        # Ensure the transport is open
+        if self.closed:
+            raise ConnectionError("Transport is closed")
+        with self.outgoing_lock:
+            self.outgoing.append((line + "\n").encode())
+            # Check if a flush has already been scheduled for these lines
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.loop.call_soon_threadsafe(self.__flush)
+
+    # Define the function that writes the queued lines on the event loop's thread, the
+    # event loop's transport keeps whatever a short write leaves and sends it when it can
+    def __flush(self):
+        with self.outgoing_lock:
+            self.flush_scheduled = False
+            # Check if the connection has been established, the lines are flushed once it has
+            if self.writer is None or not self.outgoing:
+                return
+            data = b"".join(self.outgoing)
+            self.outgoing.clear()
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+    # Define a function to close the connection
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Stop reading, which closes the writer on the event loop's thread
+        if self.task is not None:
+            self.task.cancel()
+
+    # Define a function that closes the writer on the event loop's thread
+    def __close_writer(self):
+        self.closed = True
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.close()
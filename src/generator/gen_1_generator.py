@@ -338,8 +338,8 @@ with open("packs/gen-1.json", "w") as file:
     # The specified separators is a micro-optimization done to reduce the
     # size of the resulting JSON file by reducing unnecessary whitespace
     json.dump(purify_obj({
-        "species": list(map(lambda entry: entry.__dict__, all_species)),
-        "moves": list(map(lambda entry: entry.__dict__, all_moves))
+        "species": all_species,
+        "moves": all_moves
     }), file, separators=(",", ":"))
 
 # Inform the user that the script has finished and the pack has been generated
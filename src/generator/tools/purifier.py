@@ -7,6 +7,19 @@
 from enum import Enum
 from typing import Any, Iterable, Mapping
 
+# Define a function that collects the fields of an object that uses __slots__ into
+# a dictionary, in declaration order (base classes first), slots starting with an
+# underscore hold derived data and are skipped
+def get_slot_fields(obj: Any) -> dict[str, Any]:
+    fields = {}
+    # Iterate the class hierarchy from the base class down
+    for cls in reversed(type(obj).__mro__):
+        for name in getattr(cls, '__slots__', ()):
+            # Skip private slots and slots that have not been assigned
+            if not name.startswith('_') and hasattr(obj, name):
+                fields[name] = getattr(obj, name)
+    return fields
+
 # Define purify function which takes an object and returns a data structure (dict, list), primitive string, or none
 
 def purify_obj(obj: Any) -> list[Any] | str | None | dict[str, str] | Any:
@@ -28,6 +41,11 @@ def purify_obj(obj: Any) -> list[Any] | str | None | dict[str, str] | Any:
     if isinstance(obj, Iterable):
         return [ purify_obj(item) for item in obj ]
 
+    # Check if the object is a class object that stores its fields in slots,
+    # if so, obtain the fields of the object and purify them recursively
+    if hasattr(obj, '__slots__'):
+        return purify_obj(get_slot_fields(obj))
+
     # Check if the object is a class object, if so, obtain the fields
     # of the object and purify them recursively
     if hasattr(obj, '__dict__'):
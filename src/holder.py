@@ -35,23 +35,19 @@ catch_rate_mod = 1
 # Define the 'get_species' function that takes a species name and returns
 # a species object
 def get_species(species_name: str) -> Species:
-    # Filter pack species that match the species_name
-    filtered = list(filter(lambda entry: entry.name == species_name, pack.species))
-    # Check if filtered list is empty
-    if len(filtered) == 0:
+    # Look up the species in the pack's registry
+    try:
+        return pack.get_species(species_name)
+    except KeyError:
         # Raise a KeyError to indicate an invalid species name
-        raise KeyError("Invalid species: " + species_name)
-    # Return the first matching species
-    return filtered[0]
+        raise KeyError("Invalid species: " + species_name) from None
 
 # Define the 'get_move' function that takes a move name and returns
 # a move object
 def get_move(move_name: str) -> Move:
-    # Filter pack move that match the move
-    filtered = list(filter(lambda entry: entry.name == move_name, pack.moves))
-    # Check if filtered list is empty
-    if len(filtered) == 0:
+    # Look up the move in the pack's registry
+    try:
+        return pack.get_move(move_name)
+    except KeyError:
         # Raise a KeyError to indicate an invalid move name
-        raise KeyError("Invalid move: " + move_name)
-    # Return the first matching move
-    return filtered[0]
\ No newline at end of file
+        raise KeyError("Invalid move: " + move_name) from None
\ No newline at end of file
@@ -20,8 +20,10 @@ from tkinter import messagebox
 import json
 import os
 
+from src.game.connection_pool import get_connection_pool
 from src.menubar import setup_menubar
-from src.pack_processor import LoadedPack, load_pack
+from src.pack_compiler import compile_pack
+from src.pack_processor import LoadedPack, load_packs
 from src.utils import requests
 from src.windows.main_menu import MainMenu
 from src.windows.navigator import Navigator
@@ -75,8 +77,8 @@ def main():
     # which is defined later
     load_images()
 
-    # Load the generation 1 pack
-    loaded_pack = load_pack("packs/gen-1.json")
+    # Load every pack in the packs folder and merge them into one pack
+    loaded_pack = load_packs("packs")
 
     # Load all Pokemon sprites through the 'load_sprites' function
     # which is defined later
@@ -87,6 +89,11 @@ def main():
 
     # Define a callback function to handle when the main menu is complete
     def on_save_select():
+        # Open the connections to the battle simulation server in the background (unless battles
+        # are simulated in-process), so that the first battle doesn't have to wait for a connection
+        from src.game import battle_client
+        if not battle_client.simulate_locally:
+            get_connection_pool(battle_client.host, battle_client.port).warm()
         # Draw the navigator as main menu will only exit once a save is selected
         Navigator(root).draw()
 
@@ -106,13 +113,14 @@ def load_images():
 
 # Define the 'load_sprites' function to preload all Pokemon sprites with a given loaded pack
 def load_sprites(pack: LoadedPack):
-    # Iterate all the species in the pack
-    for species in pack.species:
+    # Iterate the names of all the species in the pack through the registry
+    # so that the species themselves don't have to be built
+    for species_name in pack.registry.species_by_name:
         # Load species sprites from disk
-        images.load_image(f"{species.name}_regular_front", f"assets/{species.name}/regular/front.png") # Regular Front
-        images.load_image(f"{species.name}_regular_back", f"assets/{species.name}/regular/back.png") # Regular Back
-        images.load_image(f"{species.name}_shiny_front", f"assets/{species.name}/shiny/front.png") # Shiny Front
-        images.load_image(f"{species.name}_shiny_back", f"assets/{species.name}/shiny/back.png") # Shiny Back
+        images.load_image(f"{species_name}_regular_front", f"assets/{species_name}/regular/front.png") # Regular Front
+        images.load_image(f"{species_name}_regular_back", f"assets/{species_name}/regular/back.png") # Regular Back
+        images.load_image(f"{species_name}_shiny_front", f"assets/{species_name}/shiny/front.png") # Shiny Front
+        images.load_image(f"{species_name}_shiny_back", f"assets/{species_name}/shiny/back.png") # Shiny Back
 
     # Load button icons
     images.load_image("encounter", f"assets/buttons/encounter_icon.png")
@@ -145,6 +153,9 @@ def download():
 
         # Iterate all packs in pack folder
         for pack in os.listdir("packs/"):
+            # Skip anything that isn't a JSON pack (such as compiled packs)
+            if not pack.endswith(".json"):
+                continue
             # Open pack file in read (R) mode with the file referenced as 'f'
             with open(f"packs/{pack}", 'r') as f:
                 # Load JSON as Python object
@@ -169,6 +180,12 @@ def download():
         # Inform user that asset download is complete
         print("Finished downloaded assets")
 
+    # Compile every JSON pack once all of them have been downloaded, so that later launches can memory-map them
+    for pack in os.listdir("packs/"):
+        if pack.endswith(".json"):
+            compile_pack(f"packs/{pack}")
+            print(f"Compiled {pack}")
+
 # Ensure that this file is being directly executed and not imported
 # as a module for another file
 if __name__ == '__main__':
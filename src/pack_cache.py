@@ -0,0 +1,113 @@
+# This file is responsible for caching fully built packs on disk so that later
+# launches can restore them instead of parsing the pack's JSON again. Each cache
+# file lives in a '.cache' folder next to the pack and is keyed by the size,
+# modification time and content hash of the pack it was built from.
+
+# Imports
+
+import hashlib
+import os
+import pickle
+import sys
+
+from src.pack_processor import LoadedPack, load_pack
+
+# Define the name of the cache folder, created next to the packs
+CACHE_FOLDER = ".cache"
+
+# Define the cache version, this must be increased whenever the layout of the
+# cached classes changes so that stale caches are ignored
+CACHE_VERSION = 3
+
+# Define a function that returns the path of the cache file for a pack
+def get_cache_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), CACHE_FOLDER, os.path.basename(path) + ".pickle")
+
+# Define a function that calculates the SHA-256 hash of a file's contents
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    # Open the file in read binary (RB) mode and hash it in chunks
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Define 'write_cached_pack' function that writes a fully built pack to the cache
+def write_cached_pack(path: str, pack: LoadedPack, content_hash: str | None = None):
+    cache_path = get_cache_path(path)
+    # Ensure the cache folder exists
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Build the cache key from the pack file
+    stat = os.stat(path)
+    key = {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": content_hash if content_hash is not None else hash_file(path)
+    }
+
+    # Copy the entries into plain lists so that every entry is built and can be pickled
+    built = LoadedPack(list(pack.species), list(pack.moves), pack.registry)
+
+    # Write the key followed by the pack to a temporary file, then move it into place
+    # so that a half-written cache is never read
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(built, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+
+# Define 'load_cached_pack' function that restores a pack from the cache,
+# returns None if there is no cache or if the pack has changed since it was cached
+def load_cached_pack(path: str) -> LoadedPack | None:
+    cache_path = get_cache_path(path)
+    # Check if there is a cache file
+    if not os.path.exists(cache_path):
+        return None
+
+    # Safely execute following code in a try-except block as the cache may be corrupt
+    try:
+        # Open the cache file in read binary (RB) mode
+        with open(cache_path, "rb") as f:
+            # Read the key first so that a stale pack isn't unpickled
+            key = pickle.load(f)
+            stat = os.stat(path)
+
+            # Check the cache version and the size of the pack
+            if key["version"] != CACHE_VERSION or key["size"] != stat.st_size:
+                return None
+            # The modification time can change without the contents changing (such as
+            # when the pack is downloaded again), so fall back to the content hash
+            if key["mtime"] != stat.st_mtime_ns:
+                content_hash = hash_file(path)
+                if key["hash"] != content_hash:
+                    return None
+                pack = pickle.load(f)
+                # Rewrite the cache with the new modification time
+                write_cached_pack(path, pack, content_hash)
+                return pack
+
+            # Restore the pack
+            return pickle.load(f)
+    except Exception as e: # Catch any errors
+        print(f"Ignoring unreadable pack cache {cache_path}: {e}")
+        return None
+
+# Define 'prewarm' function that builds the cache for every JSON pack in a directory
+def prewarm(directory: str = "packs"):
+    # Iterate all files in the directory
+    for file_name in sorted(os.listdir(directory)):
+        # Skip anything that isn't a JSON pack
+        if not file_name.endswith(".json"):
+            continue
+        path = os.path.join(directory, file_name)
+        # Loading a pack eagerly writes its cache if it is missing or stale
+        load_pack(path)
+        print(f"Cached {path} at {get_cache_path(path)}")
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    # Usage: python -m src.pack_cache [packs directory]
+    prewarm(sys.argv[1] if len(sys.argv) > 1 else "packs")
@@ -0,0 +1,377 @@
+# This file is responsible for compiling JSON packs into a compact binary
+# format and for loading those compiled packs back through a memory map.
+# A compiled pack is laid out as follows:
+#   - a fixed-size header (magic bytes, version, counts and section offsets)
+#   - an offset index for the species records and one for the move records
+#   - the fixed-width species records followed by the fixed-width move records
+#   - a string table holding every string and nested JSON blob the records refer to
+# Records are only decoded into Species/Move objects when they are accessed.
+
+# Imports
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+
+from src.pack_processor import COMPILED_PACK_MAGIC, LoadedPack, PackRegistry, RecordList, load_pack
+from src.pokemon.move import Move
+from src.pokemon.species import Species
+from src.pokemon.types.damage_class import DamageClass
+from src.pokemon.types.egg_groups import EggGroup
+from src.pokemon.types.growth_rate import GrowthRate
+from src.pokemon.types.move_ailment import MoveAilment
+from src.pokemon.types.move_category import MoveCategory
+from src.pokemon.types.move_target import MoveTarget
+from src.pokemon.types.stat import Stat
+
+# Define the version of the compiled pack format
+FORMAT_VERSION = 1
+
+# Define the file extension used by compiled packs
+COMPILED_EXTENSION = ".pack"
+
+# Define the header: magic, version, species count, move count, species index offset,
+# move index offset, species records offset, move records offset, string table offset
+HEADER = struct.Struct("<8sIIIIIIII")
+
+# Define the species record, strings and nested data are stored as (offset, length)
+# references into the string table
+SPECIES_RECORD = struct.Struct(
+    "<i" # dex_id
+    "II" # id
+    "II" # name
+    "II" # desc
+    "II" # genus
+    "II" # types (JSON)
+    "II" # abilities (JSON)
+    "II" # evolutions (JSON)
+    "dd" # height, weight
+    "II" # ev_yield (JSON)
+    "iii" # catch_rate, base_friendship, base_exp
+    "B" # growth_rate (enum index)
+    "II" # egg_groups (enum indexes)
+    "i" # egg_cycles
+    "dd" # gender_ratio (male, female)
+    "6i" # base_stats
+    "II" # moves (JSON)
+    "II" # sprites (JSON)
+)
+
+# Define the move record
+MOVE_RECORD = struct.Struct(
+    "<i" # id
+    "II" # name
+    "II" # desc
+    "II" # type
+    "iiiii" # accuracy, effect_chance, pp, priority, power
+    "B" # damage_class (enum index)
+    "II" # stat_changes (JSON)
+    "BBB" # target, ailment, category (enum indexes)
+    "iii" # min_hits, max_hits, max_turns
+    "dddddd" # drain, healing, crit_chance, ailment_chance, flinch_chance, stat_chance
+)
+
+# Define the sentinel values used to store 'None' in fixed-width numeric fields
+NONE_INT = -2**31
+NONE_FLOAT = math.nan
+
+# Define the enumerations stored by index, in a stable order
+GROWTH_RATES = list(GrowthRate)
+EGG_GROUPS = list(EggGroup)
+DAMAGE_CLASSES = list(DamageClass)
+MOVE_TARGETS = list(MoveTarget)
+MOVE_AILMENTS = list(MoveAilment)
+MOVE_CATEGORIES = list(MoveCategory)
+
+# Define helper functions to convert nullable numbers to and from their stored form
+def pack_int(value: int | None) -> int:
+    return NONE_INT if value is None else value
+
+def unpack_int(value: int) -> int | None:
+    return None if value == NONE_INT else value
+
+def pack_float(value: float | None) -> float:
+    return NONE_FLOAT if value is None else value
+
+def unpack_float(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+# Define the 'StringTable' class which collects and deduplicates the strings of a pack
+class StringTable:
+    def __init__(self):
+        # Initialize fields
+        self.data = bytearray()
+        self.offsets: dict[bytes, int] = {}
+
+    # Define a function to add raw bytes and return the (offset, length) reference
+    def add_bytes(self, value: bytes) -> tuple[int, int]:
+        # Check if these bytes have already been added
+        if value not in self.offsets:
+            self.offsets[value] = len(self.data)
+            self.data += value
+        return self.offsets[value], len(value)
+
+    # Define a function to add a string
+    def add(self, value: str) -> tuple[int, int]:
+        return self.add_bytes(value.encode("utf-8"))
+
+    # Define a function to add a nested structure as compact JSON
+    def add_json(self, value) -> tuple[int, int]:
+        return self.add(json.dumps(value, separators=(",", ":")))
+
+# Define a function to encode a species into a fixed-width record
+def encode_species(species: Species, strings: StringTable) -> bytes:
+    # Spread the gender ratio, genderless species store NaN for both chances
+    if species.gender_ratio is None:
+        male, female = NONE_FLOAT, NONE_FLOAT
+    else:
+        male, female = species.gender_ratio["male"], species.gender_ratio["female"]
+    return SPECIES_RECORD.pack(
+        species.dex_id,
+        *strings.add(species.id),
+        *strings.add(species.name),
+        *strings.add(species.desc),
+        *strings.add(species.genus),
+        *strings.add_json(species.types),
+        *strings.add_json(species.abilities),
+        *strings.add_json(species.evolutions),
+        pack_float(species.height),
+        pack_float(species.weight),
+        *strings.add_json(species.ev_yield),
+        pack_int(species.catch_rate),
+        pack_int(species.base_friendship),
+        pack_int(species.base_exp),
+        GROWTH_RATES.index(species.growth_rate),
+        *strings.add_bytes(bytes(map(lambda entry: EGG_GROUPS.index(entry), species.egg_groups))),
+        pack_int(species.egg_cycles),
+        male,
+        female,
+        *map(lambda stat: species.base_stats[stat.value], Stat),
+        *strings.add_json(species.moves),
+        *strings.add_json(species.sprites)
+    )
+
+# Define a function to encode a move into a fixed-width record
+def encode_move(move: Move, strings: StringTable) -> bytes:
+    return MOVE_RECORD.pack(
+        move.id,
+        *strings.add(move.name),
+        *strings.add(move.desc),
+        *strings.add(move.type),
+        pack_int(move.accuracy),
+        pack_int(move.effect_chance),
+        pack_int(move.pp),
+        pack_int(move.priority),
+        pack_int(move.power),
+        DAMAGE_CLASSES.index(move.damage_class),
+        *strings.add_json(move.stat_changes),
+        MOVE_TARGETS.index(move.target),
+        MOVE_AILMENTS.index(move.ailment),
+        MOVE_CATEGORIES.index(move.category),
+        pack_int(move.min_hits),
+        pack_int(move.max_hits),
+        pack_int(move.max_turns),
+        pack_float(move.drain),
+        pack_float(move.healing),
+        pack_float(move.crit_chance),
+        pack_float(move.ailment_chance),
+        pack_float(move.flinch_chance),
+        pack_float(move.stat_chance)
+    )
+
+# Define 'compile_pack' function that takes the path of a JSON pack and writes
+# its compiled form, returns the path of the compiled pack
+def compile_pack(path: str, destination: str | None = None) -> str:
+    # Default the destination to the same path with the compiled extension
+    if destination is None:
+        destination = os.path.splitext(path)[0] + COMPILED_EXTENSION
+
+    # Load the JSON pack so that every entry goes through the regular parsing
+    pack = load_pack(path)
+    strings = StringTable()
+
+    # Encode every record
+    species_records = list(map(lambda entry: encode_species(entry, strings), pack.species))
+    move_records = list(map(lambda entry: encode_move(entry, strings), pack.moves))
+
+    # Calculate the offsets of each section
+    species_index_offset = HEADER.size
+    move_index_offset = species_index_offset + 4 * len(species_records)
+    species_offset = move_index_offset + 4 * len(move_records)
+    move_offset = species_offset + SPECIES_RECORD.size * len(species_records)
+    strings_offset = move_offset + MOVE_RECORD.size * len(move_records)
+
+    # Build the offset indexes, each entry is the absolute offset of a record
+    species_index = [species_offset + i * SPECIES_RECORD.size for i in range(len(species_records))]
+    move_index = [move_offset + i * MOVE_RECORD.size for i in range(len(move_records))]
+
+    # Write the compiled pack to a temporary file first so that a half-written
+    # pack is never picked up by the loader
+    temp_path = destination + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(
+            COMPILED_PACK_MAGIC, FORMAT_VERSION, len(species_records), len(move_records),
+            species_index_offset, move_index_offset, species_offset, move_offset, strings_offset
+        ))
+        f.write(struct.pack(f"<{len(species_index)}I", *species_index))
+        f.write(struct.pack(f"<{len(move_index)}I", *move_index))
+        f.write(b"".join(species_records))
+        f.write(b"".join(move_records))
+        f.write(strings.data)
+    os.replace(temp_path, destination)
+
+    # Return the path of the compiled pack
+    return destination
+
+# Define 'CompiledPack' class which decodes records out of a memory-mapped compiled pack
+class CompiledPack:
+    def __init__(self, buffer: mmap.mmap):
+        # Initialize fields
+        self.buffer = buffer
+
+        # Read the header
+        (magic, version, self.species_count, self.move_count, self.species_index_offset,
+         self.move_index_offset, _, _, self.strings_offset) = HEADER.unpack_from(buffer, 0)
+        # Ensure this is a compiled pack of a supported version
+        if magic != COMPILED_PACK_MAGIC:
+            raise ValueError("Not a compiled pack")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled pack version: {version}")
+
+    # Define a function to read a string from the string table
+    def read_string(self, offset: int, length: int) -> str:
+        start = self.strings_offset + offset
+        return self.buffer[start:start + length].decode("utf-8")
+
+    # Define a function to read a JSON blob from the string table
+    def read_json(self, offset: int, length: int):
+        return json.loads(self.read_string(offset, length))
+
+    # Define functions to get the absolute offset of a record through the offset indexes
+    def species_offset(self, index: int) -> int:
+        return struct.unpack_from("<I", self.buffer, self.species_index_offset + 4 * index)[0]
+
+    def move_offset(self, index: int) -> int:
+        return struct.unpack_from("<I", self.buffer, self.move_index_offset + 4 * index)[0]
+
+    # Define a function to read only the lookup keys (name, id, dex_id) of a species
+    def species_key(self, index: int) -> tuple[str, str, int]:
+        dex_id, id_offset, id_length, name_offset, name_length = struct.unpack_from(
+            "<iIIII", self.buffer, self.species_offset(index)
+        )
+        return self.read_string(name_offset, name_length), self.read_string(id_offset, id_length), dex_id
+
+    # Define a function to read only the lookup keys (name, id) of a move
+    def move_key(self, index: int) -> tuple[str, int]:
+        move_id, name_offset, name_length = struct.unpack_from("<iII", self.buffer, self.move_offset(index))
+        return self.read_string(name_offset, name_length), move_id
+
+    # Define a function to decode a whole species record
+    def decode_species(self, index: int) -> Species:
+        fields = iter(SPECIES_RECORD.unpack_from(self.buffer, self.species_offset(index)))
+        # Define a function to read the next string reference
+        def string():
+            return self.read_string(next(fields), next(fields))
+        # Define a function to read the next JSON reference
+        def blob():
+            return self.read_json(next(fields), next(fields))
+
+        dex_id = next(fields)
+        species_id, name, desc, genus = string(), string(), string(), string()
+        types, abilities, evolutions = blob(), blob(), blob()
+        height, weight = unpack_float(next(fields)), unpack_float(next(fields))
+        ev_yield = blob()
+        catch_rate, base_friendship, base_exp = unpack_int(next(fields)), unpack_int(next(fields)), unpack_int(next(fields))
+        growth_rate = GROWTH_RATES[next(fields)]
+        egg_offset, egg_length = next(fields), next(fields)
+        start = self.strings_offset + egg_offset
+        egg_groups = list(map(lambda entry: EGG_GROUPS[entry], self.buffer[start:start + egg_length]))
+        egg_cycles = unpack_int(next(fields))
+        male, female = next(fields), next(fields)
+        gender_ratio = None if math.isnan(male) else {"male": male, "female": female}
+        base_stats = {stat.value: next(fields) for stat in Stat}
+        moves, sprites = blob(), blob()
+
+        # Return instance of species
+        return Species(
+            dex_id, species_id, name, desc, genus, types, abilities, evolutions, height, weight, ev_yield,
+            catch_rate, base_friendship, base_exp, growth_rate, egg_groups, egg_cycles, gender_ratio,
+            base_stats, moves, sprites
+        )
+
+    # Define a function to decode a whole move record
+    def decode_move(self, index: int) -> Move:
+        (move_id, name_offset, name_length, desc_offset, desc_length, type_offset, type_length,
+         accuracy, effect_chance, pp, priority, power, damage_class, stat_offset, stat_length,
+         target, ailment, category, min_hits, max_hits, max_turns,
+         drain, healing, crit_chance, ailment_chance, flinch_chance, stat_chance) = MOVE_RECORD.unpack_from(
+            self.buffer, self.move_offset(index)
+        )
+        # Return instance of 'Move'
+        return Move(
+            move_id,
+            self.read_string(name_offset, name_length),
+            self.read_string(desc_offset, desc_length),
+            self.read_string(type_offset, type_length),
+            unpack_int(accuracy),
+            unpack_int(effect_chance),
+            unpack_int(pp),
+            unpack_int(priority),
+            unpack_int(power),
+            DAMAGE_CLASSES[damage_class],
+            self.read_json(stat_offset, stat_length),
+            MOVE_TARGETS[target],
+            MOVE_AILMENTS[ailment],
+            MOVE_CATEGORIES[category],
+            unpack_int(min_hits),
+            unpack_int(max_hits),
+            unpack_int(max_turns),
+            unpack_float(drain),
+            unpack_float(healing),
+            unpack_float(crit_chance),
+            unpack_float(ailment_chance),
+            unpack_float(flinch_chance),
+            unpack_float(stat_chance)
+        )
+
+# Define 'load_compiled_pack' function that memory-maps a compiled pack
+def load_compiled_pack(path: str) -> LoadedPack:
+    # Map the file into memory, the map stays valid after the file is closed
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    compiled = CompiledPack(buffer)
+
+    # Build the registry from the record keys only, records themselves are decoded on access
+    registry = PackRegistry(
+        list(map(compiled.species_key, range(compiled.species_count))),
+        list(map(compiled.move_key, range(compiled.move_count)))
+    )
+
+    # Return the loaded pack
+    return LoadedPack(
+        RecordList(range(compiled.species_count), compiled.decode_species),
+        RecordList(range(compiled.move_count), compiled.decode_move),
+        registry
+    )
+
+# Define a function that returns the compiled form of a JSON pack if it
+# exists and is up to date, otherwise returns the JSON pack's path
+def resolve_pack_path(path: str) -> str:
+    compiled_path = os.path.splitext(path)[0] + COMPILED_EXTENSION
+    # Check if the compiled pack is at least as new as the JSON pack
+    if os.path.exists(compiled_path) and os.path.getmtime(compiled_path) >= os.path.getmtime(path):
+        return compiled_path
+    return path
+
+# Ensure that this file is being directly executed and not imported
+# as a module for another file
+if __name__ == '__main__':
+    # Usage: python -m src.pack_compiler <pack.json> [output.pack]
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.pack_compiler <pack.json> [output.pack]")
+        sys.exit(1)
+    output = compile_pack(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Compiled {sys.argv[1]} to {output}")
@@ -3,37 +3,275 @@
 
 # Imports
 
-import json
+import os
+import re
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
 
+from src.pack_stream import iter_pack_records
 from src.pokemon.species import Species
 from src.pokemon.move import Move
 
+# Define the magic bytes that every compiled (binary) pack file starts with
+COMPILED_PACK_MAGIC = b"PKMNPACK"
+
+# Define 'RecordList' class, a read-only list that builds each entry from its
+# raw record the first time the entry is accessed and caches it afterwards
+class RecordList(Sequence):
+    def __init__(
+            self,
+            records: Sequence[Any], # The raw records, one for each entry
+            decoder: Callable[[Any], Any] # A function that converts a raw record into an entry
+    ):
+        # Initialize fields
+        self.records = records
+        self.decoder = decoder
+        self.entries: list[Any] = [None] * len(records)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        # Resolve slices entry by entry
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        # Check if the entry has already been built
+        entry = self.entries[index]
+        if entry is None:
+            # Build the entry from its raw record and cache it
+            entry = self.decoder(self.records[index])
+            self.entries[index] = entry
+            # Release the raw record when possible since it is no longer needed
+            if isinstance(self.records, list):
+                self.records[index] = None
+        return entry
+
+# Define 'PackRegistry' class which indexes the species and moves of a pack
+# so that they can be looked up in constant time instead of scanning every entry
+class PackRegistry:
+    def __init__(
+            self,
+            species_keys: list[tuple[str, str, int]], # The (name, id, dex_id) of each species, in pack order
+            move_keys: list[tuple[str, int]] # The (name, id) of each move, in pack order
+    ):
+        # Initialize fields
+        self.species_keys = species_keys
+        self.move_keys = move_keys
+
+        # Initialize the index dictionaries, each maps a key to the position
+        # of the entry in the pack's species or moves list
+        self.species_by_name: dict[str, int] = {}
+        self.species_by_id: dict[str, int] = {}
+        self.species_by_dex_id: dict[int, int] = {}
+        self.moves_by_name: dict[str, int] = {}
+        self.moves_by_id: dict[int, int] = {}
+
+        # Iterate the species keys, enumerated
+        for i, (name, species_id, dex_id) in enumerate(species_keys):
+            # Use 'setdefault' so that the first matching entry wins, like the old linear search
+            self.species_by_name.setdefault(name, i)
+            self.species_by_id.setdefault(species_id, i)
+            self.species_by_dex_id.setdefault(dex_id, i)
+
+        # Iterate the move keys, enumerated
+        for i, (name, move_id) in enumerate(move_keys):
+            self.moves_by_name.setdefault(name, i)
+            self.moves_by_id.setdefault(move_id, i)
+
+    # Define a static method that builds a registry from lists of species and move objects
+    @staticmethod
+    def of(species: Sequence[Species], moves: Sequence[Move]):
+        return PackRegistry(
+            list(map(lambda entry: (entry.name, entry.id, entry.dex_id), species)),
+            list(map(lambda entry: (entry.name, entry.id), moves))
+        )
+
 # Define 'LoadedPack' class to represent a loaded pack
 class LoadedPack:
     def __init__(
             self,
-            species: list[Species], # A list of the species the pack contains
-            moves: list[Move] # A list of the moves the pack contains
+            species: Sequence[Species], # A list of the species the pack contains
+            moves: Sequence[Move], # A list of the moves the pack contains
+            registry: PackRegistry | None = None # The lookup registry, built from the lists if not provided
     ):
         # Initialize fields
         self.species = species
         self.moves = moves
+        self.registry = registry if registry is not None else PackRegistry.of(species, moves)
+
+    # Define a function to get a species by its name
+    def get_species(self, name: str) -> Species:
+        # Raises a KeyError if the name is not indexed
+        return self.species[self.registry.species_by_name[name]]
+
+    # Define a function to get a species by its code name/code ID
+    def get_species_by_id(self, species_id: str) -> Species:
+        return self.species[self.registry.species_by_id[species_id]]
+
+    # Define a function to get a species by its national dex number
+    def get_species_by_dex_id(self, dex_id: int) -> Species:
+        return self.species[self.registry.species_by_dex_id[dex_id]]
+
+    # Define a function to get a move by its name
+    def get_move(self, name: str) -> Move:
+        return self.moves[self.registry.moves_by_name[name]]
+
+    # Define a function to get a move by its numeric ID
+    def get_move_by_id(self, move_id: int) -> Move:
+        return self.moves[self.registry.moves_by_id[move_id]]
 
 # Define 'load_pack' function that takes a file path and loads the pack at that file
-def load_pack(path: str):
-    # Initialize the LoadedPack with two empty species and moves lists
-    loaded_pack = LoadedPack([], [])
-    # Open the file at the path in read (R) mode with the file referenced as 'f'
-    with open(path, "r") as f:
-        # Load the data from the file from JSON format into a Python dictionary
-        data = json.load(f)
-        # Iterate all the species in the dictionary
-        for species in data["species"]:
+# If 'use_cache' is true, a JSON pack is restored from its cache when the cache is
+# still valid, otherwise it is loaded eagerly and written to the cache for the next launch
+# If 'lazy' is true and 'use_cache' is false, species and moves are kept as raw records
+# and only converted into objects the first time they are accessed. A lazy pack can't be
+# cached, so 'lazy' is ignored while the cache is used
+def load_pack(path: str, lazy: bool = False, use_cache: bool = True):
+    # Check if the file is a compiled pack by reading its first few bytes
+    with open(path, "rb") as f:
+        is_compiled = f.read(len(COMPILED_PACK_MAGIC)) == COMPILED_PACK_MAGIC
+    if is_compiled:
+        # Import here to avoid circular import error
+        from src.pack_compiler import load_compiled_pack
+        # Memory-map the compiled pack instead of parsing it
+        return load_compiled_pack(path)
+
+    # Check if the pack can be restored from the cache
+    if use_cache:
+        # Import here to avoid circular import error
+        from src.pack_cache import load_cached_pack
+        cached = load_cached_pack(path)
+        if cached is not None:
+            return cached
+        # Build the whole pack so it can be cached, later launches restore it from the cache
+        lazy = False
+
+    # Initialize two empty species and moves lists
+    species_list = []
+    move_list = []
+    # Stream the records of the pack one at a time so that the whole JSON
+    # document is never held in memory at once
+    for section, record in iter_pack_records(path):
+        # Check if the pack should be loaded lazily
+        if lazy:
+            # Keep the raw record, it is converted on first access
+            (species_list if section == "species" else move_list).append(record)
+        elif section == "species":
             # Append the species object cast into the species class to the species list
-            loaded_pack.species.append(Species.from_obj(species))
-        # Iterate all the moves in the dictionary
-        for move in data["moves"]:
+            species_list.append(Species.from_obj(record))
+        else:
             # Append the move object cast into the move class to the moves list
-            loaded_pack.moves.append(Move.from_obj(move))
+            move_list.append(Move.from_obj(record))
+
+    # Check if the pack was loaded lazily
+    if lazy:
+        # Build the registry straight from the raw records
+        registry = PackRegistry(
+            list(map(lambda entry: (entry["name"], entry["id"], entry["dex_id"]), species_list)),
+            list(map(lambda entry: (entry["name"], entry["id"]), move_list))
+        )
+        # Return a loaded pack that converts the raw records on first access
+        return LoadedPack(
+            RecordList(species_list, Species.from_obj),
+            RecordList(move_list, Move.from_obj),
+            registry
+        )
+
+    # Initialize the loaded pack, which builds its registry once here
+    loaded_pack = LoadedPack(species_list, move_list)
+    # Write the fully built pack to the cache for the next launch
+    if use_cache:
+        # Import here to avoid circular import error
+        from src.pack_cache import write_cached_pack
+        try:
+            write_cached_pack(path, loaded_pack)
+        except OSError as e: # Catch any errors, the pack is loaded even if it can't be cached (ex: a read-only folder)
+            # Add debugging print to notify that the cache couldn't be written
+            print(f"Failed to cache pack {path}: {e}")
     # Return the loaded pack
     return loaded_pack
+
+# Define a function that sorts pack file names naturally so that 'gen-2' comes before 'gen-10'
+def pack_sort_key(file_name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", file_name)]
+
+# Define 'merge_packs' function that merges several loaded packs into a single pack
+# Packs are merged in order, if a species or move name appears in more than one pack
+# then the entry from the later pack replaces the earlier one (keeping its position)
+def merge_packs(packs: list[LoadedPack]) -> LoadedPack:
+    # A single pack doesn't need merging
+    if len(packs) == 1:
+        return packs[0]
+
+    # Define a function that merges one kind of entry (species or moves) across all packs
+    # and returns a list of (sequence, index) references and the matching keys
+    def merge(sequences: list[Sequence], keys: list[list[tuple]]):
+        references = []
+        merged_keys = []
+        positions: dict[str, int] = {}
+        # Iterate each pack's entries along with their keys
+        for sequence, sequence_keys in zip(sequences, keys):
+            for i, key in enumerate(sequence_keys):
+                name = key[0]
+                # Check if an earlier pack already has an entry with this name
+                if name in positions:
+                    # Replace the earlier entry
+                    references[positions[name]] = (sequence, i)
+                    merged_keys[positions[name]] = key
+                else:
+                    positions[name] = len(references)
+                    references.append((sequence, i))
+                    merged_keys.append(key)
+        return references, merged_keys
+
+    species, species_keys = merge(
+        list(map(lambda pack: pack.species, packs)), list(map(lambda pack: pack.registry.species_keys, packs))
+    )
+    moves, move_keys = merge(
+        list(map(lambda pack: pack.moves, packs)), list(map(lambda pack: pack.registry.move_keys, packs))
+    )
+
+    # Return the merged pack, entries are resolved from their original pack on first access
+    return LoadedPack(
+        RecordList(species, lambda reference: reference[0][reference[1]]),
+        RecordList(moves, lambda reference: reference[0][reference[1]]),
+        PackRegistry(species_keys, move_keys)
+    )
+
+# Define 'load_packs' function that loads every pack in a directory and merges them
+# into a single pack, JSON packs are parsed concurrently in a process pool
+def load_packs(directory: str = "packs") -> LoadedPack:
+    # Import here to avoid circular import error
+    from src.pack_compiler import COMPILED_EXTENSION, resolve_pack_path
+
+    # Find every pack file in the directory, in precedence order
+    paths = []
+    for file_name in sorted(os.listdir(directory), key=pack_sort_key):
+        path = os.path.join(directory, file_name)
+        if file_name.endswith(".json"):
+            # Use the compiled form of the pack if it is up to date
+            paths.append(resolve_pack_path(path))
+        elif file_name.endswith(COMPILED_EXTENSION) and not os.path.exists(os.path.splitext(path)[0] + ".json"):
+            # Compiled pack without a JSON source
+            paths.append(path)
+
+    # Initialize a dictionary of loaded packs by path
+    loaded: dict[str, LoadedPack] = {}
+
+    # Parse the JSON packs concurrently if there is more than one of them,
+    # compiled packs are memory-mapped which is already cheap
+    json_paths = list(filter(lambda entry: entry.endswith(".json"), paths))
+    if len(json_paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(json_paths), os.cpu_count() or 1)) as executor:
+            for path, pack in zip(json_paths, executor.map(load_pack, json_paths)):
+                loaded[path] = pack
+
+    # Load the remaining packs in this process, a JSON pack is restored from its cache or
+    # built and cached for the next launch
+    for path in paths:
+        if path not in loaded:
+            loaded[path] = load_pack(path)
+
+    # Return the merged pack
+    return merge_packs(list(map(lambda path: loaded[path], paths)))
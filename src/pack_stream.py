@@ -0,0 +1,111 @@
+# This file provides a streaming parser for pack JSON files. Instead of loading
+# the whole document at once, it reads the file in chunks and yields the entries
+# of the 'species' and 'moves' arrays one at a time, so only the current entry
+# (and whatever the caller keeps) is alive at any moment.
+
+# Imports
+
+import json
+from typing import Any, Iterator, TextIO
+
+# Define the sections of a pack that are streamed entry by entry
+STREAMED_SECTIONS = ("species", "moves")
+
+# Define the 'JsonStream' class which reads JSON tokens and values from a file incrementally
+class JsonStream:
+    def __init__(self, file: TextIO, chunk_size: int = 1 << 16):
+        # Initialize fields
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    # Define a function to read the next chunk of the file into the buffer
+    # Returns false if the end of the file has been reached
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the part of the buffer that has already been consumed
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    # Define a function that returns the next non-whitespace character without consuming it
+    def peek(self) -> str | None:
+        while True:
+            # Skip whitespace in the buffer
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            # The buffer is exhausted, read more
+            if not self.fill():
+                return None
+
+    # Define a function that consumes the next non-whitespace character and ensures it is expected
+    def expect(self, expected: str):
+        char = self.peek()
+        if char != expected:
+            raise ValueError(f"Invalid pack: expected '{expected}' but found {char!r}")
+        self.position += 1
+
+    # Define a function that decodes the next complete JSON value
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A value that runs up to the end of the buffer (such as a number) may
+                # continue in the next chunk, so only accept it once more input is seen
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                # The value is incomplete, fail only if there is nothing left to read
+                if self.eof:
+                    raise
+            self.fill()
+
+# Define 'iter_pack_records' function that yields a (section, record) tuple for every
+# species and move in a pack file, other top-level keys are skipped
+def iter_pack_records(path: str, chunk_size: int = 1 << 16) -> Iterator[tuple[str, dict]]:
+    # Open the file at the path in read (R) mode with the file referenced as 'f'
+    with open(path, "r", encoding="utf-8") as f:
+        stream = JsonStream(f, chunk_size)
+        stream.expect("{")
+        # Check for an empty document
+        if stream.peek() == "}":
+            return
+        while True:
+            # Read the key of the next top-level entry
+            key = stream.value()
+            stream.expect(":")
+            if key in STREAMED_SECTIONS:
+                # Stream the array one record at a time
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        yield key, stream.value()
+                        # Records are separated by commas until the array closes
+                        if stream.peek() == ",":
+                            stream.expect(",")
+                        else:
+                            stream.expect("]")
+                            break
+            else:
+                # Decode and discard any other value
+                stream.value()
+            # Top-level entries are separated by commas until the document closes
+            if stream.peek() == ",":
+                stream.expect(",")
+            else:
+                stream.expect("}")
+                break
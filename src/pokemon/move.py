@@ -14,6 +14,13 @@ from src.pokemon.types.stat_table import BattleStatTable
 
 # Define the 'Move' class
 class Move:
+    # Declare the fields as slots instead of a per-instance __dict__
+    __slots__ = (
+        "id", "name", "desc", "type", "accuracy", "effect_chance", "pp", "priority", "power",
+        "damage_class", "stat_changes", "target", "ailment", "category", "min_hits", "max_hits",
+        "max_turns", "drain", "healing", "crit_chance", "ailment_chance", "flinch_chance", "stat_chance"
+    )
+
     def __init__(
             self,
             id: int, # Unique numeric ID of the move
@@ -3,7 +3,6 @@
 
 # Imports
 
-from tkinter import messagebox
 from typing import Literal, cast
 import uuid
 
@@ -13,15 +12,33 @@ from src.pokemon.types.ball import Ball
 
 from src.pokemon.types.battle_condition import BattleCondition, BattleMove
 from src.pokemon.types.capture_data import CaptureData
+from src.pokemon.types.experience_event import ExperienceEvent, ExperienceEventType
 from src.pokemon.types.gender import Gender
+from src.pokemon.types.growth_rate import MAX_LEVEL
 from src.pokemon.types.nature import Nature
 from src.pokemon.types.stat import Stat
 from src.pokemon.types.stat_table import StatTable
 
-# Define the max level constant
-MAX_LEVEL = 100
-
 class Pokemon:
+    # Use slots since boxes can hold thousands of Pokemon and a __dict__ per instance adds up
+    __slots__ = (
+        "nickname", "egg", "shiny", "species", "ability", "tutor_machine_moves", "gender", "nature", "ivs",
+        "evs", "level", "experience", "friendship", "condition", "capture_data", "uuid",
+        "_stats", # The cached stats, see 'get_stats'
+        "_packed" # The cached parts of the packed string, see 'pack_string'
+    )
+
+    # Define the fields that the Pokemon's stats are calculated from, assigning any of
+    # them clears the cached stats
+    STAT_FIELDS = frozenset(("species", "nature", "ivs", "evs", "level"))
+
+    # Define the fields that are written to the packed string (other than the health, PP
+    # and moves which are checked every time), assigning any of them clears the cached parts
+    PACK_FIELDS = frozenset((
+        "species", "uuid", "ability", "nature", "evs", "gender", "ivs", "shiny", "level", "friendship",
+        "capture_data"
+    ))
+
     def __init__(
             self,
             nickname: str, # The Pokemon's nickname, defaults to the species name
@@ -60,6 +77,18 @@ class Pokemon:
         # Initialize a UUID
         self.uuid = uuid.uuid4()
 
+        # The stats and packed string are built the first time they are needed
+        self._stats = None
+        self._packed = None
+
+    # Clear the cached stats and packed string whenever a field they are built from is assigned
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in Pokemon.STAT_FIELDS:
+            object.__setattr__(self, "_stats", None)
+        if name in Pokemon.PACK_FIELDS:
+            object.__setattr__(self, "_packed", None)
+
     # Define the 'get_species' function which takes the name of the species
     # and uses the holder utility to obtain the actual species object
     def get_species(self) -> Species:
@@ -79,12 +108,12 @@ class Pokemon:
             return 0 # Return 0
         return self.get_species().get_experience_needed(self.level + 1) # Delegate to species
 
-    # Define a 'get_stat' method that returns the value of a Pokemon's stat
+    # Define a 'calculate_stat' method that calculates the value of a Pokemon's stat
     # Formulas are from Bulbapedia, link: https://bulbapedia.bulbagarden.net/wiki/Stat
     # Using Generation III formula
-    def get_stat(self, stat: Stat) -> int:
+    def calculate_stat(self, stat: Stat, base_stats: StatTable) -> int:
         if stat == Stat.HP: # Health uses a different formula
-            return int(((2 * self.get_species().base_stats[stat.value] + self.ivs[stat.value] + self.evs[stat.value] // 4) * self.level) / 100) + self.level + 10
+            return int(((2 * base_stats[stat.value] + self.ivs[stat.value] + self.evs[stat.value] // 4) * self.level) / 100) + self.level + 10
         else:
             # Initialize nature_modifier as 1
             nature_modifier = 1
@@ -95,7 +124,27 @@ class Pokemon:
             elif stat == decreases:
                 nature_modifier = 0.9
             # Return calculated value of stat
-            return int((((2 * self.get_species().base_stats[stat.value] + self.ivs[stat.value] + self.evs[stat.value] // 4) * self.level) / 100 + 5) * nature_modifier)
+            return int((((2 * base_stats[stat.value] + self.ivs[stat.value] + self.evs[stat.value] // 4) * self.level) / 100 + 5) * nature_modifier)
+
+    # Define a 'get_stats' method that returns the values of all the Pokemon's stats, the stats
+    # are calculated once and cached until the level, nature, IVs, EVs or species change
+    def get_stats(self) -> dict[Stat, int]:
+        # Check if the stats need to be calculated
+        if self._stats is None:
+            # Look up the species once for all six stats
+            base_stats = self.get_species().base_stats
+            self._stats = {stat: self.calculate_stat(stat, base_stats) for stat in Stat}
+        return self._stats
+
+    # Define a 'get_stat' method that returns the value of a Pokemon's stat
+    def get_stat(self, stat: Stat) -> int:
+        return self.get_stats()[stat]
+
+    # Define a function that clears the cached stats (and packed string), this must be called
+    # after the IVs or EVs are changed in place since that can't be detected
+    def invalidate_stats(self):
+        self._stats = None
+        self._packed = None
 
     # Define a get_moves function that returns a list of the Pokemon's move set
     def get_moves(self) -> list[str]:
@@ -110,9 +159,24 @@ class Pokemon:
         return self.condition.health
 
     # Define a function to convert this Pokemon into a Pokemon-Showdown compatible
-    # string
-    # TODO Test with Nidoran-M and Nidoran-F
+    # string, the parts that rarely change are built once and cached and only the health
+    # and PP are written each time
     def pack_string(self):
+        # Check if the cached parts need to be built, the cache is cleared when a packed field is
+        # assigned and the moves are compared by the 'BattleMove' objects in the move set
+        move_set = self.condition.move_set
+        if self._packed is None or self._packed[0] != tuple(move_set):
+            self._packed = (tuple(move_set),) + self.build_pack_parts()
+        _, head, middle, tail = self._packed
+
+        # Join the cached parts with the current health and PPs
+        pps = ",".join([f"{move.pp}/{move.max_pp}" for move in move_set])
+        return f"{head}{self.condition.health}{middle}{pps}{tail}"
+
+    # Define a function that builds the parts of the packed string that come before the health,
+    # between the health and the PPs and after the PPs
+    # TODO Test with Nidoran-M and Nidoran-F
+    def build_pack_parts(self) -> tuple[str, str, str]:
         # Initialize and empty array
         parts = []
 
@@ -123,8 +187,9 @@ class Pokemon:
         # Append Pokemon's UUID
         parts.append(str(self.uuid) + "|")
 
-        # Append Pokemon's current health
-        parts.append(str(self.condition.health) + "|")
+        # The Pokemon's current health goes here
+        head = "".join(parts)
+        parts = ["|"]
 
         # TODO Append current status
         parts.append("|")
@@ -142,10 +207,9 @@ class Pokemon:
         showdown_moves = list(map(lambda move_name: move_name.replace("_", "").lower(), self.get_moves()))
         parts.append(",".join(showdown_moves) + "|")
 
-        # Append move PPs
-        moves = self.condition.move_set
-        pps = list(map(lambda move: f"{move.pp}/{move.max_pp}", moves))
-        parts.append(",".join(pps) + "|")
+        # The move PPs go here
+        middle = "".join(parts)
+        parts = ["|"]
 
         # Append nature
         parts.append(f"{self.nature.name.lower()}|")
@@ -179,86 +243,60 @@ class Pokemon:
         parts.append(",") # Skip Dynamax level
         parts.append("normal,") # Use default 'normal' tera type
 
-        # Returned joined parts
-        return "".join(parts)
-
-    # Define a function to appropriately add experience to a Pokemon
-    # Returns a true if the Pokemon has leveled up
-    def add_exp(self, amount: int) -> bool:
-        # Import in the function to avoid circular importing
-        from src.windows.evolution_window import EvolutionWindow
-        # Check if Pokemon is at the max level
-        if self.level >= MAX_LEVEL:
-            return False # Exit
-
-        # Initialize the has leveled up flag
-        has_leveled_up = False
-
-        # Loop until there's no more EXP to give
-        while amount > 0:
-            # Define a function to check for new moves
-            def check_for_moves():
-                # Check if the Pokemon can learn any new moves after leveling up
-                for move in self.get_species().moves:
-                    # Get the clean move name
-                    move_name = move["name"].replace('_', ' ').title()
+        # Return the joined parts
+        return head, middle, "".join(parts)
+
+    # Define a function to appropriately add experience to a Pokemon, nothing is shown to
+    # the player here, instead a list of the events that happened is returned so that the
+    # caller can show them (see 'show_experience_events')
+    def gain_exp(self, amount: int) -> list[ExperienceEvent]:
+        # Check if Pokemon is at the max level or if there's no EXP to give
+        if self.level >= MAX_LEVEL or amount <= 0:
+            return [] # Exit
+
+        # Initialize the list of events
+        events = []
+
+        # Find the level the Pokemon reaches using the total experience it will have,
+        # counted from level 1, in a single lookup instead of levelling up one level at a time
+        # The EXP towards the next level is kept, left over EXP is lost at the max level
+        previous_level = self.level
+        self.level, self.experience = self.get_species().growth_rate.add_experience(previous_level, self.experience, amount)
+        # Check if the Pokemon has leveled up
+        if self.level > previous_level:
+            events.append(ExperienceEvent(ExperienceEventType.LEVEL_UP, self.level))
+
+        # Check if the Pokemon can learn any new moves at the levels it has reached
+        for move in self.get_species().get_learnset().between(previous_level, self.level):
+            # Check if the move is already known
+            if move not in self.get_moves():
+                # Check if the Pokemon has 4 moves
+                if len(self.get_moves()) >= 4:
+                    # The player can swap out a move for this one in the Pokemon summary
+                    events.append(ExperienceEvent(ExperienceEventType.MOVE_LEARNABLE, move))
+                else:
                     # Retrieve the move object for this move
-                    move_obj = holder.get_move(move["name"])
-                    # Check if the move is learnt at the current level
-                    if move["level"] == self.level and move["name"] not in self.get_moves():
-                        # Check if the Pokemon has 4 moves
-                        if len(self.get_moves()) >= 4:
-                            # Inform the user
-                            messagebox.showinfo("New Move", f"{self.nickname} has learnt {move_name}! " + \
-                                                "You can swap out a move for this one in the Pokemon summary.")
-                        else:
-                            # Automatically add the move to this Pokemon
-                            self.condition.move_set.append(
-                                BattleMove(
-                                    move['name'],
-                                    move_obj.pp,
-                                    move_obj.pp,
-                                    False
-                                )
-                            )
-                            # Inform the user
-                            messagebox.showinfo("New Move", f"{self.nickname} has learnt {move_name}!")
-
-            exp = self.experience
-            # Calculate the EXP needed to level up
-            exp_needed = self.get_level_up_experience() - exp
-            # Check if adding 'amount' will trigger a level up
-            if amount > exp_needed:
-                # Deduct exp needed from the total amount
-                amount -= exp_needed
-                # Increase the Pokemon's level
-                self.level += 1
-                has_leveled_up = True
-                check_for_moves()
-                # Check if the Pokemon is now at the max level
-                if self.level >= MAX_LEVEL:
-                    break # Break out of the loop
-            else:
-                # Increment Pokemon's experience
-                self.experience += int(amount)
-                amount = 0
-
-            # Check if the Pokemon can evolve
-            for evo in self.get_species().evolutions:
-                # Check if this evolution is through level up
-                method = evo["method"]
-                if method["name"] == "levelup":
-                    level = method["parameter"]
-                    if self.level >= level:
-                        # Create an evolution window
-                        should_continue = EvolutionWindow(holder.root, self, holder.get_species(evo["name"])).draw()
-                        # Check if we should continue is not none indicating that the player has confirmed the evolution
-                        if should_continue is not None:
-                            should_continue.wait() # Show the window
-                            break # Break out of the loop
-
-        # Return whether a level up has been triggered
-        return has_leveled_up
+                    move_obj = holder.get_move(move)
+                    # Automatically add the move to this Pokemon
+                    self.condition.move_set.append(
+                        BattleMove(
+                            move,
+                            move_obj.pp,
+                            move_obj.pp,
+                            False
+                        )
+                    )
+                    events.append(ExperienceEvent(ExperienceEventType.MOVE_LEARNT, move))
+
+        # Check if the Pokemon can evolve
+        for evo in self.get_species().evolutions:
+            # Check if this evolution is through level up
+            method = evo["method"]
+            if method["name"] == "levelup" and self.level >= method["parameter"]:
+                events.append(ExperienceEvent(ExperienceEventType.EVOLUTION_AVAILABLE, evo["name"]))
+
+        # Return the events
+        return events
 
     # Define a static method that takes a dictionary and returns
     # an instance of the Pokemon class
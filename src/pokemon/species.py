@@ -14,6 +14,7 @@ from src.pokemon.types.evolution import Evolution
 from src.pokemon.types.gender import Gender
 from src.pokemon.types.growth_rate import GrowthRate
 from src.pokemon.types.learnable_move import LearnableMove
+from src.pokemon.types.learnset import Learnset
 from src.pokemon.types.nature import Nature
 from src.pokemon.types.stat import Stat
 from src.pokemon.types.stat_table import OptionalStatTable, StatTable
@@ -53,6 +54,14 @@ class SpriteTable(TypedDict):
 # Define the 'Species' class
 
 class Species:
+    # Declare the fields as slots so species don't each carry a __dict__
+    __slots__ = (
+        "dex_id", "id", "name", "desc", "genus", "types", "abilities", "evolutions", "height", "weight",
+        "ev_yield", "catch_rate", "base_friendship", "base_exp", "growth_rate", "egg_groups", "egg_cycles",
+        "gender_ratio", "base_stats", "moves", "sprites",
+        "_learnset" # Underscored slots are derived from the other fields and aren't written to packs
+    )
+
     def __init__(
             self,
             dex_id: int, # The unique numeric ID for the species
@@ -99,6 +108,8 @@ class Species:
         self.base_stats = base_stats
         self.moves = moves
         self.sprites = sprites
+        # Index the moves learnt by level up
+        self._learnset = Learnset(moves)
 
     # Define a static method that takes a dictionary and returns
     # an instance of the species class
@@ -145,21 +156,16 @@ class Species:
         # Return the sprite PhotoImage instance using the images utility with the provided scale
         return images.get_image(f"{self.name}_{sprite_variant}_{sprite_type}", scale=scale)
 
+    # Define the 'get_learnset' function that returns the index of the moves
+    # this species can learn through level up
+    def get_learnset(self) -> Learnset:
+        return self._learnset
+
     # Define the 'get_known_moves' which returns a list of the moves
     # this species can learn through level up at this current level
     def get_known_moves(self, level: int) -> list[str]:
-        # Initialize an empty list of known moves
-        known_moves = []
-        # Iterate this species learnable moves
-        for move in self.moves:
-            # Check if this move can be learnt by level up
-            if move["level"] is not None:
-                # Check if Pokemon's level is high enough
-                if level >= move["level"]:
-                    # Append move name to list of known moves
-                    known_moves.append(move["name"])
-        # Return list of known moves
-        return known_moves
+        # Look up the moves learnt at or below the level in the learnset
+        return self._learnset.known_at(level)
 
     # Define a function that returns the amount of experience needed to level up
     def get_experience_needed(self, next_level: int):
@@ -268,4 +274,107 @@ class Species:
         )
 
         # Return Pokemon instance
-        return pokemon
\ No newline at end of file
+        return pokemon
+
+    # Define a method called 'spawn_many' that creates 'n' fresh instances of Pokemon
+    # of this species like 'spawn' does, but draws the random values of all of them
+    # at once from a NumPy random generator so that large amounts of wild Pokemon
+    # can be created quickly for simulations. 'rng' is a NumPy generator or a seed
+    def spawn_many(self, n: int, levels: int | range, rng=None, is_egg: bool = False, force_shiny: bool = False):
+        # Import Pokemon & holder here to avoid circular import error, NumPy (and the stat
+        # engine that uses it) is only needed by this method so it is imported here as well
+        from src.pokemon.pokemon import Pokemon
+        from src.pokemon.stat_engine import calculate_stats, get_nature_modifier_table
+        from src import holder
+        import numpy as np
+
+        # Use the provided generator or create one with the provided seed
+        if not isinstance(rng, np.random.Generator):
+            rng = np.random.default_rng(rng)
+
+        # Draw a level for every Pokemon
+        if isinstance(levels, int):
+            drawn_levels = np.full(n, levels)
+        else: # 'levels' is a range, so select random integers in the range
+            drawn_levels = rng.choice(np.asarray(levels), n)
+
+        # Draw shininess, using the same odds as 'spawn'
+        shinies = np.ones(n, dtype=bool) if force_shiny else rng.random(n) < resources.SHINY_ODDS
+
+        # Draw abilities, the hidden ability is given if the odds are met and the species has one
+        abilities = np.asarray(self.abilities["regular"], dtype=object)[rng.integers(0, len(self.abilities["regular"]), n)]
+        if len(self.abilities["hidden"]) > 0:
+            abilities[rng.random(n) < resources.HIDDEN_ABILITY_ODDS] = self.abilities["hidden"][0]
+
+        # Draw genders
+        if self.gender_ratio is None:
+            genders = [Gender.GENDERLESS] * n
+        else:
+            genders = np.where(rng.random(n) < self.gender_ratio["male"], Gender.MALE, Gender.FEMALE).tolist()
+
+        # Draw natures and IVs, IVs are random and between 0 and 31
+        natures = np.asarray(list(Nature), dtype=object)[rng.integers(0, len(Nature), n)].tolist()
+        iv_table = rng.integers(0, 32, (n, len(Stat)))
+        ivs = iv_table.tolist()
+
+        # Calculate the health of every Pokemon in one pass, EVs are all zero
+        health = calculate_stats(
+            np.tile([self.base_stats[stat.value] for stat in Stat], (n, 1)),
+            iv_table,
+            np.zeros((n, len(Stat)), dtype=np.int64),
+            drawn_levels,
+            get_nature_modifier_table(natures)
+        )[:, list(Stat).index(Stat.HP)].tolist()
+
+        # Draw the move set of every Pokemon, Pokemon of the same level know the same moves so
+        # up to four of them are picked at random for a whole level at once by sorting random keys
+        move_sets = [None] * n
+        for level in np.unique(drawn_levels).tolist():
+            positions = np.flatnonzero(drawn_levels == level)
+            known_moves = self._learnset.known_at(level)
+            picks = np.argsort(rng.random((len(positions), len(known_moves))), axis=1)[:, :4].tolist()
+            for position, pick in zip(positions.tolist(), picks):
+                move_sets[position] = [known_moves[i] for i in pick]
+
+        # Look up the PP of every move once
+        move_pps = {}
+        for move_set in move_sets:
+            for move_name in move_set:
+                if move_name not in move_pps:
+                    move_pps[move_name] = holder.get_move(move_name).pp
+
+        # Build the instances of the Pokemon
+        stat_names = [stat.value for stat in Stat]
+        pokemon_list = []
+        for i, level in enumerate(drawn_levels.tolist()):
+            pokemon = Pokemon(
+                nickname=self.name.title(),
+                egg=is_egg,
+                shiny=bool(shinies[i]),
+                species=self.name,
+                ability=abilities[i],
+                tutor_machine_moves=[],
+                gender=genders[i],
+                nature=natures[i],
+                ivs=cast(StatTable, dict(zip(stat_names, ivs[i]))),
+                evs=cast(StatTable, dict.fromkeys(stat_names, 0)), # EVs are all zero by default
+                level=level,
+                experience=0,
+                friendship=self.base_friendship,
+                condition=None,
+                capture_data=None
+            )
+
+            # Create a blank 'healthy' condition
+            pokemon.condition = BattleCondition(
+                health=health[i],
+                status_condition=None,
+                confused=False,
+                held_item=None,
+                move_set=[BattleMove(move_name, move_pps[move_name], move_pps[move_name], False) for move_name in move_sets[i]],
+                stat_changes=OptionalStatTable()
+            )
+            pokemon_list.append(pokemon)
+
+        # Return the Pokemon instances
+        return pokemon_list
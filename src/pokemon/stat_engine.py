@@ -0,0 +1,90 @@
+# This file contains a batch version of the stat formulas in 'Pokemon.calculate_stat'
+# that calculates all six stats of many Pokemon at once using NumPy arrays. It is
+# meant for tools that look at whole boxes or tens of thousands of Pokemon at a time
+# (sorting, team building, balance analysis), the game itself uses 'Pokemon.get_stat'.
+
+# NumPy is only needed by this module, it isn't required to run the game
+
+# Imports
+
+from typing import Iterable
+
+import numpy as np
+
+from src.pokemon.types.nature import Nature
+from src.pokemon.types.stat import Stat
+
+# Define the order of the stat columns in every array, the same order as the 'Stat' enum
+STAT_ORDER = tuple(Stat)
+
+# Define a function that builds the nature modifier of each stat for a nature the same way
+# 'Pokemon.calculate_stat' does, the increased stat is checked first so natures that increase
+# and decrease the same stat still increase it, and HP is never modified
+def get_nature_modifiers(nature: Nature) -> list[float]:
+    increases, decreases = nature.value
+    modifiers = []
+    for stat in STAT_ORDER:
+        if stat == Stat.HP:
+            modifiers.append(1.0)
+        elif stat == increases:
+            modifiers.append(1.1)
+        elif stat == decreases:
+            modifiers.append(0.9)
+        else:
+            modifiers.append(1.0)
+    return modifiers
+
+# Define the list of natures and a table of their modifiers, one row per nature
+NATURES = tuple(Nature)
+NATURE_INDEXES = {nature: i for i, nature in enumerate(NATURES)}
+NATURE_MODIFIERS = np.array([get_nature_modifiers(nature) for nature in NATURES], dtype=np.float64)
+
+# Define a function that calculates the stats of N Pokemon in one pass, returns an (N, 6) array
+def calculate_stats(
+        base_stats: np.ndarray, # (N, 6) base stats of each Pokemon's species
+        ivs: np.ndarray, # (N, 6) Individual Values (IVs)
+        evs: np.ndarray, # (N, 6) Effort Values (EVs)
+        levels: np.ndarray, # (N,) levels
+        nature_modifiers: np.ndarray # (N, 6) nature modifiers, see 'get_nature_modifiers'
+) -> np.ndarray:
+    # Use 64-bit integers like Python's integers so nothing overflows or rounds differently
+    base_stats = np.asarray(base_stats, dtype=np.int64)
+    ivs = np.asarray(ivs, dtype=np.int64)
+    evs = np.asarray(evs, dtype=np.int64)
+    levels = np.asarray(levels, dtype=np.int64)[:, np.newaxis]
+
+    # Follow the order of operations of 'Pokemon.calculate_stat' exactly: the integer part,
+    # then a true (float64) division by 100, and truncation back to an integer at the end
+    scaled = ((2 * base_stats + ivs + evs // 4) * levels) / 100
+    stats = np.trunc((scaled + 5) * nature_modifiers).astype(np.int64)
+    # Health uses a different formula
+    hp = STAT_ORDER.index(Stat.HP)
+    stats[:, hp] = np.trunc(scaled[:, hp]).astype(np.int64) + levels[:, 0] + 10
+    return stats
+
+# Define a function that converts a list of natures into an (N, 6) array of nature modifiers
+def get_nature_modifier_table(natures: Iterable[Nature]) -> np.ndarray:
+    indexes = np.fromiter((NATURE_INDEXES[nature] for nature in natures), dtype=np.intp)
+    return NATURE_MODIFIERS[indexes]
+
+# Define a function that calculates the stats of a list of Pokemon objects, returns an (N, 6) array
+# with a row per Pokemon and the columns in the order of 'STAT_ORDER'
+def calculate_pokemon_stats(pokemon: list) -> np.ndarray:
+    # Import holder here to avoid circular import error
+    from src import holder
+
+    # Look up each species' base stats once
+    base_stats_by_species = {}
+    for entry in pokemon:
+        if entry.species not in base_stats_by_species:
+            base_stats = holder.get_species(entry.species).base_stats
+            base_stats_by_species[entry.species] = [base_stats[stat.value] for stat in STAT_ORDER]
+
+    # Gather the fields of every Pokemon into arrays
+    return calculate_stats(
+        np.array([base_stats_by_species[entry.species] for entry in pokemon], dtype=np.int64).reshape(-1, 6),
+        np.array([[entry.ivs[stat.value] for stat in STAT_ORDER] for entry in pokemon], dtype=np.int64).reshape(-1, 6),
+        np.array([[entry.evs[stat.value] for stat in STAT_ORDER] for entry in pokemon], dtype=np.int64).reshape(-1, 6),
+        np.array([entry.level for entry in pokemon], dtype=np.int64),
+        get_nature_modifier_table(entry.nature for entry in pokemon)
+    )
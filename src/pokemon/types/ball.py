@@ -9,6 +9,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define BallHandler class
 
 class BallHandler:
@@ -29,11 +31,12 @@ class Ball(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Iterate all enumerations
-        for entry in Ball:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value.lower():
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid ball: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid ball: {value}")
+
+# Build the lookup table used by 'Ball.of' once, now that every enumeration is defined
+_lookup = EnumLookup(Ball, by_value=False)
@@ -12,6 +12,9 @@ from src.pokemon.types.status_condition import StatusCondition
 # Define BattleMove class
 # Represents a Pokemon's move during battle
 class BattleMove:
+    # Use slots, every Pokemon holds up to four of these
+    __slots__ = ("name", "pp", "max_pp", "disabled")
+
     def __init__(
             self,
             name: str, # Move's name
@@ -40,6 +43,9 @@ class BattleMove:
 # Represents the state of a Pokemon during battle
 
 class BattleCondition:
+    # Use slots, one of these exists for every Pokemon
+    __slots__ = ("health", "status_condition", "confused", "held_item", "move_set", "stat_changes")
+
     def __init__(
             self,
             health: int, # The Pokemon's health
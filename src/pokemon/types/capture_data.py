@@ -9,6 +9,9 @@ from src.pokemon.types.ball import Ball
 # Define the 'CaptureData' class
 
 class CaptureData:
+    # Use slots, one of these exists for every caught Pokemon
+    __slots__ = ("ball", "original_trainer", "original_trainer_id")
+
     def __init__(
             self,
             ball: Ball, # The Pokeball that was used to catch this Pokemon
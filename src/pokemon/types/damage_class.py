@@ -6,6 +6,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'DamageClass' enum by creating a class that extends 'Enum'
 
 class DamageClass(Enum):
@@ -26,11 +28,12 @@ class DamageClass(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Iterate all enumerations
-        for entry in DamageClass:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value.lower() or entry.value.lower() == value.lower():
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid damage class: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid damage class: {value}")
+
+# Build the lookup table used by 'DamageClass.of' once, now that every enumeration is defined
+_lookup = EnumLookup(DamageClass)
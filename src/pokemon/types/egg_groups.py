@@ -7,6 +7,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'EggGroup' enum by creating a class that extends 'Enum'
 
 class EggGroup(Enum):
@@ -30,15 +32,12 @@ class EggGroup(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Convert value from kebab-case to snake_case because value may be provided
-        # directly from Pokemon API which uses kebab-case while enumerations are in
-        # snake_case
-        value = value.replace("-", "_")
-        # Iterate all enumerations
-        for group in EggGroup:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if group.name.lower() == value.lower() or group.value == value.lower():
-                # Return matching enumeration
-                return group
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Unknown egg group: {value}")
\ No newline at end of file
+        raise KeyError(f"Unknown egg group: {value}")
+
+# Build the lookup table used by 'EggGroup.of' once, now that every enumeration is defined
+_lookup = EnumLookup(EggGroup, kebab_case=True)
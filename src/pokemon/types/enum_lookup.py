@@ -0,0 +1,42 @@
+# This file defines a helper that lets enums be looked up by a string literal
+# in constant time. Each enum builds one lookup table when its module is loaded
+# instead of lower-casing and comparing against every enumeration on each call.
+
+# Imports
+
+from enum import Enum
+
+# Define the 'EnumLookup' class
+
+class EnumLookup:
+    def __init__(
+            self,
+            enum: type[Enum], # The enum to look up
+            by_value: bool = True, # Whether enumerations can also be matched by their (string) value
+            kebab_case: bool = False, # Whether kebab-case input should be converted to snake_case
+            aliases: dict[str, Enum] | None = None # Extra lower-case keys that map to an enumeration
+    ):
+        # Initialize fields
+        self.kebab_case = kebab_case
+        self.table: dict[str, Enum] = {}
+
+        # Iterate all enumerations
+        for entry in enum:
+            # Enumerations match by their lower-case name
+            self.table.setdefault(entry.name.lower(), entry)
+            # Enumerations with a string value also match by their lower-case value
+            if by_value and isinstance(entry.value, str):
+                self.table.setdefault(entry.value.lower(), entry)
+
+        # Add aliases, enumerations take precedence over aliases
+        if aliases is not None:
+            for key, entry in aliases.items():
+                self.table.setdefault(key, entry)
+
+    # Define a function that returns the enumeration matching 'value' or None if nothing matches
+    def find(self, value: str) -> Enum | None:
+        # Normalize the value the same way the table's keys were
+        value = value.lower()
+        if self.kebab_case:
+            value = value.replace("-", "_")
+        return self.table.get(value)
@@ -0,0 +1,29 @@
+# This file defines the events that are produced when a Pokemon gains experience,
+# such as levelling up or being able to learn a new move. Gaining experience doesn't
+# show anything to the player itself, the events are returned so that the windows
+# can show them afterwards (or so that simulations can ignore them).
+
+# Imports
+
+from enum import Enum
+
+# Define 'ExperienceEventType' enum by creating a class that extends 'Enum'
+class ExperienceEventType(Enum):
+    LEVEL_UP = "level_up" # The Pokemon has leveled up, the value is the level reached
+    MOVE_LEARNT = "move_learnt" # The Pokemon has learnt a move and it was added to its move set, the value is the move's name
+    MOVE_LEARNABLE = "move_learnable" # The Pokemon has learnt a move but its move set is full, the value is the move's name
+    EVOLUTION_AVAILABLE = "evolution_available" # The Pokemon can evolve, the value is the evolution's species name
+
+# Define the 'ExperienceEvent' class
+class ExperienceEvent:
+    # Use slots, simulations can produce a lot of events
+    __slots__ = ("type", "value")
+
+    def __init__(
+            self,
+            type: ExperienceEventType, # The type of event
+            value: int | str # The level, move name or species name the event is about
+    ):
+        # Initialize fields
+        self.type = type
+        self.value = value
@@ -5,6 +5,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'Gender' enum by creating a class that extends 'Enum'
 
 class Gender(Enum):
@@ -16,11 +18,12 @@ class Gender(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Iterate all enumerations
-        for entry in Gender:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value.lower() or entry.value == value.lower():
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid gender: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid gender: {value}")
+
+# Build the lookup table used by 'Gender.of' once, now that every enumeration is defined
+_lookup = EnumLookup(Gender)
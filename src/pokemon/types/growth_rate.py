@@ -4,8 +4,11 @@
 
 # Imports
 
+from bisect import bisect_left
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'GrowthRate' enum by creating a class that extends 'Enum'
 class GrowthRate(Enum):
     # Define enumerations using string literal values
@@ -18,7 +21,9 @@ class GrowthRate(Enum):
 
     # Define a function to calculate the experience points needed to level up
     # Formulas are derived from Bulbapedia: https://bulbapedia.bulbagarden.net/wiki/Experience#Fast
-    def get_experience_needed(self, next_level: int):
+    # The formulas are only evaluated once to build the experience tables, use
+    # 'get_experience_needed' to look up a level in the tables instead
+    def calculate_experience_needed(self, next_level: int):
         if self == GrowthRate.FAST:
             return (4 * next_level**3) / 5
         elif self == GrowthRate.MEDIUM_FAST:
@@ -44,15 +49,76 @@ class GrowthRate(Enum):
             else:
                 return (next_level**3 * (next_level / 2 + 32)) / 50
 
+    # Define a function that returns the experience points needed to level up to 'next_level'
+    # from the level before it, the formula's exact value
+    def get_experience_needed(self, next_level: int) -> float:
+        return _experience_tables[self][next_level] / EXPERIENCE_SCALE
+
+    # Define a function that returns the total experience points needed to reach 'level' from level 1
+    def get_total_experience(self, level: int) -> float:
+        return _total_experience_tables[self][level] / EXPERIENCE_SCALE
+
+    # Define a function that returns the level reached with 'experience' total experience points
+    # (counted from level 1), a Pokemon only levels up once its experience exceeds the amount needed
+    def get_level_for_experience(self, experience: float) -> int:
+        return find_level(_total_experience_tables[self], round(experience * EXPERIENCE_SCALE))
+
+    # Define a function that adds 'amount' experience points to a Pokemon at 'level' with 'experience'
+    # points towards the next level, returns the level reached and the whole experience points towards
+    # the level after it. Fractional amounts (ex: shared EXP is halved) are counted exactly (to the
+    # tables' 1/1500 EXP), so a level is gained at the same amount of EXP as adding the formula's
+    # values one level at a time
+    def add_experience(self, level: int, experience: float, amount: float) -> tuple[int, int]:
+        totals = _total_experience_tables[self]
+        total = totals[level] + round((experience + amount) * EXPERIENCE_SCALE)
+        level = find_level(totals, total)
+        # Check if the level is the max level, left over EXP is lost at the max level
+        if level >= MAX_LEVEL:
+            return MAX_LEVEL, 0
+        return level, (total - totals[level]) // EXPERIENCE_SCALE
+
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Convert value from kebab-case to snake_case because value may be provided
-        # directly from Pokemon API which uses kebab-case while enumerations are in
-        # snake_case
-        value = value.replace("-", "_")
-        # Iterate all enumerations
-        for rate in GrowthRate:
-            if rate.name.lower() == value.lower() or rate.value == value.lower():
-                return rate
-        raise KeyError(f"Unknown growth rate: {value}")
\ No newline at end of file
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
+        # Raise a KeyError to indicate invalid 'value' argument
+        raise KeyError(f"Unknown growth rate: {value}")
+
+# Build the lookup table used by 'GrowthRate.of' once, now that every enumeration is defined
+_lookup = EnumLookup(GrowthRate, kebab_case=True)
+
+# Define the highest level a Pokemon can reach
+MAX_LEVEL = 100
+
+# Define the amount of parts an experience point is split into in the experience tables. The
+# formulas only divide by 3, 4, 5, 50, 100 and 500, so each of their values is a whole amount of
+# parts and the tables hold them exactly as integers, instead of truncating them to whole EXP
+EXPERIENCE_SCALE = 1500
+
+# Define a function that builds the experience table of a growth rate, the experience
+# needed to reach each level from the level before it (indexes 0 and 1 are never used)
+def build_experience_table(rate: GrowthRate) -> list[int]:
+    return [0, 0] + [
+        round(rate.calculate_experience_needed(level) * EXPERIENCE_SCALE) for level in range(2, MAX_LEVEL + 1)
+    ]
+
+# Define a function that returns the level reached with a total amount of experience in the tables' units
+def find_level(totals: list[int], total: int) -> int:
+    # Find the highest level whose total is below the experience in one binary search
+    level = bisect_left(totals, total) - 1
+    return max(1, min(level, MAX_LEVEL))
+
+# Define a function that builds the running total of an experience table, the total
+# experience needed to reach each level from level 1
+def build_total_experience_table(table: list[int]) -> list[int]:
+    totals = [0, 0]
+    for level in range(2, MAX_LEVEL + 1):
+        totals.append(totals[-1] + table[level])
+    return totals
+
+# Build the experience tables of every growth rate once
+_experience_tables = {rate: build_experience_table(rate) for rate in GrowthRate}
+_total_experience_tables = {rate: build_total_experience_table(table) for rate, table in _experience_tables.items()}
@@ -5,6 +5,9 @@
 # Define the 'LearnableMove' class
 
 class LearnableMove:
+    # Use slots, species have long lists of learnable moves
+    __slots__ = ("name", "level", "machine", "tutor")
+
     def __init__(
             self,
             name: str, # The name of the move
@@ -0,0 +1,51 @@
+# This file defines the Learnset class which indexes the moves a species learns
+# through level up. The moves are sorted by the level they are learnt at once,
+# when the species is built, so that finding the moves learnt at, up to or between
+# levels takes a binary search rather than a walk over every learnable move.
+
+# Imports
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+from src.pokemon.types.learnable_move import LearnableMove
+
+# Define the 'Learnset' class
+
+class Learnset:
+    # Use slots, every species has a learnset
+    __slots__ = ("levels", "names")
+
+    def __init__(
+            self,
+            moves: Iterable[LearnableMove | dict] # The moves that the species can learn
+    ):
+        # Collect the (level, name) pair of every move learnt by level up, learnable moves
+        # are dictionaries when loaded from a pack and objects when built by the generator
+        pairs = []
+        for move in moves:
+            if isinstance(move, dict):
+                level, name = move["level"], move["name"]
+            else:
+                level, name = move.level, move.name
+            # Skip moves that can't be learnt by level up
+            if level is not None:
+                pairs.append((level, name))
+        # Sort by level, the sort is stable so moves learnt at the same level keep their pack order
+        pairs.sort(key=lambda pair: pair[0])
+
+        # Initialize fields
+        self.levels: list[int] = [level for level, _ in pairs] # The sorted levels that moves are learnt at
+        self.names: list[str] = [name for _, name in pairs] # The name of the move learnt at each level
+
+    # Define a function that returns the moves learnt at or below 'level'
+    def known_at(self, level: int) -> list[str]:
+        return self.names[:bisect_right(self.levels, level)]
+
+    # Define a function that returns the moves learnt above level 'start' and at or below level 'end'
+    def between(self, start: int, end: int) -> list[str]:
+        return self.names[bisect_right(self.levels, start):bisect_right(self.levels, end)]
+
+    # Define a function that returns the moves learnt at exactly 'level'
+    def at(self, level: int) -> list[str]:
+        return self.names[bisect_left(self.levels, level):bisect_right(self.levels, level)]
@@ -5,6 +5,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'MoveAilment' enum by creating a class that extends 'Enum'
 
 class MoveAilment(Enum):
@@ -34,15 +36,12 @@ class MoveAilment(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Convert value from kebab-case to snake_case because value may be provided
-        # directly from Pokemon API which uses kebab-case while enumerations are in
-        # snake_case
-        value = value.lower().replace("-", "_")
-        # Iterate all enumerations
-        for entry in MoveAilment:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value or entry.value.lower() == value:
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid ailment: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid ailment: {value}")
+
+# Build the lookup table used by 'MoveAilment.of' once, now that every enumeration is defined
+_lookup = EnumLookup(MoveAilment, kebab_case=True)
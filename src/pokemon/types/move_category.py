@@ -6,6 +6,8 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
+
 # Define 'MoveCategory' enum by creating a class that extends 'Enum'
 
 class MoveCategory(Enum):
@@ -29,15 +31,12 @@ class MoveCategory(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Convert value from kebab-case to snake_case because value may be provided
-        # directly from Pokemon API which uses kebab-case while enumerations are in
-        # snake_case
-        value = value.lower().replace("-", "_")
-        # Iterate all enumerations
-        for entry in MoveCategory:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value or entry.value.lower() == value:
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid move category: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid move category: {value}")
+
+# Build the lookup table used by 'MoveCategory.of' once, now that every enumeration is defined
+_lookup = EnumLookup(MoveCategory, kebab_case=True)
@@ -7,6 +7,7 @@
 
 from enum import Enum
 
+from src.pokemon.types.enum_lookup import EnumLookup
 from src.pokemon.types.stat import Stat
 
 # Define a class called 'Nature' that extends 'Enum'
@@ -43,11 +44,12 @@ class Nature(Enum):
     # Define a static method to access any enumeration object using a string literal
     @staticmethod
     def of(value: str):
-        # Iterate all enumerations
-        for entry in Nature:
-            # Check if current enumeration's name or value matches the 'value' argument
-            if entry.name.lower() == value.lower():
-                # Return matching enumeration
-                return entry
+        # Find the matching enumeration in the lookup table
+        entry = _lookup.find(value)
+        if entry is not None:
+            return entry
         # Raise a KeyError to indicate invalid 'value' argument
-        raise KeyError(f"Invalid nature: {value}")
\ No newline at end of file
+        raise KeyError(f"Invalid nature: {value}")
+
+# Build the lookup table used by 'Nature.of' once, now that every enumeration is defined
+_lookup = EnumLookup(Nature, by_value=False)
@@ -377,4 +377,49 @@ def get_encounter(route: int) -> Pokemon:
     level = random.randint(encounter['min_level'], encounter['max_level'])
 
     # Return a wild Pokemon
-    return holder.get_species(name).spawn(level)
\ No newline at end of file
+    return holder.get_species(name).spawn(level)
+
+# Define a function that gets 'n' random encounters for the specified route at once,
+# using the same odds as 'get_encounter' but drawing from a NumPy random generator and
+# spawning the Pokemon of each species in bulk. 'rng' is a NumPy generator or a seed
+def get_encounters(route: int, n: int, rng=None) -> list[Pokemon]:
+    # NumPy is only needed by this function so it is imported here
+    import numpy as np
+
+    # Use the provided generator or create one with the provided seed
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    route -= 1 # Offset since routes are typically first-indexed by 1
+
+    # Draw the route of every encounter, 10% are drawn one route lower and 9% one route above
+    lower = (rng.random(n) < 0.1) & (route > 0)
+    higher = ~lower & (rng.random(n) < 0.1) & (route < len(routes) - 1)
+    drawn_routes = route - lower.astype(int) + higher.astype(int)
+    # Draw which encounters are rare, with a chance of 20%
+    rare = rng.random(n) < 0.2
+
+    # Initialize the list of encounters
+    encounters = [None] * n
+    # Iterate each encounter set that has been drawn
+    for route_index in np.unique(drawn_routes).tolist():
+        for is_rare, rarity in ((False, "common"), (True, "rare")):
+            positions = np.flatnonzero((drawn_routes == route_index) & (rare == is_rare))
+            if len(positions) == 0:
+                continue
+            encounter_set = routes[route_index][rarity]
+            # Get an encounter for each position
+            choices = rng.integers(0, len(encounter_set), len(positions))
+            for i, encounter in enumerate(encounter_set):
+                chosen = positions[choices == i]
+                if len(chosen) == 0:
+                    continue
+                # Spawn all the wild Pokemon of this encounter at once
+                spawned = holder.get_species(encounter['species']).spawn_many(
+                    len(chosen), range(encounter['min_level'], encounter['max_level'] + 1), rng=rng
+                )
+                for position, pokemon in zip(chosen.tolist(), spawned):
+                    encounters[position] = pokemon
+
+    # Return the wild Pokemon
+    return encounters
@@ -0,0 +1,89 @@
+# This file defines a dispatcher that calls battle event listeners on the Tkinter thread.
+# Battle events happen on the transport's event loop thread, but most listeners update
+# widgets, which is only safe on the thread running the Tkinter main loop. Events are
+# queued from any thread and the Tkinter thread calls their listeners in batches, one
+# batch per 'after' tick, with the time spent on each batch limited so that a burst of
+# events can't freeze the window.
+
+# Imports
+
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Iterable
+
+# Define the interval (in milliseconds) at which the queue is checked while it is empty,
+# about once a frame
+POLL_INTERVAL = 16
+
+# Define the most time (in seconds) a batch can take, the events left over are called on the next tick
+BATCH_BUDGET = 0.008
+
+# Define the 'TkEventDispatcher' class
+class TkEventDispatcher:
+    def __init__(
+            self,
+            widget: tk.Misc, # The widget whose 'after' schedules the batches, must be created on the Tkinter thread
+            coalesced_events: Iterable[Enum] = (), # Events where only the latest one queued for each battler is called (ex: health updates)
+            batch_budget: float | None = BATCH_BUDGET # The most time a batch can take, none drains the whole queue every tick
+    ):
+        # Initialize fields
+        self.widget = widget
+        self.coalesced_events = frozenset(coalesced_events)
+        self.batch_budget = batch_budget
+        self.queue: deque[list] = deque() # The queued events as [listeners, args, kwargs, coalescing key]
+        self.latest: dict[tuple, list] = {} # The latest queued event of each coalesced event, by its coalescing key
+        self.lock = threading.Lock()
+        self.closed = False
+        self.coalesced = 0 # The amount of events that were replaced by a later one before being called
+        self.after_id = widget.after(POLL_INTERVAL, self.__drain)
+
+    # Define a function that queues an event to have its listeners called on the Tkinter thread, can
+    # be called from any thread. The source is the battle the event happened in, a coalesced event
+    # replaces the one queued for the same source, event and battler (its first argument)
+    def post(self, source: Any, event: Enum, listeners: list[Callable], args: tuple, kwargs: dict | None = None):
+        key = (source, event, args[0]) if event in self.coalesced_events and args else None
+        entry = [tuple(listeners), args, kwargs or {}, key]
+        with self.lock:
+            if self.closed:
+                return
+            if key is not None:
+                previous = self.latest.get(key)
+                # Check if an earlier event is still queued, only the latest is called
+                if previous is not None:
+                    previous[0] = ()
+                    self.coalesced += 1
+                self.latest[key] = entry
+            self.queue.append(entry)
+
+    # Define the function that calls the queued events on the Tkinter thread, the next tick comes
+    # right away if events were left over and after the poll interval otherwise
+    def __drain(self):
+        deadline = time.perf_counter() + self.batch_budget if self.batch_budget is not None else None
+        try:
+            while True:
+                with self.lock:
+                    if self.closed or not self.queue:
+                        break
+                    listeners, args, kwargs, key = entry = self.queue.popleft()
+                    if key is not None and self.latest.get(key) is entry:
+                        del self.latest[key]
+                for listener in listeners:
+                    listener(*args, **kwargs)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+        finally:
+            # Schedule the next tick, even if a listener failed
+            if not self.closed:
+                self.after_id = self.widget.after(1 if self.queue else POLL_INTERVAL, self.__drain)
+
+    # Define a function that stops calling events, the events still queued are dropped.
+    # Must be called on the Tkinter thread
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.queue.clear()
+            self.latest.clear()
+        self.widget.after_cancel(self.after_id)
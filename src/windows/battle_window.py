@@ -16,10 +16,13 @@ from src.game.battle_client import BattleClient, BattleEvent, Battler
 from src.pokemon.pokemon import Pokemon
 from src.pokemon.types.ball import Ball
 from src.pokemon.types.capture_data import CaptureData
+from src.pokemon.types.experience_event import ExperienceEventType
 from src.pokemon.types.stat import Stat
 from src.utils import images
+from src.utils.event_dispatcher import TkEventDispatcher
 from src.utils.font import get_bold_font, get_mono_font
 from src.windows.abstract.top_level_window import TopLevelWindow
+from src.windows.experience_dialogs import show_experience_events
 from src.windows.item_selector import ItemSelector
 from src.windows.move_selector import MoveSelector
 from src.windows.nicknamer import Nicknamer
@@ -266,9 +269,10 @@ class BattleWindow(TopLevelWindow):
     # Define a function to destroy the battle
     def destroy(self):
         self.rerender() # Call the rerender callback
+        self.dispatcher.close() # Stop calling the battle's listeners
         self.window.destroy() # Destroy the window
         holder.battle = None # Set the current battle to none
-        self.battle.disconnect() # Disconnect from the TCP socket
+        self.battle.disconnect() # Hand the connection back to the pool
 
     # Define the ready callback
     def on_start(self):
@@ -500,6 +504,8 @@ class BattleWindow(TopLevelWindow):
 
             # Increase EV count by 'evs' with a max of 252
             attacker.evs[ev_name] = min(252, attacker.evs[ev_name] + evs)
+            # The EVs were changed in place so the cached stats must be recalculated
+            attacker.invalidate_stats()
 
             return # Exit
         else:
@@ -539,10 +545,16 @@ class BattleWindow(TopLevelWindow):
             # Apply the EXP modifier
             exp *= holder.exp_mod
             # Add EXP to the Pokemon
-            has_leveled_up = self.battle.current.add_exp(exp)
+            current_events = self.battle.current.gain_exp(exp)
+            has_leveled_up = any(event.type == ExperienceEventType.LEVEL_UP for event in current_events)
             # Share EXP between player's team
+            team_events = []
             for pokemon in holder.save.team:
-                pokemon.add_exp(exp * 0.5) # Share half of the rewarded EXP with the team
+                team_events.append((pokemon, pokemon.gain_exp(exp * 0.5))) # Share half of the rewarded EXP with the team
+            # Show the new moves and evolutions once all the EXP has been given
+            show_experience_events(self.battle.current, current_events)
+            for pokemon, events in team_events:
+                show_experience_events(pokemon, events)
             # Calculate the amount of yen to reward
             yen = int(10000 * ((b * l ** 1.3) / (608 * 100 ** 1.3)) ** 0.8)
             # Apply the yen modifier
@@ -636,6 +648,11 @@ class BattleWindow(TopLevelWindow):
         self.log_label = tk.Label(action_frame, text="", font=get_mono_font(12), wraplength=370,
                                   anchor=tk.NW, justify=tk.LEFT, bg="#f0f0f0")
 
+        # Call the listeners on the Tkinter thread, since they update widgets, only the latest
+        # health update of each battler is called when several arrive in a burst
+        self.dispatcher = TkEventDispatcher(self.window, coalesced_events=(BattleEvent.HEALTH_UPDATE,))
+        self.battle.dispatcher = self.dispatcher
+
         # Attach listener callbacks
         self.battle.on(BattleEvent.STARTED, self.on_start)
         self.battle.on(BattleEvent.HEALTH_UPDATE, self.on_health_update)
@@ -0,0 +1,36 @@
+# This file contains a function that shows the player the events produced
+# when one of their Pokemon gains experience, such as learning new moves or
+# being able to evolve. The events are produced by 'Pokemon.gain_exp' which
+# doesn't show anything itself.
+
+# Imports
+
+from tkinter import messagebox
+
+from src import holder
+from src.pokemon.pokemon import Pokemon
+from src.pokemon.types.experience_event import ExperienceEvent, ExperienceEventType
+from src.windows.evolution_window import EvolutionWindow
+
+# Define a function that shows the experience events of a Pokemon
+def show_experience_events(pokemon: Pokemon, events: list[ExperienceEvent]):
+    # Iterate all the events
+    for event in events:
+        # Check if the event is about a move
+        if event.type == ExperienceEventType.MOVE_LEARNT:
+            # Inform the user
+            messagebox.showinfo("New Move", f"{pokemon.nickname} has learnt {event.value.replace('_', ' ').title()}!")
+        elif event.type == ExperienceEventType.MOVE_LEARNABLE:
+            # Inform the user
+            messagebox.showinfo("New Move", f"{pokemon.nickname} has learnt {event.value.replace('_', ' ').title()}! " + \
+                                "You can swap out a move for this one in the Pokemon summary.")
+
+    # Iterate all the evolutions that are available
+    for event in events:
+        if event.type == ExperienceEventType.EVOLUTION_AVAILABLE:
+            # Create an evolution window
+            should_continue = EvolutionWindow(holder.root, pokemon, holder.get_species(event.value)).draw()
+            # Check if we should continue is not none indicating that the player has confirmed the evolution
+            if should_continue is not None:
+                should_continue.wait() # Show the window
+                break # Break out of the loop